@@ -0,0 +1,94 @@
+import argparse
+import logging
+import sys
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import (
+    ALLOWED_EXTENSIONS,
+    BATCH_EXPORT_WORKERS,
+    BATCH_OUTPUT_DIR,
+    BATCH_SUMMARIZE_WORKERS,
+    BATCH_TRANSCRIBE_WORKERS,
+)
+from app.services.batch_service import MANIFEST_NAME, BatchInput, PipelinedBatch, collect_audio_files
+from app.services.client_registry import ClientRegistry, set_client_registry
+
+"""
+Command line entry point for batch processing, e.g.
+
+    python -m app.batch recordings/2024-w12/ --llm openai --docx --out data/batches/w12
+
+Files and directories can be mixed; directories contribute every supported
+audio file directly inside them. Outputs and manifest.json are written to --out
+(by default a new directory under BATCH_OUTPUT_DIR). The exit code is 1 if any
+file failed.
+"""
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.batch", description="Process many meeting recordings.")
+    parser.add_argument("inputs", nargs="+", type=Path, help="audio files and/or directories")
+    parser.add_argument("--out", type=Path, help="output directory (default: a new directory under BATCH_OUTPUT_DIR)")
+    parser.add_argument("--llm", choices=("claude", "openai"), default="claude", help="LLM provider for summaries")
+    parser.add_argument("--docx", action="store_true", help="also render a Word document per file")
+    parser.add_argument("--transcribe-workers", type=int, default=BATCH_TRANSCRIBE_WORKERS)
+    parser.add_argument("--summarize-workers", type=int, default=BATCH_SUMMARIZE_WORKERS)
+    parser.add_argument("--export-workers", type=int, default=BATCH_EXPORT_WORKERS)
+    return parser.parse_args(argv)
+
+
+def expand_inputs(paths: List[Path]) -> List[BatchInput]:
+    inputs = []
+    for path in paths:
+        if path.is_dir():
+            inputs.extend(BatchInput(p, p.name) for p in collect_audio_files(path))
+        elif path.is_file() and path.suffix.lower() in ALLOWED_EXTENSIONS:
+            inputs.append(BatchInput(path, path.name))
+        else:
+            raise SystemExit(f"Not a supported audio file or directory: {path}")
+    return inputs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+    )
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        raise SystemExit("No audio files found.")
+
+    batch_id = uuid.uuid4().hex
+    clients = ClientRegistry()
+    set_client_registry(clients)
+    try:
+        batch = PipelinedBatch(
+            batch_id,
+            inputs,
+            output_dir=args.out or BATCH_OUTPUT_DIR / batch_id,
+            llm_provider=args.llm,
+            docx=args.docx,
+            clients=clients,
+            transcribe_workers=args.transcribe_workers,
+            summarize_workers=args.summarize_workers,
+            export_workers=args.export_workers,
+        )
+        manifest = batch.run()
+    finally:
+        clients.close()
+        set_client_registry(None)
+
+    for item in manifest["items"]:
+        detail = ", ".join(item["outputs"].values()) if item["status"] == "succeeded" else item["error"]
+        print(f"{item['status']:>9}  {item['source']}  {detail}")
+    print(f"{manifest['succeeded']}/{manifest['total']} succeeded in {manifest['elapsed_seconds']}s")
+    print(f"Manifest: {batch.output_dir / MANIFEST_NAME}")
+    return 1 if manifest["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
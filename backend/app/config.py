@@ -1,10 +1,145 @@
+import os
 from pathlib import Path
 
-# File upload configuration
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Every setting below is read at import, so backend/.env has to be loaded first, whatever
+# the working directory (variables already set in the environment take precedence)
+load_dotenv(BACKEND_DIR / ".env")
+
+# Relative paths (defaults and environment values alike) are resolved against the backend
+# directory, not the working directory, so the app finds the same state wherever it is started
+# from; an absolute path is used as is.
+# File upload configuration. Uploads are stored by content hash (created on first upload, not at import).
+UPLOAD_DIR = BACKEND_DIR / os.getenv("UPLOAD_DIR", "uploads")
+# Uploads are removed after this long, and oldest first once the directory exceeds its quota
+UPLOAD_TTL_SECONDS = int(os.getenv("UPLOAD_TTL_HOURS", "24")) * 3600
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", "4096"))
+UPLOAD_MAX_BYTES = UPLOAD_MAX_MB * 1024 * 1024
+UPLOAD_JANITOR_INTERVAL_SECONDS = int(os.getenv("UPLOAD_JANITOR_INTERVAL_SECONDS", "300"))
+# Remove the audio as soon as it is transcribed (the transcript cache keeps the text)
+UPLOAD_DELETE_AFTER_TRANSCRIPTION = os.getenv("UPLOAD_DELETE_AFTER_TRANSCRIPTION", "false").lower() in ("1", "true", "yes")
 
 ALLOWED_EXTENSIONS = {".mp3", ".wav"}
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # uploads are copied to disk in 1 MB chunks
+
+# Long recordings are split into chunks before transcription,
+# so the upload limit is no longer bound by the Whisper request limit.
+MAX_AUDIO_SIZE_MB = 200
+MAX_AUDIO_SIZE_BYTES = MAX_AUDIO_SIZE_MB * 1024 * 1024
+
+# Whisper transcription configuration
+WHISPER_MAX_REQUEST_MB = 24  # provider limit is 25 MB, keep some headroom
+WHISPER_MAX_REQUEST_BYTES = WHISPER_MAX_REQUEST_MB * 1024 * 1024
+WHISPER_CHUNK_OVERLAP_SECONDS = 2.0
+WHISPER_MAX_WORKERS = 4
+
+# Optional audio pre-processing before Whisper: downmix to mono, resample, trim long silences
+# and re-encode (MP3 with ffmpeg when it is installed, 16-bit WAV without it)
+AUDIO_PREPROCESS_ENABLED = os.getenv("AUDIO_PREPROCESS_ENABLED", "false").lower() in ("1", "true", "yes")
+AUDIO_PREPROCESS_MIN_BYTES = int(os.getenv("AUDIO_PREPROCESS_MIN_KB", "512")) * 1024  # smaller files are sent as-is
+AUDIO_PREPROCESS_SAMPLE_RATE = 16000  # what Whisper works at internally
+AUDIO_PREPROCESS_MP3_BITRATE = os.getenv("AUDIO_PREPROCESS_MP3_BITRATE", "32k")
+AUDIO_SILENCE_THRESHOLD_DB = float(os.getenv("AUDIO_SILENCE_THRESHOLD_DB", "-45"))  # dBFS
+# Silences longer than this are shortened to it; leading and trailing silence is cut to AUDIO_SILENCE_PAD_SECONDS
+AUDIO_MAX_SILENCE_SECONDS = float(os.getenv("AUDIO_MAX_SILENCE_SECONDS", "1.0"))
+AUDIO_SILENCE_PAD_SECONDS = 0.2
+FFMPEG_PATH = os.getenv("FFMPEG_PATH")  # found on PATH when not set
+
+# Background job configuration
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite")  # "sqlite" or "memory"
+JOB_DB_PATH = BACKEND_DIR / os.getenv("JOB_DB_PATH", "data/jobs.sqlite3")
+JOB_RESULTS_DIR = BACKEND_DIR / os.getenv("JOB_RESULTS_DIR", "data/job_results")
+JOB_WORKERS = 4
+# Finished jobs and their result files are removed this long after they last changed
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_HOURS", "168")) * 3600
+JOB_CLEANUP_INTERVAL_SECONDS = 3600
+
+# Transcript cache configuration (keyed by the SHA-256 of the uploaded audio)
+TRANSCRIPT_CACHE_DIR = BACKEND_DIR / os.getenv("TRANSCRIPT_CACHE_DIR", "data/transcript_cache")
+TRANSCRIPT_CACHE_MAX_MB = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "256"))
+TRANSCRIPT_CACHE_MAX_BYTES = TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024
+TRANSCRIPT_CACHE_MAX_AGE_SECONDS = int(os.getenv("TRANSCRIPT_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600
+
+# Summary cache configuration (keyed by transcript, provider, model and prompt)
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "512"))
+# Optional on-disk tier, disabled unless a directory is configured
+SUMMARY_CACHE_DIR = BACKEND_DIR / os.environ["SUMMARY_CACHE_DIR"] if os.getenv("SUMMARY_CACHE_DIR") else None
+
+# Map-reduce summarization for long transcripts
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "6000"))
+SUMMARY_MAX_WORKERS = 4
+# Incremental re-summarization (POST /summarize/incremental): when the edited part of the transcript
+# is more than this share of it, the whole transcript is summarized again instead
+SUMMARY_INCREMENTAL_MAX_CHANGE_RATIO = float(os.getenv("SUMMARY_INCREMENTAL_MAX_CHANGE_RATIO", "0.5"))
+
+# Shared HTTP connection pools for the OpenAI / Anthropic clients
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "600"))
+
+# Progress events (SSE) are kept this long after a run finishes
+PROGRESS_CHANNEL_TTL_SECONDS = 600
+
+# Live meetings (/ws/live): audio is cut into overlapping windows, each transcribed as soon as it closes
+LIVE_WINDOW_SECONDS = float(os.getenv("LIVE_WINDOW_SECONDS", "20"))
+LIVE_WINDOW_OVERLAP_SECONDS = 2.0
+LIVE_MAX_CONCURRENT_WINDOWS = int(os.getenv("LIVE_MAX_CONCURRENT_WINDOWS", "4"))
+LIVE_MAX_SESSION_SECONDS = int(os.getenv("LIVE_MAX_SESSION_MINUTES", "240")) * 60
+
+# Batch processing (POST /process/batch and `python -m app.batch`)
+BATCH_OUTPUT_DIR = BACKEND_DIR / os.getenv("BATCH_OUTPUT_DIR", "data/batches")
+# Server-side directories can only be batch-processed from under this root (disabled when unset)
+BATCH_INPUT_ROOT = BACKEND_DIR / os.environ["BATCH_INPUT_ROOT"] if os.getenv("BATCH_INPUT_ROOT") else None
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+BATCH_MAX_UPLOAD_MB = int(os.getenv("BATCH_MAX_UPLOAD_MB", "2048"))
+BATCH_MAX_UPLOAD_BYTES = BATCH_MAX_UPLOAD_MB * 1024 * 1024
+BATCH_MAX_RUNNING = 2
+# Per-stage concurrency; each transcription also fans out over WHISPER_MAX_WORKERS chunks
+BATCH_TRANSCRIBE_WORKERS = int(os.getenv("BATCH_TRANSCRIBE_WORKERS", "2"))
+BATCH_SUMMARIZE_WORKERS = int(os.getenv("BATCH_SUMMARIZE_WORKERS", "4"))
+BATCH_EXPORT_WORKERS = int(os.getenv("BATCH_EXPORT_WORKERS", "2"))
+
+# Provider rate limits (token buckets per provider and model) and retries.
+# Keys are a provider, or "provider/model" to override the provider's limits for one model.
+# The SDK clients do not retry on their own; all retries go through the rate limiter.
+RATE_LIMITS = {
+    "anthropic": {
+        "rpm": int(os.getenv("CLAUDE_RPM", "50")),
+        "tpm": int(os.getenv("CLAUDE_TPM", "40000")),
+    },
+    "openai": {
+        "rpm": int(os.getenv("OPENAI_RPM", "500")),
+        "tpm": int(os.getenv("OPENAI_TPM", "200000")),
+    },
+    "openai/whisper-1": {
+        "rpm": int(os.getenv("WHISPER_RPM", "50")),
+    },
+}
+# Longest a call may wait for rate-limit capacity before it is rejected (or falls back)
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "60"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 30.0
+# Retry a summary with the other provider when the requested one is rate limited or down
+LLM_FALLBACK_ENABLED = os.getenv("LLM_FALLBACK_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Word export: optional pre-styled .docx whose styles and page setup are used for the notes
+DOCX_TEMPLATE_PATH = BACKEND_DIR / os.environ["DOCX_TEMPLATE_PATH"] if os.getenv("DOCX_TEMPLATE_PATH") else None
+
+# Multi-meeting export (POST /export/batch)
+EXPORT_BATCH_MAX_MEETINGS = int(os.getenv("EXPORT_BATCH_MAX_MEETINGS", "200"))
+# Worker processes rendering the documents (0 renders them in threads instead)
+EXPORT_PROCESS_WORKERS = int(os.getenv("EXPORT_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Smaller exports are rendered in a thread; a worker process round-trip costs more than they do
+EXPORT_PARALLEL_MIN_MEETINGS = 8
+
+# Meeting store: processed meetings are kept in SQLite with a full-text index
+MEETING_STORE_ENABLED = os.getenv("MEETING_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+MEETING_DB_PATH = BACKEND_DIR / os.getenv("MEETING_DB_PATH", "data/meetings.sqlite3")
 
-MAX_AUDIO_SIZE_MB = 25
-MAX_AUDIO_SIZE_BYTES = MAX_AUDIO_SIZE_MB * 1024 * 1024
\ No newline at end of file
+# Startup: the provider SDKs and the Word template are loaded lazily; this warms them in the
+# background once the app is serving, so the first request does not pay for them either
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
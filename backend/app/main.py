@@ -1,23 +1,131 @@
+from contextlib import asynccontextmanager
+import threading
+import time
+
 from fastapi import FastAPI
-from dotenv import load_dotenv
 import logging
 
+from app.config import JOB_STORE_BACKEND, JOB_DB_PATH, JOB_RESULTS_DIR, JOB_WORKERS
+from app.config import JOB_CLEANUP_INTERVAL_SECONDS, JOB_RETENTION_SECONDS
+from app.config import MAX_AUDIO_SIZE_BYTES
+from app.config import (
+    BATCH_EXPORT_WORKERS,
+    BATCH_MAX_RUNNING,
+    BATCH_MAX_UPLOAD_BYTES,
+    BATCH_OUTPUT_DIR,
+    BATCH_SUMMARIZE_WORKERS,
+    BATCH_TRANSCRIBE_WORKERS,
+)
+from app.config import EXPORT_PARALLEL_MIN_MEETINGS, EXPORT_PROCESS_WORKERS
+from app.config import MEETING_DB_PATH, MEETING_STORE_ENABLED
+from app.config import STARTUP_WARMUP, UPLOAD_JANITOR_INTERVAL_SECONDS
+from app.middleware.observability import ObservabilityMiddleware
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
+
 from app.routes.health import router as health_router
 from app.routes.transcribe import router as transcribe_router
 from app.routes.summarize import router as summarize_router
 from app.routes.process import router as process_router
+from app.routes.batch import router as batch_router
 from app.routes.export import router as export_router
+from app.routes.jobs import router as jobs_router
+from app.routes.stats import router as stats_router
+from app.routes.meetings import router as meetings_router
+from app.routes.metrics import router as metrics_router
+from app.routes.live import router as live_router
+from app.services.batch_service import BatchRunner
+from app.services.client_registry import ClientRegistry, set_client_registry
+from app.services.export_batch_service import ExportRenderer
+from app.services.job_service import JobRunner
+from app.services.job_store import create_job_store
+from app.services.meeting_store import MeetingStore
+from app.services.trace_service import TraceIdFilter
+from app.services.upload_service import upload_storage
 
 from fastapi.middleware.cors import CORSMiddleware
 
-load_dotenv()
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+    format="%(asctime)s | %(levelname)s | %(trace_id)s | %(name)s | %(message)s"
 )
+# Adds the trace id of the request or job being handled to every record
+for handler in logging.getLogger().handlers:
+    handler.addFilter(TraceIdFilter())
+logger = logging.getLogger(__name__)
+
+
+def _warm_up(clients: ClientRegistry) -> None:
+    """Load the provider SDKs and the Word template while the app is already answering requests."""
+    start = time.perf_counter()
+    try:
+        clients.warm_up()
+        from app.services.word_export_service import warm_up as warm_up_word_export
+
+        warm_up_word_export()
+    except Exception:
+        logger.exception("Startup warm-up failed; the clients and template will load on first use")
+        return
+    logger.info("Startup warm-up finished in %.2fs", time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared API clients (keep-alive connection pools), reused by every request
+    clients = ClientRegistry()
+    set_client_registry(clients)
+    app.state.clients = clients
+
+    # Expired uploads are removed, and the upload directory kept under its quota, in the background
+    upload_storage.start(UPLOAD_JANITOR_INTERVAL_SECONDS)
+
+    meeting_store = MeetingStore(MEETING_DB_PATH) if MEETING_STORE_ENABLED else None
+    app.state.meeting_store = meeting_store
+
+    store = create_job_store(JOB_STORE_BACKEND, JOB_DB_PATH)
+    # Finished jobs and their result files are removed after JOB_RETENTION_SECONDS, in the background
+    runner = JobRunner(
+        store, clients, results_dir=JOB_RESULTS_DIR, max_workers=JOB_WORKERS, meeting_store=meeting_store,
+        retention_seconds=JOB_RETENTION_SECONDS, cleanup_interval_seconds=JOB_CLEANUP_INTERVAL_SECONDS,
+    )
+    runner.start()
+    app.state.job_runner = runner
+
+    batch_runner = BatchRunner(
+        clients,
+        output_root=BATCH_OUTPUT_DIR,
+        max_running=BATCH_MAX_RUNNING,
+        transcribe_workers=BATCH_TRANSCRIBE_WORKERS,
+        summarize_workers=BATCH_SUMMARIZE_WORKERS,
+        export_workers=BATCH_EXPORT_WORKERS,
+        meeting_store=meeting_store,
+    )
+    batch_runner.start()
+    app.state.batch_runner = batch_runner
+
+    export_renderer = ExportRenderer(EXPORT_PROCESS_WORKERS, min_parallel_items=EXPORT_PARALLEL_MIN_MEETINGS)
+    app.state.export_renderer = export_renderer
+
+    # Nothing above imports the SDKs or python-docx, so /health answers right away
+    if STARTUP_WARMUP:
+        threading.Thread(target=_warm_up, args=(clients,), name="startup-warm-up", daemon=True).start()
+    try:
+        yield
+    finally:
+        export_renderer.shutdown()
+        batch_runner.shutdown()
+        runner.shutdown()
+        close = getattr(store, "close", None)
+        if close:
+            close()
+        if meeting_store is not None:
+            meeting_store.close()
+        upload_storage.shutdown()
+        await clients.aclose()
+        set_client_registry(None)
+
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Meeting Notes AI")
+    app = FastAPI(title="Meeting Notes AI", lifespan=lifespan)
 
     # CORS Middleware
     app.add_middleware(
@@ -31,12 +139,34 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Reject oversized uploads before their body is read
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        max_upload_bytes=MAX_AUDIO_SIZE_BYTES,
+        paths=("/process", "/transcribe", "/jobs"),
+        exclude_paths=("/process/batch",),
+    )
+    # A batch carries many recordings; each file is still checked against MAX_AUDIO_SIZE_BYTES
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        max_upload_bytes=BATCH_MAX_UPLOAD_BYTES,
+        paths=("/process/batch",),
+    )
+    # Outermost: trace id and metrics cover everything below, including rejected uploads
+    app.add_middleware(ObservabilityMiddleware)
+
     # Routes
     app.include_router(health_router)
     app.include_router(transcribe_router)
     app.include_router(summarize_router)
+    app.include_router(batch_router)
     app.include_router(process_router)
     app.include_router(export_router)
+    app.include_router(jobs_router)
+    app.include_router(stats_router)
+    app.include_router(meetings_router)
+    app.include_router(metrics_router)
+    app.include_router(live_router)
 
     return app
 
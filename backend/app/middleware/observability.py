@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics_service import HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+from app.services.trace_service import TRACE_HEADER, accept_trace_id, trace_context
+
+"""
+This middleware gives every HTTP request a trace id and records its metrics.
+- The id is taken from the caller's X-Trace-Id header (or generated), set for
+  the logs written while the request is handled, and returned in X-Trace-Id.
+- Requests are counted and timed per route template (/meetings/{meeting_id},
+  not the concrete path), so the number of time series stays bounded; paths
+  that match no route are reported as "unmatched".
+"""
+
+
+class ObservabilityMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = accept_trace_id(_header(scope, b"x-trace-id"))
+        status = 500
+        start = time.perf_counter()
+
+        async def traced_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)[TRACE_HEADER] = trace_id
+            await send(message)
+
+        try:
+            with trace_context(trace_id):
+                await self.app(scope, receive, traced_send)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route)
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.upload_service import too_large_message
+
+"""
+This middleware rejects oversized uploads before the request body is buffered.
+- Requests whose Content-Length already exceeds the limit are answered immediately,
+  without reading the body.
+- For chunked requests (no Content-Length) the received bytes are counted and the
+  request is aborted as soon as the limit is crossed.
+"""
+
+# Room for multipart boundaries, headers and small form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class RequestBodyTooLarge(HTTPException):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(status_code=400, detail=too_large_message(max_bytes))
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_upload_bytes: int,
+        paths: Iterable[str],
+        exclude_paths: Iterable[str] = (),
+    ) -> None:
+        self.app = app
+        self.max_upload_bytes = max_upload_bytes
+        self.max_body_bytes = max_upload_bytes + MULTIPART_OVERHEAD_BYTES
+        self.paths = tuple(paths)
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.paths)
+            or (self.exclude_paths and scope["path"].startswith(self.exclude_paths))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = _content_length(scope)
+        if content_length is not None and content_length > self.max_body_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise RequestBodyTooLarge(self.max_upload_bytes)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            # Raised outside of FastAPI's request handling (normally FastAPI turns it into a 400)
+            if not response_started:
+                await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            status_code=400,
+            content={"detail": too_large_message(self.max_upload_bytes)},
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
+
+
+def _content_length(scope: Scope) -> int | None:
+    for name, value in scope.get("headers", []):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
@@ -0,0 +1,115 @@
+import logging
+from typing import List, Optional
+
+import anyio
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse
+
+from app.config import BATCH_INPUT_ROOT, BATCH_MAX_FILES, UPLOAD_DIR
+from app.schemas.batch import BatchCreated
+from app.services.batch_service import BatchInput, BatchRunner, collect_audio_files
+from app.services.upload_service import InvalidUploadError, save_upload_async
+
+"""
+this route processes many recordings in one request.
+POST /process/batch accepts several uploaded files, or a directory on the server
+(under BATCH_INPUT_ROOT), and runs them through a pipelined transcribe ->
+summarize -> export executor in the background.
+GET /process/batch/{id} returns the batch manifest (per-file status, outputs and
+timings), and each output file can be downloaded once its file has finished.
+Progress events are published on /process/{id}/events.
+"""
+
+router = APIRouter(prefix="/process/batch", tags=["batch"])
+logger = logging.getLogger(__name__)
+
+
+def get_batch_runner(request: Request) -> BatchRunner:
+    return request.app.state.batch_runner
+
+
+@router.post("", response_model=BatchCreated, status_code=202)
+async def create_batch(
+    files: Optional[List[UploadFile]] = File(None),
+    directory: Optional[str] = Form(None, description="Server-side directory under BATCH_INPUT_ROOT"),
+    llm_provider: str = Query("claude", pattern="^(claude|openai)$"),
+    output: str = Query("json", pattern="^(json|docx)$"),
+    runner: BatchRunner = Depends(get_batch_runner),
+):
+    files = files or []
+    if bool(files) == bool(directory):
+        raise HTTPException(status_code=400, detail="Provide either uploaded files or a directory")
+
+    if directory:
+        inputs = await anyio.to_thread.run_sync(_directory_inputs, directory)
+    else:
+        if len(files) > BATCH_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Too many files (max {BATCH_MAX_FILES})")
+        inputs = []
+        for file in files:
+            try:
+                saved = await save_upload_async(file, UPLOAD_DIR)
+            except InvalidUploadError as e:
+                raise HTTPException(status_code=400, detail=f"{file.filename}: {e}")
+            inputs.append(BatchInput(saved.path, file.filename, saved.sha256))
+
+    try:
+        batch = runner.submit(inputs, llm_provider, docx=output == "docx")
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return BatchCreated(
+        batch_id=batch.batch_id,
+        status="queued",
+        files=len(inputs),
+        status_url=f"/process/batch/{batch.batch_id}",
+        events_url=f"/process/{batch.batch_id}/events",
+    )
+
+
+@router.get("/{batch_id}")
+def get_batch(batch_id: str, runner: BatchRunner = Depends(get_batch_runner)):
+    return _get_manifest_or_404(runner, batch_id)
+
+
+@router.get("/{batch_id}/files/{name}")
+def get_batch_file(batch_id: str, name: str, runner: BatchRunner = Depends(get_batch_runner)):
+    manifest = _get_manifest_or_404(runner, batch_id)
+    # Only files listed in the manifest can be downloaded
+    if not any(name in item["outputs"].values() for item in manifest["items"]):
+        raise HTTPException(status_code=404, detail="File not found in this batch")
+
+    path = runner.output_root / batch_id / name
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Batch output is no longer available")
+    media_type = (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        if path.suffix == ".docx" else "application/json"
+    )
+    return FileResponse(path, media_type=media_type, filename=name)
+
+
+def _directory_inputs(directory: str) -> List[BatchInput]:
+    if BATCH_INPUT_ROOT is None:
+        raise HTTPException(status_code=400, detail="Server-side directory input is disabled (BATCH_INPUT_ROOT is not set)")
+
+    root = BATCH_INPUT_ROOT.resolve()
+    path = (root / directory).resolve()
+    if not path.is_relative_to(root) or not path.is_dir():
+        raise HTTPException(status_code=400, detail="Directory not found under BATCH_INPUT_ROOT")
+
+    audio_files = collect_audio_files(path)
+    if not audio_files:
+        raise HTTPException(status_code=400, detail="No supported audio files in directory")
+    if len(audio_files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files (max {BATCH_MAX_FILES})")
+    return [BatchInput(p, p.name) for p in audio_files]
+
+
+def _get_manifest_or_404(runner: BatchRunner, batch_id: str) -> dict:
+    if not batch_id.isalnum():
+        raise HTTPException(status_code=404, detail="Batch not found")
+    manifest = runner.get_manifest(batch_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return manifest
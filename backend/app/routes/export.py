@@ -1,38 +1,72 @@
 from datetime import datetime, timezone
-from io import BytesIO
 from typing import Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 from fastapi.responses import StreamingResponse
 
+from app.config import EXPORT_BATCH_MAX_MEETINGS
+from app.schemas.export import ExportBatchRequest
 from app.schemas.meeting_summary import MeetingSummary
-from app.services.word_export_service import build_docx_from_summary, WordExportMetadata
+from app.services.export_batch_service import ExportRenderer, meeting_exports
+from app.services.export_metadata import WordExportMetadata
+from app.services.export_service import docx_response, export_response, get_exporter
 
 """
-this route handles exporting meeting summaries to Word documents.
-It accepts a MeetingSummary object and optional metadata, generates a .docx file,
+this route handles exporting meeting summaries to documents.
+It accepts a MeetingSummary object and optional metadata, renders it in the
+requested format (POST /export/docx, /export/markdown, /export/html, /export/jsonl)
 and returns it as a downloadable response.
+POST /export/batch exports many meetings at once: a single document with a table
+of contents (output=docx) or a ZIP with one document per meeting (output=zip),
+streamed while the documents are being rendered.
 """
 
 router = APIRouter(prefix="/export", tags=["export"])
 
-@router.post("/docx")
-def export_docx(
+def get_export_renderer(request: Request) -> ExportRenderer:
+    return request.app.state.export_renderer
+
+
+@router.post("/batch")
+async def export_batch(
+    export: ExportBatchRequest,
+    output: str = Query("docx", pattern="^(docx|zip)$"),
+    renderer: ExportRenderer = Depends(get_export_renderer),
+):
+    if len(export.meetings) > EXPORT_BATCH_MAX_MEETINGS:
+        raise HTTPException(status_code=400, detail=f"Too many meetings (max {EXPORT_BATCH_MAX_MEETINGS})")
+    meetings = meeting_exports(export.meetings)
+
+    if output == "zip":
+        return StreamingResponse(
+            renderer.stream_zip(meetings),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="meeting-notes.zip"'},
+        )
+
+    try:
+        document = await renderer.render_combined(export.title, meetings)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return docx_response(document)
+
+
+# Declared last: /export/batch must not be taken for a format
+@router.post("/{format}")
+async def export_summary(
     summary: MeetingSummary,
+    format: str = Path(..., description="Export format: docx, markdown, html or jsonl"),
     original_filename: Optional[str] = Query(default=None),
     llm_provider: Optional[str] = Query(default=None),
 ):
+    try:
+        exporter = get_exporter(format)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
     meta = WordExportMetadata(
         original_filename=original_filename,
         llm_provider=llm_provider,
         generated_at=datetime.now(timezone.utc),
     )
-
-    docx_bytes = build_docx_from_summary(summary=summary, transcript=None, meta=meta)
-
-    headers = {"Content-Disposition": 'attachment; filename="meeting-notes.docx"'}
-    return StreamingResponse(
-        BytesIO(docx_bytes),
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers=headers,
-    )
+    return await export_response(exporter, summary, meta)
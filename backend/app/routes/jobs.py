@@ -0,0 +1,96 @@
+import logging
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse
+
+from app.config import UPLOAD_DIR
+from app.schemas.job import JobCreated, JobStatus
+from app.services.job_service import JobRunner
+from app.services.job_store import JobRecord
+from app.services.upload_service import InvalidUploadError, save_upload
+
+"""
+this route exposes the processing pipeline as background jobs.
+POST /jobs stores the upload and returns a job id immediately,
+while a worker pool runs transcription, summarization and rendering.
+Clients poll GET /jobs/{id} for stage-level status and fetch the
+JSON or Word result from GET /jobs/{id}/result once the job succeeded.
+"""
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+logger = logging.getLogger(__name__)
+
+
+def get_job_runner(request: Request) -> JobRunner:
+    return request.app.state.job_runner
+
+
+@router.post("", response_model=JobCreated, status_code=202)
+def create_job(
+    file: UploadFile = File(...),
+    llm_provider: str = Query("claude", pattern="^(claude|openai)$"),
+    output: str = Query("json", pattern="^(json|docx)$"),
+    runner: JobRunner = Depends(get_job_runner),
+):
+    try:
+        saved = save_upload(file.file, file.filename, UPLOAD_DIR)
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        job = runner.submit(saved.path, file.filename, llm_provider, output, saved.sha256)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return JobCreated(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/jobs/{job.id}",
+        result_url=f"/jobs/{job.id}/result",
+    )
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+def get_job(job_id: str, runner: JobRunner = Depends(get_job_runner)):
+    job = _get_or_404(runner, job_id)
+    return JobStatus(
+        job_id=job.id,
+        status=job.status,
+        stage=job.stage,
+        stages=job.stages,
+        llm_provider=job.llm_provider,
+        output=job.output,
+        original_filename=job.original_filename,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str, runner: JobRunner = Depends(get_job_runner)):
+    job = _get_or_404(runner, job_id)
+
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is not finished yet (status={job.status})")
+
+    if job.output == "docx":
+        if not job.result_path or not Path(job.result_path).exists():
+            raise HTTPException(status_code=410, detail="Job result is no longer available")
+        return FileResponse(
+            job.result_path,
+            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            filename="meeting-notes.docx",
+        )
+
+    return {"transcript": job.transcript, "summary": job.summary}
+
+
+def _get_or_404(runner: JobRunner, job_id: str) -> JobRecord:
+    job = runner.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,121 @@
+import json
+import logging
+import tempfile
+import uuid
+from pathlib import Path
+from time import time
+from typing import Any, Dict
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.live_service import (
+    AudioFormat,
+    LiveSessionLimitError,
+    LiveWindowScheduler,
+    whisper_transcriber,
+)
+from app.services.meeting_store import save_meeting_safely
+from app.services.pipeline_service import summarize_transcript_async
+from app.services.trace_service import trace_context
+
+"""
+this route handles live meetings over a WebSocket.
+The client streams raw 16-bit little-endian PCM as binary messages (format given
+in the query string) and sends {"type": "stop"} when the meeting ends.
+While audio arrives, the server sends back:
+- {"type": "started", "session_id": ...} once the connection is accepted,
+- {"type": "transcript", "text": ..., "window": n, "audio_seconds": s} with the
+  new transcript text as each rolling window is transcribed,
+- {"type": "window_failed", ...} if a window could not be transcribed.
+After the stop message: {"type": "transcript_final", "transcript": ...}, then
+{"type": "summary", "summary": ..., "meeting_id": ...}, and the socket is closed.
+Only the last window and the summary are left to do when the meeting ends, so
+the summary follows within seconds. Errors are sent as {"type": "error", ...}.
+"""
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.websocket("/ws/live")
+async def live_meeting(
+    websocket: WebSocket,
+    llm_provider: str = Query("claude", pattern="^(claude|openai)$"),
+    sample_rate: int = Query(16000, ge=8000, le=48000),
+    channels: int = Query(1, ge=1, le=2),
+):
+    await websocket.accept()
+    session_id = uuid.uuid4().hex
+    clients = websocket.app.state.clients
+    meeting_store = getattr(websocket.app.state, "meeting_store", None)
+
+    async def send(event: Dict[str, Any]) -> None:
+        await websocket.send_json(event)
+
+    with trace_context(session_id), tempfile.TemporaryDirectory(prefix="live-") as work_dir:
+        audio = AudioFormat(sample_rate=sample_rate, channels=channels)
+        scheduler = LiveWindowScheduler(audio, whisper_transcriber(clients, Path(work_dir)), on_event=send)
+        logger.info("Live session started | rate=%d | channels=%d | llm=%s", sample_rate, channels, llm_provider)
+        await send({"type": "started", "session_id": session_id})
+
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+                if message.get("bytes"):
+                    await scheduler.feed(message["bytes"])
+                elif message.get("text") and _is_stop(message["text"]):
+                    break
+
+            stopped_at = time()
+            transcript = await scheduler.finish()
+            if not transcript.strip():
+                raise ValueError("No speech was transcribed")
+            logger.info("Live transcript completed (%.0fs of audio, %d chars)",
+                        scheduler.seconds_received, len(transcript))
+            await send({
+                "type": "transcript_final",
+                "transcript": transcript,
+                "audio_seconds": round(scheduler.seconds_received, 2),
+            })
+
+            summary = await summarize_transcript_async(transcript, llm_provider, clients)
+            meeting_id = await run_in_threadpool(
+                save_meeting_safely, meeting_store, summary, transcript, "live meeting", llm_provider,
+            )
+            logger.info("Live summary ready %.1fs after the meeting ended", time() - stopped_at)
+            await send({"type": "summary", "summary": summary.model_dump(), "meeting_id": meeting_id})
+            await websocket.close()
+
+        except WebSocketDisconnect:
+            logger.info("Live session disconnected")
+            await scheduler.cancel()
+        except (LiveSessionLimitError, ValueError) as e:
+            await scheduler.cancel()
+            await _close_with_error(websocket, str(e), status.WS_1008_POLICY_VIOLATION)
+        except RuntimeError as e:
+            logger.error("Live session failed: %s", str(e))
+            await scheduler.cancel()
+            await _close_with_error(websocket, str(e), status.WS_1011_INTERNAL_ERROR)
+        except Exception as e:
+            logger.exception("Unexpected error during live session")
+            await scheduler.cancel()
+            await _close_with_error(websocket, f"Unexpected error: {e}", status.WS_1011_INTERNAL_ERROR)
+
+
+def _is_stop(text: str) -> bool:
+    try:
+        message = json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(message, dict) and message.get("type") == "stop"
+
+
+async def _close_with_error(websocket: WebSocket, detail: str, code: int) -> None:
+    try:
+        await websocket.send_json({"type": "error", "detail": detail})
+        await websocket.close(code=code)
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # the client is already gone
@@ -0,0 +1,55 @@
+from typing import List, Optional
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+
+from app.schemas.meeting import MeetingSearchHit, StoredActionItem, StoredMeeting
+from app.services.meeting_store import MeetingStore
+
+"""
+this route looks up meetings that were processed earlier, from the meeting store.
+GET /meetings/search?q= runs a full-text search over summaries and transcripts,
+GET /meetings/{id} returns one stored meeting and GET /action-items lists action
+items, optionally for one owner.
+"""
+
+router = APIRouter(tags=["meetings"])
+
+
+def get_meeting_store(request: Request) -> MeetingStore:
+    store = request.app.state.meeting_store
+    if store is None:
+        raise HTTPException(status_code=503, detail="The meeting store is disabled (MEETING_STORE_ENABLED)")
+    return store
+
+
+@router.get("/meetings/search", response_model=List[MeetingSearchHit])
+async def search_meetings(
+    q: str = Query(..., min_length=1, max_length=500, description="Words to search for; word* for a prefix"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    store: MeetingStore = Depends(get_meeting_store),
+):
+    return await anyio.to_thread.run_sync(store.search, q, limit, offset)
+
+
+@router.get("/meetings/{meeting_id}", response_model=StoredMeeting)
+async def get_meeting(
+    meeting_id: str = Path(..., pattern="^[0-9a-f]{32}$"),
+    store: MeetingStore = Depends(get_meeting_store),
+):
+    meeting = await anyio.to_thread.run_sync(store.get, meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return meeting
+
+
+@router.get("/action-items", response_model=List[StoredActionItem])
+async def list_action_items(
+    owner: Optional[str] = Query(None, min_length=1, description="Owner name (case-insensitive)"),
+    priority: Optional[str] = Query(None, pattern="^(low|medium|high)$"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    store: MeetingStore = Depends(get_meeting_store),
+):
+    return await anyio.to_thread.run_sync(store.action_items, owner, priority, limit, offset)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from app.services.metrics_service import CONTENT_TYPE, registry, stats_collector
+from app.services.single_flight_service import summary_flights, transcription_flights
+from app.services.summary_cache_service import summary_cache
+from app.services.transcript_cache_service import transcript_cache
+from app.services.upload_service import upload_storage
+
+"""
+this route exposes the Prometheus metrics: request and pipeline stage latency
+histograms, provider tokens and retries, and the counters also shown on /stats.
+"""
+
+router = APIRouter()
+
+registry.add_collector(stats_collector(
+    "transcript_cache", "Transcript cache counters and size.", transcript_cache.stats,
+))
+registry.add_collector(stats_collector(
+    "summary_cache", "Summary cache counters and size.", summary_cache.stats,
+))
+registry.add_collector(stats_collector(
+    "transcription_flights", "Transcription calls, and the ones that joined an identical call in flight.",
+    transcription_flights.stats,
+))
+registry.add_collector(stats_collector(
+    "summary_flights", "Summary calls, and the ones that joined an identical call in flight.", summary_flights.stats,
+))
+registry.add_collector(stats_collector(
+    "uploads", "Upload directory disk use and stored uploads.", upload_storage.stats,
+))
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request):
+    meeting_store = getattr(request.app.state, "meeting_store", None)
+    extra = []
+    if meeting_store is not None:
+        extra.append(stats_collector("meeting_store", "Meetings and action items stored.", meeting_store.stats))
+    return Response(registry.render(extra), media_type=CONTENT_TYPE)
@@ -1,110 +1,168 @@
 import logging
 import uuid
-from pathlib import Path
-
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from io import BytesIO
 from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from time import time
 
-from app.config import UPLOAD_DIR, ALLOWED_EXTENSIONS
-from app.config import MAX_AUDIO_SIZE_BYTES, MAX_AUDIO_SIZE_MB
-from app.schemas.meeting_summary import MeetingSummary
-from app.services.whisper_service import transcribe_with_whisper
-from app.services.openai_summary_service import summarize_transcript_with_openai
-from app.services.claude_summary_service import summarize_transcript_with_claude
-from app.services.word_export_service import build_docx_from_summary, WordExportMetadata
+from app.config import UPLOAD_DIR
+from app.services.client_registry import ClientRegistry, get_clients
+from app.services.transcript_cache_service import transcribe_with_cache_async
+from app.services.export_service import export_response, get_exporter
+from app.services.meeting_store import MeetingStore, save_meeting_safely
+from app.services.pipeline_service import summarize_transcript_async
+from app.services.progress_service import ChannelInUseError, ProgressReporter, progress_tracker
+from app.services.upload_service import InvalidUploadError, save_upload_async, upload_storage
+from app.services.export_metadata import WordExportMetadata
 
 """
 this route handles the complete process of uploading an audio file,
 transcribing it, summarizing the transcript using a chosen LLM provider,
-and returning either a JSON response or a Word document.
+and returning either a JSON response or the summary in an export format
+(a Word document, Markdown, HTML or JSON Lines).
 It validates the uploaded file's size, name, and extension, manages the workflow,
 and handles errors appropriately.
+The upload is streamed to disk and rejected as soon as it exceeds the size limit.
+Stage events (and partial LLM output) are published for the run's process id and
+can be followed through the /process/{process_id}/events SSE stream; the id is
+refused (409) while another run uses it, and unknown ids get a 404.
+The result is saved to the meeting store; its id is returned in X-Meeting-Id.
 """
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+PROCESS_ID_PATTERN = "^[A-Za-z0-9_-]{1,64}$"
+
+
+def get_meeting_store(request: Request) -> Optional[MeetingStore]:
+    return getattr(request.app.state, "meeting_store", None)
+
+
 @router.post("/process")
 
-def process_audio(
+async def process_audio(
     file: UploadFile = File(...),
     llm_provider: str = Query("claude", pattern="^(claude|openai)$"),
-    output: str = Query("json", pattern="^(json|docx)$"),
+    output: str = Query("json", description="json, or an export format: docx, markdown, html, jsonl"),
+    process_id: Optional[str] = Query(
+        None,
+        pattern=PROCESS_ID_PATTERN,
+        description="Client-chosen id for following progress at /process/{process_id}/events; "
+                    "must not be in use by a running or recently finished run",
+    ),
+    clients: ClientRegistry = Depends(get_clients),
+    meeting_store: Optional[MeetingStore] = Depends(get_meeting_store),
 ):
     start_time = time()
-    logger.info("Process started | file=%s | llm=%s | output=%s",
-                file.filename, llm_provider, output)
-    
-    if file.size and file.size > MAX_AUDIO_SIZE_BYTES:
-        logger.warning(
-            "Audio file too large",
-            extra={"size_bytes": file.size, "max_bytes": MAX_AUDIO_SIZE_BYTES}
-        )
-        raise HTTPException(
-            status_code=400,
-            detail=(
-                f"Audio file is too large ({file.size / (1024*1024):.1f} MB). "
-                f"Maximum supported size is {MAX_AUDIO_SIZE_MB} MB. "
-                "Please upload a shorter file or convert it to MP3/WAV."
-            )
-        )
+    # Resolved before the progress channel is opened, so a bad format leaves no channel behind
+    try:
+        exporter = None if output == "json" else get_exporter(output)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    process_id = process_id or uuid.uuid4().hex
     try:
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="Missing filename")
-        ext = Path(file.filename).suffix.lower()
-        if ext not in ALLOWED_EXTENSIONS:
-            raise HTTPException(status_code=400, detail=f"Unsupported file type: {ext}")
+        progress_tracker.open(process_id)
+    except ChannelInUseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    progress = ProgressReporter(process_id)
+    id_header = {"X-Process-Id": process_id}
+    logger.info("Process started | id=%s | file=%s | llm=%s | output=%s",
+                process_id, file.filename, llm_provider, output)
 
+    # Published as `failed` on every exit that is not `done`, including a client disconnect
+    failure: Optional[str] = "Request cancelled"
+    try:
         logger.info("Saving uploaded file")
-        saved_name = f"{uuid.uuid4().hex}{ext}"
-        saved_path = UPLOAD_DIR / saved_name
-        with saved_path.open("wb") as f:
-            f.write(file.file.read())
-        logger.info("Saved file as %s", saved_name)
+        try:
+            saved = await save_upload_async(file, UPLOAD_DIR)
+        except InvalidUploadError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        logger.info("Saved file as %s%s", saved.saved_name, " (already stored)" if saved.deduplicated else "")
+        progress.stage("uploaded", size_bytes=saved.size_bytes)
 
         logger.info("Starting transcription")
-        transcript = transcribe_with_whisper(str(saved_path))
+        progress.stage("transcribing")
+        with upload_storage.hold(saved.path):
+            transcript = await transcribe_with_cache_async(
+                str(saved.path),
+                saved.sha256,
+                clients,
+                on_chunk_done=progress.chunk_done("transcribing"),
+            )
+            await run_in_threadpool(upload_storage.transcribed, saved.path)
         logger.info("Transcription completed (%d chars)", len(transcript))
+        progress.stage("transcribed", chars=len(transcript))
 
         logger.info("Starting summarization using %s", llm_provider)
-        if llm_provider == "openai":
-            summary_data = summarize_transcript_with_openai(transcript)
-        else:
-            summary_data = summarize_transcript_with_claude(transcript)
-
-        summary = MeetingSummary.model_validate(summary_data)
+        progress.stage("summarizing", llm_provider=llm_provider)
+        summary = await summarize_transcript_async(transcript, llm_provider, clients, progress)
         logger.info("Summarization completed")
+        progress.stage("summarized")
+
+        meeting_id = await run_in_threadpool(
+            save_meeting_safely, meeting_store, summary, transcript, file.filename, llm_provider, saved.sha256,
+        )
+        if meeting_id:
+            id_header["X-Meeting-Id"] = meeting_id
 
-        if output == "docx":
-            logger.info("Generating Word document")
+        if exporter is not None:
+            logger.info("Generating %s output", exporter.name)
+            progress.stage("rendering", format=exporter.name)
             meta = WordExportMetadata(
                 original_filename=file.filename,
                 llm_provider=llm_provider,
                 generated_at=datetime.now(timezone.utc),
             )
-            docx_bytes = build_docx_from_summary(summary=summary, transcript=transcript, meta=meta)
-            headers = {"Content-Disposition": 'attachment; filename="meeting-notes.docx"'}
-            
-            logger.info("Word document generated")
+            response = await export_response(exporter, summary, meta, headers=id_header)
             elapsed = round(time() - start_time, 2)
             logger.info("Process completed successfully in %ss", elapsed)
-            return StreamingResponse(
-                BytesIO(docx_bytes),
-                media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                headers=headers,
-            )
-            
+            failure = None
+            progress.stage("done")
+            return response
+
         elapsed = round(time() - start_time, 2)
         logger.info("Process completed successfully in %ss", elapsed)
-        return {"transcript": transcript, "summary": summary.model_dump()}
+        failure = None
+        progress.stage("done")
+        return JSONResponse(
+            {"transcript": transcript, "summary": summary.model_dump()},
+            headers=id_header,
+        )
 
+    except HTTPException as e:
+        failure = str(e.detail)
+        raise
     except RuntimeError as e:
         logger.error("Process failed: %s", str(e))
+        failure = str(e)
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.exception("Unexpected error during process")
+        failure = "Unexpected error"
         raise HTTPException(status_code=500, detail=f"Unexpected error: {e}")
+    finally:
+        if failure is not None:
+            progress.stage("failed", error=failure)
+
+
+@router.get("/process/{process_id}/events")
+async def process_events(process_id: str = Path(..., pattern=PROCESS_ID_PATTERN)):
+    """Server-Sent Events stream of stage events for a /process run, background job or batch."""
+    if not progress_tracker.exists(process_id):
+        raise HTTPException(status_code=404, detail="No run with this id is in progress or recently finished")
+
+    async def event_stream():
+        async for event in progress_tracker.subscribe(process_id):
+            # None means no event for a while - send an SSE comment to keep the connection open
+            yield ": keep-alive\n\n" if event is None else event.to_sse()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Request
+
+from app.services.single_flight_service import summary_flights, transcription_flights
+from app.services.summary_cache_service import summary_cache
+from app.services.transcript_cache_service import transcript_cache
+from app.services.upload_service import upload_storage
+
+"""
+this route exposes runtime statistics such as cache hit/miss counters
+and the number of coalesced (deduplicated) in-flight API calls.
+"""
+
+router = APIRouter()
+
+@router.get("/stats")
+def get_stats(request: Request):
+    meeting_store = getattr(request.app.state, "meeting_store", None)
+    return {
+        "transcript_cache": transcript_cache.stats(),
+        "summary_cache": summary_cache.stats(),
+        # Calls that joined an identical in-flight call instead of hitting the API again
+        "coalescing": {
+            "transcriptions": transcription_flights.stats(),
+            "summaries": summary_flights.stats(),
+        },
+        # Disk use of the upload directory and what the janitor removed
+        "uploads": upload_storage.stats(),
+        "meeting_store": meeting_store.stats() if meeting_store is not None else None,
+    }
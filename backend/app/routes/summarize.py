@@ -1,14 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 
 from app.schemas.meeting_summary import MeetingSummary
-from app.services.openai_summary_service import summarize_transcript_with_openai
-from app.services.claude_summary_service import summarize_transcript_with_claude
+from app.services.client_registry import ClientRegistry, get_clients
+from app.services.pipeline_service import summarize_transcript_async, update_summary_async
 
 """
 this route handles summarization of transcripts using LLMs.
 It accepts a transcript in the request body and returns a structured summary.
-- It supports two LLM providers: OpenAI and Claude.
+- It supports two LLM providers: OpenAI and Claude (default).
+- Identical requests are served from the summary cache.
+- /summarize/incremental updates a previous summary after the transcript was
+  edited or continued, sending only the changed part to the LLM; the
+  X-Summary-Mode header tells whether it was "incremental", "full" (the change
+  was too large, the transcript was summarized again) or "unchanged".
 """
 
 router = APIRouter()
@@ -16,12 +21,35 @@ router = APIRouter()
 class SummarizeRequest(BaseModel):
     transcript: str
 
+class IncrementalSummarizeRequest(BaseModel):
+    previous_summary: MeetingSummary
+    previous_transcript: str
+    transcript: str
+
 @router.post("/summarize", response_model=MeetingSummary)
-def summarize(req: SummarizeRequest):
+async def summarize(
+    req: SummarizeRequest,
+    llm_provider: str = Query("claude", pattern="^(claude|openai)$"),
+    clients: ClientRegistry = Depends(get_clients),
+):
+    try:
+        return await summarize_transcript_async(req.transcript, llm_provider, clients)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.post("/summarize/incremental", response_model=MeetingSummary)
+async def summarize_incremental(
+    req: IncrementalSummarizeRequest,
+    response: Response,
+    llm_provider: str = Query("claude", pattern="^(claude|openai)$"),
+    clients: ClientRegistry = Depends(get_clients),
+):
     try:
-        # 2 options for LLMs - choose one and comment the other
-        # data = summarize_transcript_with_openai(req.transcript)
-        data = summarize_transcript_with_claude(req.transcript)
-        return MeetingSummary.model_validate(data)
+        revision = await update_summary_async(
+            req.previous_summary, req.previous_transcript, req.transcript, llm_provider, clients,
+        )
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    response.headers["X-Summary-Mode"] = revision.mode
+    return revision.summary
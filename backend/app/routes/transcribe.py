@@ -1,48 +1,41 @@
-import uuid
-from pathlib import Path
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-
-from app.config import UPLOAD_DIR, ALLOWED_EXTENSIONS
-from app.services.whisper_service import transcribe_with_whisper
+from app.config import UPLOAD_DIR
+from app.services.client_registry import ClientRegistry, get_clients
+from app.services.transcript_cache_service import transcribe_with_cache_async
+from app.services.upload_service import InvalidUploadError, save_upload_async, upload_storage
 
 """
 this route handles audio file uploads and transcription using Whisper.
 It validates the uploaded file's name and extension, saves it to the server,
 and returns the transcription result.
+Transcripts are cached by the audio content hash, so re-uploading the same
+recording does not call Whisper again.
 """
 router = APIRouter()
 
 @router.post("/transcribe")
-async def transcribe_audio(file: UploadFile = File(...)):
-
-    # Validate file name and extension
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="Missing filename")
-    
-    ext = Path(file.filename).suffix.lower()
-    if ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type: {ext}. Allowed: {sorted(ALLOWED_EXTENSIONS)}",
-        )
+async def transcribe_audio(
+    file: UploadFile = File(...),
+    clients: ClientRegistry = Depends(get_clients),
+):
 
-    saved_name = f"{uuid.uuid4().hex}{ext}"  # to avoid collisions and prevent relying on user-provided file names. The original filename is kept only for reference.
-    saved_path = UPLOAD_DIR / saved_name
-
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Empty file")
-    
-    saved_path.write_bytes(content)
+    # Validate file name and extension, then save the upload while hashing it
+    try:
+        saved = await save_upload_async(file, UPLOAD_DIR)
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     try:
-        transcript = transcribe_with_whisper(str(saved_path))
+        with upload_storage.hold(saved.path):
+            transcript = await transcribe_with_cache_async(str(saved.path), saved.sha256, clients)
+            await run_in_threadpool(upload_storage.transcribed, saved.path)
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
 
     return{
         "original_filename": file.filename,
-        "saved_filename": saved_name,
+        "saved_filename": saved.saved_name,
         "transcript": transcript,
     }
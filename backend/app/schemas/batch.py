@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Literal
+from pydantic import BaseModel
+
+"""
+This file defines the schemas returned by the batch processing endpoints.
+"""
+
+
+class BatchCreated(BaseModel):
+    batch_id: str
+    status: Literal["queued"]
+    files: int
+    status_url: str
+    events_url: str
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.schemas.meeting_summary import MeetingSummary
+
+"""
+This file defines the request schema of the multi-meeting export endpoint.
+"""
+
+
+class ExportMeeting(BaseModel):
+    summary: MeetingSummary
+    title: Optional[str] = Field(None, description="Heading for the meeting; defaults to the file name")
+    original_filename: Optional[str] = None
+    llm_provider: Optional[str] = None
+    generated_at: Optional[datetime] = None
+
+
+class ExportBatchRequest(BaseModel):
+    title: str = Field("Meeting Notes", min_length=1, description="Title of the combined document")
+    meetings: List[ExportMeeting] = Field(..., min_length=1)
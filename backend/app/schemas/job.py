@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel, Field
+
+"""
+This file defines the schemas returned by the background job endpoints.
+"""
+
+JobStatusValue = Literal["queued", "running", "succeeded", "failed"]
+JobStageValue = Literal["transcribing", "summarizing", "rendering"]
+
+
+class JobCreated(BaseModel):
+    job_id: str
+    status: JobStatusValue
+    status_url: str
+    result_url: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: JobStatusValue
+    stage: Optional[JobStageValue] = Field(None, description="Stage currently running, if any")
+    stages: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="Per-stage status and timings")
+    llm_provider: str
+    output: str
+    original_filename: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.schemas.meeting_summary import MeetingSummary
+
+"""
+This file defines the schemas returned by the meeting store endpoints.
+"""
+
+
+class StoredMeeting(BaseModel):
+    id: str
+    original_filename: Optional[str] = None
+    llm_provider: Optional[str] = None
+    created_at: str
+    transcript: str
+    summary: MeetingSummary
+
+
+class MeetingSearchHit(BaseModel):
+    id: str
+    original_filename: Optional[str] = None
+    llm_provider: Optional[str] = None
+    created_at: str
+    meeting_summary: str
+    participants: List[str] = Field(default_factory=list)
+    decisions: List[str] = Field(default_factory=list)
+    snippet: str = Field(..., description="Best matching passage, matches in [brackets]")
+    score: float = Field(..., description="Relevance (bm25), higher is better")
+
+
+class StoredActionItem(BaseModel):
+    meeting_id: str
+    original_filename: Optional[str] = None
+    created_at: str
+    task: str
+    owner: Optional[str] = None
+    due_date: Optional[str] = None
+    priority: Optional[str] = None
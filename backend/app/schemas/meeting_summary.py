@@ -6,6 +6,7 @@ from pydantic import BaseModel, Field
 """
 This file defines the MeetingSummary schema used for structured meeting summaries.
 It includes fields for overall summary, participants, decisions, and action items.
+SummaryUpdate describes the changes to a summary after its transcript was edited.
 """
 
 Priority = Literal["low", "medium", "high"]
@@ -22,3 +23,20 @@ class MeetingSummary(BaseModel):
     participants: List[str] = Field(default_factory=list)
     decisions: List[str] = Field(default_factory=list)
     action_items: List[ActionItem] = Field(default_factory=list)
+
+
+class NameChange(BaseModel):
+    old: str = Field(..., min_length=1)
+    new: str = Field(..., min_length=1)
+
+
+class SummaryUpdate(BaseModel):
+    """Changes to a MeetingSummary implied by an edit of its transcript (see incremental summarization)."""
+    meeting_summary: str = Field(..., min_length=1, description="Overview after the edit")
+    participants_added: List[str] = Field(default_factory=list)
+    participants_removed: List[str] = Field(default_factory=list)
+    decisions_added: List[str] = Field(default_factory=list)
+    decisions_removed: List[str] = Field(default_factory=list)
+    action_items_added: List[ActionItem] = Field(default_factory=list)
+    action_items_removed: List[str] = Field(default_factory=list, description="Tasks of the removed items")
+    renamed: List[NameChange] = Field(default_factory=list)
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import mmap
+import re
+import wave
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from math import ceil, sqrt
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from app.config import WHISPER_CHUNK_OVERLAP_SECONDS
+
+"""
+This file splits long recordings into overlapping chunks that fit under the
+Whisper request size limit, transcribes them concurrently and stitches the
+partial transcripts back together.
+- WAV files are cut at the quietest point near each chunk boundary.
+- MP3 files are cut at frame boundaries (no decoding needed).
+"""
+
+# Window used when looking for silence near a WAV cut point
+SILENCE_WINDOW_SECONDS = 0.05
+SILENCE_SEARCH_SECONDS = 10.0
+
+# The overlap between chunks is looked for only in the words that can have been spoken
+# during it (at most this fast, plus slack for Whisper's word boundaries), so a phrase
+# repeated elsewhere near a chunk edge is not mistaken for the overlap
+STITCH_MAX_WORDS_PER_SECOND = 4.0
+STITCH_SLACK_WORDS = 3
+STITCH_MIN_MATCH_WORDS = 3
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    index: int
+    path: Path
+    start_seconds: float
+    end_seconds: float
+
+
+def split_audio(
+    file_path: str | Path,
+    out_dir: str | Path,
+    max_chunk_bytes: int,
+    overlap_seconds: float,
+) -> List[AudioChunk]:
+    path = Path(file_path)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    ext = path.suffix.lower()
+    if ext == ".wav":
+        return _split_wav(path, out, max_chunk_bytes, overlap_seconds)
+    if ext == ".mp3":
+        return _split_mp3(path, out, max_chunk_bytes, overlap_seconds)
+    raise ValueError(f"Unsupported audio format for chunking: {ext}")
+
+
+def audio_duration_seconds(file_path: str | Path) -> Optional[float]:
+    """
+    Duration of a WAV or MP3 file from its headers, without reading the audio.
+    MP3 durations assume a constant bitrate (estimated from the first frame).
+    None when the format is not supported or the file can't be parsed.
+    """
+    path = Path(file_path)
+    ext = path.suffix.lower()
+    try:
+        if ext == ".wav":
+            with wave.open(str(path), "rb") as src:
+                return src.getnframes() / src.getframerate()
+        if ext == ".mp3":
+            with path.open("rb") as src:
+                head = src.read(64 * 1024)
+            start = 0
+            if head[:3] == b"ID3" and len(head) >= 10:
+                start = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+            for pos in range(start, len(head) - 4):
+                frame = _parse_mp3_header(head, pos)
+                if frame is not None:
+                    length, seconds = frame
+                    return (path.stat().st_size - pos) / length * seconds
+    except (OSError, EOFError, wave.Error, ZeroDivisionError):
+        return None
+    return None
+
+
+def transcribe_chunks(
+    chunks: Sequence[AudioChunk],
+    transcribe_one: Callable[[AudioChunk], str],
+    max_workers: int,
+    on_chunk_done: Optional[Callable[[int, int], None]] = None,
+) -> List[str]:
+    if not chunks:
+        return []
+    workers = max(1, min(max_workers, len(chunks)))
+    texts: List[Optional[str]] = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="whisper-chunk") as pool:
+        futures = {pool.submit(transcribe_one, c): i for i, c in enumerate(chunks)}
+        # Results are stored by index to keep the chunk order regardless of completion order
+        for done, future in enumerate(as_completed(futures), start=1):
+            texts[futures[future]] = future.result()
+            if on_chunk_done:
+                on_chunk_done(done, len(chunks))
+    return texts
+
+
+def stitch_transcripts(texts: Sequence[str], overlap_seconds: float = WHISPER_CHUNK_OVERLAP_SECONDS) -> str:
+    """Join the texts of consecutive chunks that overlap by `overlap_seconds`, without repeating the overlap."""
+    boundary = ceil(overlap_seconds * STITCH_MAX_WORDS_PER_SECOND) + STITCH_SLACK_WORDS
+    words: List[str] = []
+    for text in texts:
+        nxt = (text or "").split()
+        if not nxt:
+            continue
+        if not words:
+            words = nxt
+            continue
+        words = _merge_overlap(words, nxt, boundary)
+    return " ".join(words)
+
+
+def _merge_overlap(left: List[str], right: List[str], boundary: int) -> List[str]:
+    # The match has to end in the last `boundary` words of left and start in the first of right
+    tail = left[-boundary:]
+    head = right[:boundary]
+    tail_norm = [_normalize_word(w) for w in tail]
+    head_norm = [_normalize_word(w) for w in head]
+
+    match = SequenceMatcher(None, tail_norm, head_norm, autojunk=False).find_longest_match(
+        0, len(tail_norm), 0, len(head_norm)
+    )
+    if match.size < STITCH_MIN_MATCH_WORDS:
+        return left + right
+
+    cut_left = len(left) - len(tail) + match.a + match.size
+    cut_right = match.b + match.size
+    return left[:cut_left] + right[cut_right:]
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+# ---------------------------------------------------------------------------
+# WAV
+# ---------------------------------------------------------------------------
+
+def _split_wav(path: Path, out: Path, max_chunk_bytes: int, overlap_seconds: float) -> List[AudioChunk]:
+    with wave.open(str(path), "rb") as src:
+        params = src.getparams()
+        frame_bytes = params.sampwidth * params.nchannels
+        rate = params.framerate
+        total_frames = params.nframes
+
+        # Leave room for the RIFF header of each chunk file
+        max_frames = max(1, (max_chunk_bytes - 64) // frame_bytes)
+        overlap_frames = int(overlap_seconds * rate)
+        if overlap_frames >= max_frames // 2:
+            overlap_frames = max_frames // 4
+
+        chunks: List[AudioChunk] = []
+        start = 0
+        while start < total_frames:
+            end = min(start + max_frames, total_frames)
+            if end < total_frames:
+                end = _quietest_frame(src, params, start, end, overlap_frames)
+
+            src.setpos(start)
+            data = src.readframes(end - start)
+            chunk_path = out / f"chunk_{len(chunks):04d}.wav"
+            with wave.open(str(chunk_path), "wb") as dst:
+                dst.setnchannels(params.nchannels)
+                dst.setsampwidth(params.sampwidth)
+                dst.setframerate(rate)
+                dst.writeframes(data)
+
+            chunks.append(AudioChunk(
+                index=len(chunks),
+                path=chunk_path,
+                start_seconds=start / rate,
+                end_seconds=end / rate,
+            ))
+
+            if end >= total_frames:
+                break
+            start = max(end - overlap_frames, start + 1)
+
+    return chunks
+
+
+def _quietest_frame(src: wave.Wave_read, params, start: int, end: int, overlap_frames: int) -> int:
+    """Return the frame index of the quietest window shortly before `end`."""
+    rate = params.framerate
+    search_frames = int(SILENCE_SEARCH_SECONDS * rate)
+    # Never move the cut so far back that the next chunk makes no progress
+    search_start = max(start + 2 * overlap_frames + 1, end - search_frames)
+    if search_start >= end:
+        return end
+
+    src.setpos(search_start)
+    data = src.readframes(end - search_start)
+    samples = _decode_samples(data, params.sampwidth)
+    if samples is None:
+        return end
+
+    window = max(1, int(SILENCE_WINDOW_SECONDS * rate)) * params.nchannels
+    best_pos, best_rms = end, None
+    for i in range(0, len(samples) - window + 1, window):
+        seg = samples[i:i + window]
+        rms = sqrt(sum(s * s for s in seg) / len(seg))
+        if best_rms is None or rms < best_rms:
+            best_rms = rms
+            best_pos = search_start + (i + window // 2) // params.nchannels
+    return best_pos
+
+
+def _decode_samples(data: bytes, sampwidth: int) -> Optional[array]:
+    if sampwidth == 1:
+        # 8-bit WAV is unsigned, centre it around zero
+        return array("b", bytes((b - 128) & 0xFF for b in data))
+    if sampwidth == 2:
+        return array("h", data)
+    if sampwidth == 4:
+        return array("i", data)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# MP3
+# ---------------------------------------------------------------------------
+
+_MP3_BITRATES = {
+    # (version_is_mpeg1, layer) -> kbps table indexed by bitrate bits
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG 1
+    2: [22050, 24000, 16000],  # MPEG 2
+    0: [11025, 12000, 8000],   # MPEG 2.5
+}
+
+
+@dataclass(frozen=True)
+class _Mp3Frame:
+    offset: int
+    length: int
+    seconds: float
+
+
+def _split_mp3(path: Path, out: Path, max_chunk_bytes: int, overlap_seconds: float) -> List[AudioChunk]:
+    with path.open("rb") as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return _write_mp3_chunks(data, out, max_chunk_bytes, overlap_seconds)
+
+
+def _write_mp3_chunks(data, out: Path, max_chunk_bytes: int, overlap_seconds: float) -> List[AudioChunk]:
+    frames = _parse_mp3_frames(data)
+    if not frames:
+        raise ValueError("Could not find MP3 frames in the uploaded file")
+
+    chunks: List[AudioChunk] = []
+    elapsed = [0.0]
+    for f in frames:
+        elapsed.append(elapsed[-1] + f.seconds)
+
+    start = 0
+    while start < len(frames):
+        size = 0
+        end = start
+        while end < len(frames) and size + frames[end].length <= max_chunk_bytes:
+            size += frames[end].length
+            end += 1
+        end = max(end, start + 1)
+
+        chunk_path = out / f"chunk_{len(chunks):04d}.mp3"
+        with chunk_path.open("wb") as dst:
+            for f in frames[start:end]:
+                dst.write(data[f.offset:f.offset + f.length])
+
+        chunks.append(AudioChunk(
+            index=len(chunks),
+            path=chunk_path,
+            start_seconds=elapsed[start],
+            end_seconds=elapsed[end],
+        ))
+
+        if end >= len(frames):
+            break
+
+        # Step back by roughly `overlap_seconds` worth of frames
+        nxt = end
+        while nxt > start + 1 and elapsed[end] - elapsed[nxt - 1] <= overlap_seconds:
+            nxt -= 1
+        start = max(nxt, start + (end - start) // 2, start + 1)
+
+    return chunks
+
+
+def _parse_mp3_frames(data) -> List[_Mp3Frame]:
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size
+
+    frames: List[_Mp3Frame] = []
+    n = len(data)
+    while pos + 4 <= n:
+        header = _parse_mp3_header(data, pos)
+        if header is None:
+            pos += 1
+            continue
+        length, seconds = header
+        if pos + length > n:
+            break
+        frames.append(_Mp3Frame(offset=pos, length=length, seconds=seconds))
+        pos += length
+    return frames
+
+
+def _parse_mp3_header(data, pos: int) -> Optional[tuple[int, float]]:
+    b1, b2 = data[pos + 1], data[pos + 2]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    if version == 1 or layer_bits != 1:  # reserved version, or not Layer III
+        return None
+
+    bitrate_idx = (b2 >> 4) & 0x0F
+    rate_idx = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+    if bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, 3)][bitrate_idx] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_idx]
+    samples = 1152 if mpeg1 else 576
+
+    length = (samples // 8) * bitrate // sample_rate + padding
+    if length < 4:
+        return None
+    return length, samples / sample_rate
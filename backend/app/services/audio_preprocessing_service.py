@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import shutil
+import subprocess
+import warnings
+import wave
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Optional
+
+from app.config import (
+    AUDIO_MAX_SILENCE_SECONDS,
+    AUDIO_PREPROCESS_ENABLED,
+    AUDIO_PREPROCESS_MIN_BYTES,
+    AUDIO_PREPROCESS_MP3_BITRATE,
+    AUDIO_PREPROCESS_SAMPLE_RATE,
+    AUDIO_SILENCE_PAD_SECONDS,
+    AUDIO_SILENCE_THRESHOLD_DB,
+    FFMPEG_PATH,
+)
+from app.services.audio_chunking_service import audio_duration_seconds
+from app.services.metrics_service import (
+    AUDIO_PREPROCESS_SAVED_BYTES,
+    AUDIO_PREPROCESS_SAVED_SECONDS,
+    STAGE_SECONDS,
+)
+
+try:  # deprecated in the standard library; the audioop-lts package provides it on Python 3.13+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+"""
+This file shrinks recordings before they are uploaded to Whisper: the audio is
+downmixed to mono, resampled to 16 kHz, leading/trailing silence is cut and long
+pauses are shortened, which Whisper does not need to transcribe the speech.
+- With ffmpeg installed, any input is re-encoded as low-bitrate MP3 (which the
+  chunker can still split for very long meetings).
+- Without it, WAV files are converted in Python to 16-bit mono WAV; other
+  formats are sent unchanged.
+- Small files, and files that would not get smaller, are sent as they are.
+The bytes and seconds saved are logged and exported as metrics.
+PREPROCESS_FINGERPRINT identifies the settings, so transcripts of audio prepared
+differently are cached apart.
+"""
+
+logger = logging.getLogger(__name__)
+
+_FAILURES = (RuntimeError, ValueError, OSError, EOFError, wave.Error) + ((audioop.error,) if audioop else ())
+
+# Silence is detected over windows of this length
+SILENCE_WINDOW_SECONDS = 0.03
+
+# "raw" when pre-processing is off, otherwise a short hash of everything that shapes its output
+PREPROCESS_FINGERPRINT = "raw" if not AUDIO_PREPROCESS_ENABLED else "pp-" + hashlib.sha256(
+    repr((
+        AUDIO_PREPROCESS_MIN_BYTES,
+        AUDIO_PREPROCESS_SAMPLE_RATE,
+        AUDIO_PREPROCESS_MP3_BITRATE,
+        AUDIO_SILENCE_THRESHOLD_DB,
+        AUDIO_MAX_SILENCE_SECONDS,
+        AUDIO_SILENCE_PAD_SECONDS,
+        SILENCE_WINDOW_SECONDS,
+    )).encode()
+).hexdigest()[:8]
+
+
+@dataclass(frozen=True)
+class PreprocessedAudio:
+    path: Path
+    method: str  # "ffmpeg", "wav" or "none" (the original file)
+    original_bytes: int
+    processed_bytes: int
+    original_seconds: Optional[float] = None
+    processed_seconds: Optional[float] = None
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.processed_bytes
+
+    @property
+    def saved_seconds(self) -> Optional[float]:
+        if self.original_seconds is None or self.processed_seconds is None:
+            return None
+        return max(0.0, self.original_seconds - self.processed_seconds)
+
+
+def preprocess_audio(file_path: str | Path, out_dir: str | Path) -> PreprocessedAudio:
+    """Write a smaller copy of the recording to `out_dir`, or return the original when that isn't possible."""
+    path = Path(file_path)
+    size = path.stat().st_size
+    original = PreprocessedAudio(path, "none", size, size)
+    if size < AUDIO_PREPROCESS_MIN_BYTES:
+        return original
+
+    ffmpeg = FFMPEG_PATH or shutil.which("ffmpeg")
+    if ffmpeg:
+        method, out = "ffmpeg", Path(out_dir) / "preprocessed.mp3"
+    elif audioop is not None and path.suffix.lower() == ".wav":
+        method, out = "wav", Path(out_dir) / "preprocessed.wav"
+    else:
+        return original
+
+    try:
+        with STAGE_SECONDS.time(stage="audio_preprocess", detail=method):
+            if method == "ffmpeg":
+                _run_ffmpeg(ffmpeg, path, out)
+                processed_seconds = audio_duration_seconds(out)
+            else:
+                processed_seconds = _convert_wav(path, out)
+    except _FAILURES as e:
+        logger.warning("Audio pre-processing failed, sending the original file: %s", e)
+        return original
+
+    result = PreprocessedAudio(
+        path=out,
+        method=method,
+        original_bytes=size,
+        processed_bytes=out.stat().st_size,
+        original_seconds=audio_duration_seconds(path),
+        processed_seconds=processed_seconds,
+    )
+    if result.processed_bytes >= size:
+        return original
+
+    AUDIO_PREPROCESS_SAVED_BYTES.inc(result.saved_bytes, method=method)
+    if result.saved_seconds is not None:
+        AUDIO_PREPROCESS_SAVED_SECONDS.inc(result.saved_seconds, method=method)
+    logger.info(
+        "Audio pre-processed (%s): %.1f MB -> %.1f MB, %s of silence trimmed",
+        method, size / 1e6, result.processed_bytes / 1e6,
+        f"{result.saved_seconds:.1f}s" if result.saved_seconds is not None else "unknown",
+    )
+    return result
+
+
+# ---------------------------------------------------------------------------
+# ffmpeg
+# ---------------------------------------------------------------------------
+
+def _run_ffmpeg(ffmpeg: str, src: Path, dst: Path) -> None:
+    threshold = f"{AUDIO_SILENCE_THRESHOLD_DB}dB"
+    silence_filter = (
+        f"silenceremove=start_periods=1:start_threshold={threshold}:start_silence={AUDIO_SILENCE_PAD_SECONDS}"
+        f":stop_periods=-1:stop_threshold={threshold}"
+        f":stop_duration={AUDIO_MAX_SILENCE_SECONDS}:stop_silence={AUDIO_MAX_SILENCE_SECONDS}"
+    )
+    cmd = [
+        ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", str(src),
+        "-vn", "-ac", "1", "-ar", str(AUDIO_PREPROCESS_SAMPLE_RATE),
+        "-af", silence_filter,
+        "-c:a", "libmp3lame", "-b:a", AUDIO_PREPROCESS_MP3_BITRATE,
+        str(dst),
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {proc.returncode}: {proc.stderr.decode(errors='replace')[-500:]}")
+
+
+# ---------------------------------------------------------------------------
+# WAV (standard library only)
+# ---------------------------------------------------------------------------
+
+def _convert_wav(src_path: Path, dst_path: Path) -> float:
+    """Convert to 16-bit mono at AUDIO_PREPROCESS_SAMPLE_RATE with long silences trimmed; returns the output seconds."""
+    rate = AUDIO_PREPROCESS_SAMPLE_RATE
+    with wave.open(str(src_path), "rb") as src, wave.open(str(dst_path), "wb") as dst:
+        channels, width, src_rate = src.getnchannels(), src.getsampwidth(), src.getframerate()
+        if channels > 2:
+            raise ValueError(f"{channels}-channel audio is not supported")
+        dst.setnchannels(1)
+        dst.setsampwidth(2)
+        dst.setframerate(rate)
+
+        trimmer = _SilenceTrimmer(dst, rate)
+        state = None
+        # One second at a time, so memory use does not depend on the recording length
+        while data := src.readframes(src_rate):
+            if width == 1:
+                data = audioop.bias(data, 1, -128)  # 8-bit WAV is unsigned
+            if width != 2:
+                data = audioop.lin2lin(data, width, 2)
+            if channels == 2:
+                data = audioop.tomono(data, 2, 0.5, 0.5)
+            if src_rate != rate:
+                data, state = audioop.ratecv(data, 2, 1, src_rate, rate, state)
+            trimmer.feed(data)
+        trimmer.finish()
+
+    if trimmer.frames_written == 0:
+        raise ValueError("the recording is silent")
+    return trimmer.frames_written / rate
+
+
+class _SilenceTrimmer:
+    """Writes 16-bit mono audio, cutting silence at both ends and shortening long pauses."""
+
+    def __init__(self, dst: wave.Wave_write, rate: int) -> None:
+        self.dst = dst
+        self.window_bytes = max(1, int(SILENCE_WINDOW_SECONDS * rate)) * 2
+        self.threshold = 32768 * 10 ** (AUDIO_SILENCE_THRESHOLD_DB / 20)
+        self.pad_windows = round(AUDIO_SILENCE_PAD_SECONDS / SILENCE_WINDOW_SECONDS)
+        # Only the last AUDIO_MAX_SILENCE_SECONDS of the current pause are kept
+        max_windows = max(self.pad_windows, round(AUDIO_MAX_SILENCE_SECONDS / SILENCE_WINDOW_SECONDS))
+        self.silence: Deque[bytes] = deque(maxlen=max_windows)
+        self.speech_started = False
+        self.frames_written = 0
+        self._pending = b""
+
+    def feed(self, data: bytes) -> None:
+        data = self._pending + data
+        end = len(data) - len(data) % self.window_bytes
+        for i in range(0, end, self.window_bytes):
+            self._window(data[i:i + self.window_bytes])
+        self._pending = data[end:]
+
+    def finish(self) -> None:
+        if self._pending:
+            self._window(self._pending)
+            self._pending = b""
+        if self.speech_started:
+            self._write(list(self.silence)[:self.pad_windows])
+
+    def _window(self, window: bytes) -> None:
+        if audioop.rms(window, 2) < self.threshold:
+            self.silence.append(window)
+            return
+        pause = list(self.silence)
+        if not self.speech_started:
+            pause = pause[-self.pad_windows:] if self.pad_windows else []
+        self._write(pause)
+        self._write([window])
+        self.silence.clear()
+        self.speech_started = True
+
+    def _write(self, windows) -> None:
+        for w in windows:
+            self.dst.writeframesraw(w)
+            self.frames_written += len(w) // 2
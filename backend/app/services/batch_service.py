@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import ALLOWED_EXTENSIONS
+from app.schemas.meeting_summary import MeetingSummary
+from app.services.client_registry import ClientRegistry
+from app.services.job_store import utcnow
+from app.services.meeting_store import MeetingStore, save_meeting_safely
+from app.services.pipeline_service import render_docx, summarize_transcript
+from app.services.progress_service import ProgressReporter, progress_tracker
+from app.services.trace_service import trace_context
+from app.services.transcript_cache_service import transcribe_with_cache
+from app.services.upload_service import UploadLease, upload_storage
+
+"""
+This file processes many recordings at once for POST /process/batch and the
+`python -m app.batch` CLI.
+The transcribe -> summarize -> export stages run as a pipeline: every stage has
+its own worker pool, and a file moves to the next stage as soon as its previous
+stage finishes. While one file is being summarized the next ones are already
+being transcribed, so throughput is bound by the per-stage limits (and the
+providers behind them) rather than by running the files one after another.
+Each file gets a JSON result (and optionally a Word document) in the batch
+directory, and manifest.json lists every file with its status, outputs and
+stage timings.
+"""
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass(frozen=True)
+class BatchInput:
+    path: Path
+    original_filename: str
+    content_hash: Optional[str] = None
+
+
+@dataclass
+class BatchItem:
+    index: int
+    source: BatchInput
+    status: str = "queued"
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    transcript: Optional[str] = None
+    summary: Optional[MeetingSummary] = None
+    outputs: Dict[str, str] = field(default_factory=dict)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+    def to_manifest(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "source": self.source.original_filename,
+            "status": self.status,
+            "stage": self.stage,
+            "error": self.error,
+            "outputs": dict(self.outputs),
+            "stage_seconds": dict(self.stage_seconds),
+        }
+
+
+def collect_audio_files(directory: Path) -> List[Path]:
+    """Supported audio files directly inside `directory`, in name order."""
+    return sorted(
+        p for p in directory.iterdir()
+        if p.is_file() and p.suffix.lower() in ALLOWED_EXTENSIONS
+    )
+
+
+class PipelinedBatch:
+    def __init__(
+        self,
+        batch_id: str,
+        inputs: List[BatchInput],
+        output_dir: Path,
+        llm_provider: str,
+        docx: bool,
+        clients: ClientRegistry,
+        transcribe_workers: int,
+        summarize_workers: int,
+        export_workers: int,
+        meeting_store: Optional[MeetingStore] = None,
+        progress: Optional[ProgressReporter] = None,
+    ) -> None:
+        self.batch_id = batch_id
+        self.items = [BatchItem(index=i, source=src) for i, src in enumerate(inputs)]
+        # Uploaded sources are kept from the upload janitor from now until they are transcribed
+        self._uploads: List[UploadLease] = [upload_storage.lease(src.path) for src in inputs]
+        self.output_dir = output_dir
+        self.llm_provider = llm_provider
+        self.docx = docx
+        self.clients = clients
+        self.meeting_store = meeting_store
+        # Only batches run by the server report progress; nobody can subscribe to a CLI run
+        self.progress = progress
+        self._workers = {
+            "transcribing": max(1, transcribe_workers),
+            "summarizing": max(1, summarize_workers),
+            "exporting": max(1, export_workers),
+        }
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self._remaining = len(self.items)
+        self._all_done = threading.Event()
+        self.status = "queued"
+        self.created_at = utcnow()
+        self.finished_at = None
+        self._start_time: Optional[float] = None
+
+    def run(self) -> Dict[str, Any]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.status = "running"
+        self._start_time = time()
+        if self.progress is not None:
+            self.progress.stage("started", files=len(self.items))
+        self.write_manifest()
+
+        self._pools = {
+            stage: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"batch-{stage}")
+            for stage, n in self._workers.items()
+        }
+        try:
+            if not self.items:
+                self._all_done.set()
+            for item in self.items:
+                self._pools["transcribing"].submit(self._transcribe, item)
+            self._all_done.wait()
+        finally:
+            for pool in self._pools.values():
+                pool.shutdown(wait=True)
+            for upload in self._uploads:
+                upload.release()
+
+        self.status = "failed" if all(i.status == "failed" for i in self.items) and self.items else "finished"
+        self.finished_at = utcnow()
+        manifest = self.write_manifest()
+        if self.progress is not None:
+            self.progress.stage(
+                "done",
+                succeeded=manifest["succeeded"],
+                failed=manifest["failed"],
+            )
+        logger.info("Batch %s finished | %d succeeded | %d failed | %ss",
+                    self.batch_id, manifest["succeeded"], manifest["failed"], manifest["elapsed_seconds"])
+        return manifest
+
+    def manifest(self) -> Dict[str, Any]:
+        with self._lock:
+            items = [item.to_manifest() for item in self.items]
+        elapsed = round(time() - self._start_time, 2) if self._start_time else 0.0
+        return {
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "llm_provider": self.llm_provider,
+            "docx": self.docx,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_seconds": elapsed,
+            "total": len(items),
+            "succeeded": sum(1 for i in items if i["status"] == "succeeded"),
+            "failed": sum(1 for i in items if i["status"] == "failed"),
+            "items": items,
+        }
+
+    def write_manifest(self) -> Dict[str, Any]:
+        manifest = self.manifest()
+        path = self.output_dir / MANIFEST_NAME
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        return manifest
+
+    # Stages - each one hands the item to the next stage's pool when it is done
+
+    def _transcribe(self, item: BatchItem) -> None:
+        def work() -> None:
+            with self._uploads[item.index]:
+                item.transcript = transcribe_with_cache(
+                    str(item.source.path), item.source.content_hash, clients=self.clients
+                )
+                upload_storage.transcribed(item.source.path)
+
+        if self._run_stage(item, "transcribing", work):
+            self._pools["summarizing"].submit(self._summarize, item)
+
+    def _summarize(self, item: BatchItem) -> None:
+        def work() -> None:
+            item.summary = summarize_transcript(item.transcript, self.llm_provider, self.clients)
+            save_meeting_safely(
+                self.meeting_store, item.summary, item.transcript,
+                item.source.original_filename, self.llm_provider, item.source.content_hash,
+            )
+
+        if self._run_stage(item, "summarizing", work):
+            self._pools["exporting"].submit(self._export, item)
+
+    def _export(self, item: BatchItem) -> None:
+        if self._run_stage(item, "exporting", lambda: self._write_outputs(item)):
+            item.status = "succeeded"
+            item.stage = None
+            # Transcript and summary are on disk now, no need to keep them in memory
+            item.transcript = None
+            item.summary = None
+            self._item_finished(item)
+
+    def _write_outputs(self, item: BatchItem) -> None:
+        stem = f"{item.index:03d}-{_safe_stem(item.source.original_filename)}"
+        json_path = self.output_dir / f"{stem}.json"
+        json_path.write_text(
+            json.dumps(
+                {
+                    "source": item.source.original_filename,
+                    "transcript": item.transcript,
+                    "summary": item.summary.model_dump(),
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        item.outputs["json"] = json_path.name
+
+        if self.docx:
+            docx_path = self.output_dir / f"{stem}.docx"
+            document = render_docx(
+                item.summary,
+                transcript=item.transcript,
+                original_filename=item.source.original_filename,
+                llm_provider=self.llm_provider,
+            )
+            with docx_path.open("wb") as f:
+                document.write(f)
+            item.outputs["docx"] = docx_path.name
+
+    def _run_stage(self, item: BatchItem, stage: str, work: Callable[[], None]) -> bool:
+        """Run one stage of one item, recording its timing; a failure finishes the item."""
+        item.status = "running"
+        item.stage = stage
+        start = time()
+        try:
+            # Stages run on different pools; the batch id is the trace id of all their logs
+            with trace_context(self.batch_id):
+                work()
+            return True
+        except Exception as e:
+            if isinstance(e, RuntimeError):
+                logger.error("Batch %s | %s failed while %s: %s",
+                             self.batch_id, item.source.original_filename, stage, e)
+            else:
+                logger.exception("Batch %s | unexpected error for %s while %s",
+                                 self.batch_id, item.source.original_filename, stage)
+            item.status = "failed"
+            item.error = str(e)
+            item.transcript = None
+            item.summary = None
+            self._item_finished(item)
+            return False
+        finally:
+            item.stage_seconds[stage] = round(time() - start, 2)
+
+    def _item_finished(self, item: BatchItem) -> None:
+        with self._lock:
+            self._remaining -= 1
+            done = len(self.items) - self._remaining
+            remaining = self._remaining
+        if self.progress is not None:
+            self.progress.event(
+                "file_done",
+                index=item.index,
+                source=item.source.original_filename,
+                status=item.status,
+                error=item.error,
+                done=done,
+                total=len(self.items),
+            )
+        if remaining == 0:
+            self._all_done.set()
+
+
+def _safe_stem(filename: str) -> str:
+    stem = _UNSAFE_CHARS.sub("_", Path(filename).stem).strip("._")
+    return stem[:80] or "recording"
+
+
+class BatchRunner:
+    """Runs submitted batches in the background and keeps track of the ones still in memory."""
+
+    def __init__(
+        self,
+        clients: ClientRegistry,
+        output_root: Path,
+        max_running: int,
+        transcribe_workers: int,
+        summarize_workers: int,
+        export_workers: int,
+        meeting_store: Optional[MeetingStore] = None,
+    ) -> None:
+        self.clients = clients
+        self.meeting_store = meeting_store
+        self.output_root = output_root
+        self._max_running = max_running
+        self._stage_workers = dict(
+            transcribe_workers=transcribe_workers,
+            summarize_workers=summarize_workers,
+            export_workers=export_workers,
+        )
+        self._batches: Dict[str, PipelinedBatch] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=self._max_running, thread_name_prefix="batch")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, inputs: List[BatchInput], llm_provider: str, docx: bool) -> PipelinedBatch:
+        if self._pool is None:
+            raise RuntimeError("Batch runner is not running.")
+
+        batch_id = uuid.uuid4().hex
+        progress_tracker.open(batch_id)
+        batch = PipelinedBatch(
+            batch_id,
+            inputs,
+            output_dir=self.output_root / batch_id,
+            llm_provider=llm_provider,
+            docx=docx,
+            clients=self.clients,
+            meeting_store=self.meeting_store,
+            progress=ProgressReporter(batch_id),
+            **self._stage_workers,
+        )
+        batch.output_dir.mkdir(parents=True, exist_ok=True)
+        batch.write_manifest()
+        self._batches[batch_id] = batch
+        self._pool.submit(self._run, batch)
+        logger.info("Batch %s queued | %d files | llm=%s | docx=%s",
+                    batch_id, len(inputs), llm_provider, docx)
+        return batch
+
+    def get_manifest(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        batch = self._batches.get(batch_id)
+        if batch is not None:
+            return batch.manifest()
+        # Batches from before a restart are only known through their manifest file
+        path = self.output_root / batch_id / MANIFEST_NAME
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _run(self, batch: PipelinedBatch) -> None:
+        try:
+            batch.run()
+        except Exception:
+            logger.exception("Batch %s crashed", batch.batch_id)
+            batch.status = "failed"
+            batch.write_manifest()
+            batch.progress.stage("failed", error="Unexpected error")
+        finally:
+            # The manifest on disk is the record from now on
+            self._batches.pop(batch.batch_id, None)
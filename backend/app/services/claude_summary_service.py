@@ -1,100 +1,345 @@
+from __future__ import annotations
+
 import json
 import os
-from typing import Any, Dict
-
-from anthropic import Anthropic
-from anthropic import (
-    RateLimitError,
-    AuthenticationError,
-    APIConnectionError,
-    BadRequestError,
-    InternalServerError,
-)
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
 
 from app.prompts.meeting_summary_prompt import SYSTEM_PROMPT_BASIC as SYSTEM_PROMPT
+from app.prompts.meeting_summary_prompt import SYSTEM_PROMPT_UPDATE
+from app.services.client_registry import get_client_registry
+from app.services.hierarchical_summary_service import estimate_tokens
+from app.services.metrics_service import LLM_TOKENS, STAGE_SECONDS
+from app.services.rate_limit_service import (
+    ProviderUnavailableError,
+    call_with_retries,
+    call_with_retries_async,
+    rate_limiters,
+)
+
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
+    from anthropic.types import Message
 
+"""
+The request prefix (tools, system prompt, model settings) is the same for every
+call, so it is built once here and only the transcript message is added per call.
+The API reads the prefix in the order tools -> system -> messages; the
+cache_control breakpoint on the system block marks everything up to it for the
+prompt cache, so later calls read the tool schema and prompt from the cache
+(billed at a fraction of the input price, and faster to prefill) instead of
+processing them again. The cache lives for about 5 minutes after its last use,
+and prefixes shorter than the model's minimum (1024 tokens for Sonnet) are not
+cached at all: the API then ignores the breakpoint and reports no cache tokens.
+Incremental summarization (update_summary_with_claude) uses its own prefix, built
+the same way, whose tool reports the changes to an existing summary.
+"""
 
 DEFAULT_MODEL = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-5-20250929")
+MAX_OUTPUT_TOKENS = int(os.getenv("CLAUDE_MAX_TOKENS", "2048"))
+# Cache the system prompt and tool schema on Anthropic's side (prompt caching)
+PROMPT_CACHE_ENABLED = os.getenv("CLAUDE_PROMPT_CACHE", "true").lower() in ("1", "true", "yes")
 
+_TOOL_NAME = "record_meeting_summary"
 
-def summarize_transcript_with_claude(transcript: str) -> Dict[str, Any]:
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise RuntimeError("ANTHROPIC_API_KEY is missing. Set it in backend/.env")
-
-    client = Anthropic(api_key=api_key)
-
-    tools = [
-        {
-            "name": "record_meeting_summary",
-            "description": "Return a structured meeting summary extracted from the transcript.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "meeting_summary": {"type": "string"},
-                    "participants": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
-                    "decisions": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
-                    "action_items": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "task": {"type": "string"},
-                                "owner": {"type": ["string", "null"]},
-                                "due_date": {"type": ["string", "null"]},
-                                "priority": {
-                                    "type": ["string", "null"],
-                                    "enum": ["low", "medium", "high", None],
-                                },
+_TOOLS = [
+    {
+        "name": _TOOL_NAME,
+        "description": "Return a structured meeting summary extracted from the transcript.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "meeting_summary": {"type": "string"},
+                "participants": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                },
+                "decisions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                },
+                "action_items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "task": {"type": "string"},
+                            "owner": {"type": ["string", "null"]},
+                            "due_date": {"type": ["string", "null"]},
+                            "priority": {
+                                "type": ["string", "null"],
+                                "enum": ["low", "medium", "high", None],
                             },
-                            "required": ["task"],
-                            "additionalProperties": False,
                         },
+                        "required": ["task"],
+                        "additionalProperties": False,
                     },
                 },
-                "required": ["meeting_summary", "participants", "decisions", "action_items"],
-                "additionalProperties": False,
             },
-        }
-    ]
+            "required": ["meeting_summary", "participants", "decisions", "action_items"],
+            "additionalProperties": False,
+        },
+    }
+]
 
-    try:
-        message = client.messages.create(
-            model=DEFAULT_MODEL,
-            max_tokens=900,
-            system=SYSTEM_PROMPT,
-            tools=tools,
-            tool_choice={"type": "tool", "name": "record_meeting_summary"},
-            messages=[
-                {"role": "user", "content": f"Transcript:\n{transcript}"},
+_SYSTEM = [{"type": "text", "text": SYSTEM_PROMPT}]
+if PROMPT_CACHE_ENABLED:
+    _SYSTEM[-1]["cache_control"] = {"type": "ephemeral"}
+
+_REQUEST_PREFIX: Dict[str, Any] = dict(
+    model=DEFAULT_MODEL,
+    max_tokens=MAX_OUTPUT_TOKENS,
+    system=_SYSTEM,
+    tools=_TOOLS,
+    tool_choice={"type": "tool", "name": _TOOL_NAME},
+    extra_headers={"anthropic-beta": "structured-outputs-2025-11-13"},
+)
+
+# The prompt and tool schema, counted once for the rate limiter's estimate
+_PREFIX_TOKENS = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(json.dumps(_TOOLS))
+
+# Incremental summarization: the model reports what an edit of the transcript changes in the summary
+_UPDATE_TOOL_NAME = "record_summary_update"
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+_UPDATE_TOOLS = [
+    {
+        "name": _UPDATE_TOOL_NAME,
+        "description": "Return the changes to the meeting summary implied by the transcript edits.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "meeting_summary": {"type": "string"},
+                "participants_added": _STRING_LIST,
+                "participants_removed": _STRING_LIST,
+                "decisions_added": _STRING_LIST,
+                "decisions_removed": _STRING_LIST,
+                "action_items_added": _TOOLS[0]["input_schema"]["properties"]["action_items"],
+                "action_items_removed": _STRING_LIST,
+                "renamed": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"old": {"type": "string"}, "new": {"type": "string"}},
+                        "required": ["old", "new"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": [
+                "meeting_summary", "participants_added", "participants_removed", "decisions_added",
+                "decisions_removed", "action_items_added", "action_items_removed", "renamed",
             ],
-            extra_headers={"anthropic-beta": "structured-outputs-2025-11-13"},
+            "additionalProperties": False,
+        },
+    }
+]
+
+_UPDATE_SYSTEM = [{"type": "text", "text": SYSTEM_PROMPT_UPDATE}]
+if PROMPT_CACHE_ENABLED:
+    _UPDATE_SYSTEM[-1]["cache_control"] = {"type": "ephemeral"}
+
+_UPDATE_REQUEST_PREFIX: Dict[str, Any] = dict(
+    _REQUEST_PREFIX,
+    system=_UPDATE_SYSTEM,
+    tools=_UPDATE_TOOLS,
+    tool_choice={"type": "tool", "name": _UPDATE_TOOL_NAME},
+)
+
+_UPDATE_PREFIX_TOKENS = estimate_tokens(SYSTEM_PROMPT_UPDATE) + estimate_tokens(json.dumps(_UPDATE_TOOLS))
+
+
+def summarize_transcript_with_claude(
+    transcript: str,
+    client: Optional[Anthropic] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    return _call(_build_request(transcript), _estimate_tokens(transcript), client, on_delta)
+
+
+async def summarize_transcript_with_claude_async(
+    transcript: str,
+    client: Optional[AsyncAnthropic] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    return await _call_async(_build_request(transcript), _estimate_tokens(transcript), client, on_delta)
+
+
+def update_summary_with_claude(
+    changes: str,
+    client: Optional[Anthropic] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Summary changes (a SummaryUpdate dict) for the current summary and transcript edits described in `changes`."""
+    return _call(_build_update_request(changes), _estimate_update_tokens(changes), client, on_delta)
+
+
+async def update_summary_with_claude_async(
+    changes: str,
+    client: Optional[AsyncAnthropic] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    return await _call_async(_build_update_request(changes), _estimate_update_tokens(changes), client, on_delta)
+
+
+def _call(
+    request: Dict[str, Any],
+    tokens: int,
+    client: Optional[Anthropic],
+    on_delta: Optional[Callable[[str], None]],
+) -> Dict[str, Any]:
+    if client is None:
+        client = get_client_registry().anthropic
+
+    def create() -> Message:
+        # Only the request itself is timed, not the rate-limit waits and retry backoff around it
+        with STAGE_SECONDS.time(stage="llm_call", detail="claude"):
+            if on_delta is None:
+                return client.messages.create(**request)
+            # Stream the tool input JSON as it is generated
+            with client.messages.stream(**request) as stream:
+                for event in stream:
+                    if event.type == "input_json":
+                        on_delta(event.partial_json)
+                return stream.get_final_message()
+
+    with _translate_errors():
+        message = call_with_retries(
+            create,
+            rate_limiters.get("anthropic", DEFAULT_MODEL),
+            tokens=tokens,
+            count_tokens=_used_tokens,
         )
+        _record_usage(message)
+        return _extract_tool_input(message)
+
 
-        tool_block = next(
-            (block for block in message.content if block.type == "tool_use"),
-            None,
+async def _call_async(
+    request: Dict[str, Any],
+    tokens: int,
+    client: Optional[AsyncAnthropic],
+    on_delta: Optional[Callable[[str], None]],
+) -> Dict[str, Any]:
+    if client is None:
+        client = get_client_registry().async_anthropic
+
+    async def create() -> Message:
+        with STAGE_SECONDS.time(stage="llm_call", detail="claude"):
+            if on_delta is None:
+                return await client.messages.create(**request)
+            async with client.messages.stream(**request) as stream:
+                async for event in stream:
+                    if event.type == "input_json":
+                        on_delta(event.partial_json)
+                return await stream.get_final_message()
+
+    with _translate_errors():
+        message = await call_with_retries_async(
+            create,
+            rate_limiters.get("anthropic", DEFAULT_MODEL),
+            tokens=tokens,
+            count_tokens=_used_tokens,
         )
+        _record_usage(message)
+        return _extract_tool_input(message)
+
+
+def _estimate_tokens(transcript: str) -> int:
+    # Output tokens count towards the limit too; reserve the maximum and settle afterwards
+    return _PREFIX_TOKENS + estimate_tokens(transcript) + MAX_OUTPUT_TOKENS
+
+
+def _estimate_update_tokens(changes: str) -> int:
+    return _UPDATE_PREFIX_TOKENS + estimate_tokens(changes) + MAX_OUTPUT_TOKENS
+
 
-        if not tool_block:
-            raise RuntimeError("Claude did not return structured tool output.")
+def _used_tokens(message: Message) -> Optional[int]:
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return None
+    # input_tokens leaves out the cached prefix; cache writes count towards the input
+    # token limit, cache reads do not
+    return usage.input_tokens + _cache_tokens(usage, "cache_creation_input_tokens") + usage.output_tokens
 
-        return tool_block.input
-        
 
+def _record_usage(message: Message) -> None:
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.input_tokens, provider="anthropic", model=DEFAULT_MODEL, type="input")
+    LLM_TOKENS.inc(usage.output_tokens, provider="anthropic", model=DEFAULT_MODEL, type="output")
+    LLM_TOKENS.inc(
+        _cache_tokens(usage, "cache_read_input_tokens"), provider="anthropic", model=DEFAULT_MODEL, type="cache_read",
+    )
+    LLM_TOKENS.inc(
+        _cache_tokens(usage, "cache_creation_input_tokens"), provider="anthropic", model=DEFAULT_MODEL,
+        type="cache_write",
+    )
+
+
+def _cache_tokens(usage: Any, field: str) -> int:
+    # None (or absent) when the request did not touch the prompt cache
+    return getattr(usage, field, None) or 0
+
+
+def _build_request(transcript: str) -> Dict[str, Any]:
+    return {
+        **_REQUEST_PREFIX,
+        "messages": [
+            {"role": "user", "content": f"Transcript:\n{transcript}"},
+        ],
+    }
+
+
+def _build_update_request(changes: str) -> Dict[str, Any]:
+    return {
+        **_UPDATE_REQUEST_PREFIX,
+        "messages": [
+            {"role": "user", "content": changes},
+        ],
+    }
+
+
+def _extract_tool_input(message) -> Dict[str, Any]:
+    tool_block = next(
+        (block for block in message.content if block.type == "tool_use"),
+        None,
+    )
+
+    if not tool_block:
+        raise RuntimeError("Claude did not return structured tool output.")
+
+    return tool_block.input
+
+
+@contextmanager
+def _translate_errors() -> Iterator[None]:
+    # The SDK is loaded on first use (see client_registry)
+    from anthropic import (
+        RateLimitError,
+        AuthenticationError,
+        APIConnectionError,
+        APIStatusError,
+        BadRequestError,
+        InternalServerError,
+    )
+
+    try:
+        yield
     except RateLimitError as e:
-        raise RuntimeError("Claude API rate limit/quota exceeded. Please check billing configuration.") from e
+        raise ProviderUnavailableError("Claude API rate limit/quota exceeded. Please check billing configuration.") from e
     except AuthenticationError as e:
         raise RuntimeError("Claude authentication failed. Please verify the API key.") from e
     except APIConnectionError as e:
-        raise RuntimeError("Failed to connect to Claude. Please check your network connection.") from e
-    except (BadRequestError, InternalServerError) as e:
+        raise ProviderUnavailableError("Failed to connect to Claude. Please check your network connection.") from e
+    except BadRequestError as e:
         raise RuntimeError("Claude request failed. Please try again or adjust the prompt/input.") from e
+    except InternalServerError as e:
+        raise ProviderUnavailableError("Claude request failed. Please try again or adjust the prompt/input.") from e
+    except APIStatusError as e:
+        if e.status_code >= 500:
+            raise ProviderUnavailableError(f"Claude is unavailable (HTTP {e.status_code}). Please try again later.") from e
+        raise
     except json.JSONDecodeError as e:
         raise RuntimeError("Model output was not valid JSON. Please refine the prompt or add retries.") from e
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from fastapi import Request
+
+from app.config import (
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE,
+    HTTP_TIMEOUT_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
+    from openai import AsyncOpenAI, OpenAI
+
+"""
+This file holds the shared OpenAI / Anthropic API clients.
+One registry is created in the app lifespan and reused by every request, so
+HTTP connections and TLS sessions are kept alive between calls instead of
+being rebuilt per request.
+- Clients are created lazily on first use, so a missing API key only fails
+  the requests that need that provider. The SDKs themselves are imported then
+  too (they take seconds to import); warm_up() does it ahead of time.
+- Routes receive the registry through the `get_clients` dependency, which
+  tests can override to point the services at local stub servers.
+"""
+
+
+@dataclass
+class ClientSettings:
+    openai_api_key: Optional[str] = None
+    anthropic_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None
+    anthropic_base_url: Optional[str] = None
+    max_connections: int = HTTP_POOL_MAX_CONNECTIONS
+    max_keepalive_connections: int = HTTP_POOL_MAX_KEEPALIVE
+    timeout_seconds: float = HTTP_TIMEOUT_SECONDS
+    # Retries are done by the rate limiter (app.services.rate_limit_service), not the SDKs
+    max_retries: int = 0
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        return cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
+            openai_base_url=os.getenv("OPENAI_BASE_URL"),
+            anthropic_base_url=os.getenv("ANTHROPIC_BASE_URL"),
+        )
+
+
+@dataclass
+class ClientRegistry:
+    settings: ClientSettings = field(default_factory=ClientSettings.from_env)
+    _clients: dict = field(default_factory=dict, init=False, repr=False)
+    _lock: Any = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @property
+    def openai(self) -> OpenAI:
+        return self._get("openai", self._build_openai)
+
+    @property
+    def async_openai(self) -> AsyncOpenAI:
+        return self._get("async_openai", self._build_async_openai)
+
+    @property
+    def anthropic(self) -> Anthropic:
+        return self._get("anthropic", self._build_anthropic)
+
+    @property
+    def async_anthropic(self) -> AsyncAnthropic:
+        return self._get("async_anthropic", self._build_async_anthropic)
+
+    def warm_up(self) -> None:
+        """Import the SDKs and build the clients that have an API key, before the first request needs them."""
+        names = []
+        if self.settings.openai_api_key:
+            names += ["openai", "async_openai"]
+        if self.settings.anthropic_api_key:
+            names += ["anthropic", "async_anthropic"]
+        for name in names:
+            getattr(self, name)
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            if not name.startswith("async_"):
+                client.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            async_clients = {k: v for k, v in self._clients.items() if k.startswith("async_")}
+            for k in async_clients:
+                del self._clients[k]
+        for client in async_clients.values():
+            await client.close()
+        self.close()
+
+    def _get(self, name: str, build):
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = build()
+                self._clients[name] = client
+            return client
+
+    def _limits(self):
+        try:  # recent SDK releases ship on httpx2
+            import httpx2 as httpx
+        except ImportError:
+            import httpx
+
+        return httpx.Limits(
+            max_connections=self.settings.max_connections,
+            max_keepalive_connections=self.settings.max_keepalive_connections,
+        )
+
+    def _openai_key(self) -> str:
+        if not self.settings.openai_api_key:
+            raise RuntimeError("OPENAI_API_KEY is missing. Set it in backend/.env")
+        return self.settings.openai_api_key
+
+    def _anthropic_key(self) -> str:
+        if not self.settings.anthropic_api_key:
+            raise RuntimeError("ANTHROPIC_API_KEY is missing. Set it in backend/.env")
+        return self.settings.anthropic_api_key
+
+    def _build_openai(self) -> OpenAI:
+        import openai
+
+        return openai.OpenAI(
+            api_key=self._openai_key(),
+            base_url=self.settings.openai_base_url,
+            timeout=self.settings.timeout_seconds,
+            max_retries=self.settings.max_retries,
+            http_client=openai.DefaultHttpxClient(limits=self._limits()),
+        )
+
+    def _build_async_openai(self) -> AsyncOpenAI:
+        import openai
+
+        return openai.AsyncOpenAI(
+            api_key=self._openai_key(),
+            base_url=self.settings.openai_base_url,
+            timeout=self.settings.timeout_seconds,
+            max_retries=self.settings.max_retries,
+            http_client=openai.DefaultAsyncHttpxClient(limits=self._limits()),
+        )
+
+    def _build_anthropic(self) -> Anthropic:
+        import anthropic
+
+        return anthropic.Anthropic(
+            api_key=self._anthropic_key(),
+            base_url=self.settings.anthropic_base_url,
+            timeout=self.settings.timeout_seconds,
+            max_retries=self.settings.max_retries,
+            http_client=anthropic.DefaultHttpxClient(limits=self._limits()),
+        )
+
+    def _build_async_anthropic(self) -> AsyncAnthropic:
+        import anthropic
+
+        return anthropic.AsyncAnthropic(
+            api_key=self._anthropic_key(),
+            base_url=self.settings.anthropic_base_url,
+            timeout=self.settings.timeout_seconds,
+            max_retries=self.settings.max_retries,
+            http_client=anthropic.DefaultAsyncHttpxClient(limits=self._limits()),
+        )
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def set_client_registry(registry: Optional[ClientRegistry]) -> None:
+    global _registry
+    with _registry_lock:
+        _registry = registry
+
+
+def get_client_registry() -> ClientRegistry:
+    """Return the process-wide registry, creating one from env vars if the app did not."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
+
+
+def get_clients(request: Request) -> ClientRegistry:
+    return request.app.state.clients
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import struct
+import zipfile
+import zlib
+from copy import deepcopy
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from docx.document import Document as DocumentObject
+
+"""
+This file caches a parsed .docx package so documents can be produced from it
+without going through python-docx for every render.
+- Every part except word/document.xml (styles, numbering, theme, ...) never
+  changes between documents, so it is deflate-compressed once and written out
+  as-is afterwards.
+- The main document part is kept as a parsed XML tree; callers clone it, fill
+  in the body and hand back the tree to be written into a new package.
+The zip container is assembled directly (local headers, data, central directory),
+which is what allows the cached compressed parts to be reused. A rendered package
+is a list of chunks that reference the cached parts, so its size is known up front
+and it can be streamed or written to a file without joining it into one buffer.
+ZipStreamWriter uses the same primitives to stream archives of finished documents.
+"""
+
+MAIN_PART = "word/document.xml"
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_OF_CENTRAL_DIR = struct.Struct("<IHHHHIIH")
+_ZIP_VERSION = 20
+_STORED = 0
+_DEFLATED = 8
+_DOS_DATE = (0 << 9) | (1 << 5) | 1  # 1980-01-01, fixed so output is reproducible
+
+
+@dataclass(frozen=True)
+class _Entry:
+    name: bytes
+    crc: int
+    size: int
+    data: bytes  # raw deflate stream
+    local_header: bytes  # local file header including the name
+
+
+def _deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _local_header(name: bytes, method: int, crc: int, compressed_size: int, size: int) -> bytes:
+    return _LOCAL_HEADER.pack(
+        0x04034B50, _ZIP_VERSION, 0, method, 0, _DOS_DATE,
+        crc, compressed_size, size, len(name), 0,
+    ) + name
+
+
+def _central_header(name: bytes, method: int, crc: int, compressed_size: int, size: int, offset: int) -> bytes:
+    return _CENTRAL_HEADER.pack(
+        0x02014B50, _ZIP_VERSION, _ZIP_VERSION, 0, method, 0, _DOS_DATE,
+        crc, compressed_size, size, len(name), 0, 0, 0, 0, 0, offset,
+    ) + name
+
+
+def _entry(name: str, data: bytes) -> _Entry:
+    encoded = name.encode("utf-8")
+    crc, compressed = zlib.crc32(data), _deflate(data)
+    header = _local_header(encoded, _DEFLATED, crc, len(compressed), len(data))
+    return _Entry(encoded, crc, len(data), compressed, header)
+
+
+def _end_of_central_dir(count: int, central_size: int, central_offset: int) -> bytes:
+    return _END_OF_CENTRAL_DIR.pack(0x06054B50, 0, 0, count, count, central_size, central_offset, 0)
+
+
+class RenderedDocx:
+    """A rendered package as a list of byte chunks; the cached parts are shared, not copied."""
+
+    media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    def __init__(self, chunks: List[bytes]) -> None:
+        self.chunks = chunks
+        self.size = sum(len(c) for c in chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.chunks)
+
+    def write(self, out: BinaryIO) -> int:
+        for chunk in self.chunks:
+            out.write(chunk)
+        return self.size
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+class DocxPackage:
+    def __init__(self, data: bytes) -> None:
+        # python-docx is only loaded by the Word renderer; RenderedDocx and the zip helpers don't need it
+        from docx.opc.oxml import parse_xml
+
+        self._entries: List[Optional[_Entry]] = []
+        self._main_index = -1
+        with zipfile.ZipFile(BytesIO(data)) as zf:
+            for info in zf.infolist():
+                blob = zf.read(info)
+                if info.filename == MAIN_PART:
+                    self._main_index = len(self._entries)
+                    self._document = parse_xml(blob)
+                    self._entries.append(None)  # rendered per document
+                else:
+                    self._entries.append(_entry(info.filename, blob))
+        if self._main_index < 0:
+            raise ValueError(f"Not a Word document: missing {MAIN_PART}")
+
+    @classmethod
+    def from_document(cls, doc: DocumentObject) -> "DocxPackage":
+        buf = BytesIO()
+        doc.save(buf)
+        return cls(buf.getvalue())
+
+    def new_document(self):
+        """A fresh copy of the main document XML tree to fill in."""
+        return deepcopy(self._document)
+
+    def render(self, document) -> RenderedDocx:
+        """Package `document` as the main part; only that part is serialized and compressed."""
+        from docx.opc.oxml import serialize_part_xml
+
+        return self.render_xml(serialize_part_xml(document))
+
+    def render_xml(self, document_xml: bytes) -> RenderedDocx:
+        """Package an already serialized main part (e.g. one assembled from XML fragments)."""
+        entries = list(self._entries)
+        entries[self._main_index] = _entry(MAIN_PART, document_xml)
+
+        chunks: List[bytes] = []
+        central: List[bytes] = []
+        offset = 0
+        for e in entries:
+            chunks += (e.local_header, e.data)
+            central.append(_central_header(e.name, _DEFLATED, e.crc, len(e.data), e.size, offset))
+            offset += len(e.local_header) + len(e.data)
+
+        central_dir = b"".join(central)
+        chunks.append(central_dir)
+        chunks.append(_end_of_central_dir(len(entries), len(central_dir), offset))
+        return RenderedDocx(chunks)
+
+
+class ZipStreamWriter:
+    """
+    Writes a zip archive front to back, one finished file at a time, so it can be
+    streamed while later files are still being produced. Files are stored as-is
+    (a .docx is already compressed).
+    """
+
+    def __init__(self) -> None:
+        self._central: List[bytes] = []
+        self._offset = 0
+
+    def add(self, name: str, chunks: List[bytes]) -> List[bytes]:
+        """The bytes to send for one file: its local header followed by its data."""
+        crc, size = 0, 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+        encoded = name.encode("utf-8")
+        header = _local_header(encoded, _STORED, crc, size, size)
+        self._central.append(_central_header(encoded, _STORED, crc, size, size, self._offset))
+        self._offset += len(header) + size
+        return [header, *chunks]
+
+    def close(self) -> bytes:
+        """The central directory and end record, sent after the last file."""
+        central_dir = b"".join(self._central)
+        return central_dir + _end_of_central_dir(len(self._central), len(central_dir), self._offset)
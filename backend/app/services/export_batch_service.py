@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import PurePath
+from typing import AsyncIterator, Callable, List, Optional
+
+import anyio
+
+from app.schemas.export import ExportMeeting
+from app.schemas.meeting_summary import MeetingSummary
+from app.services.docx_package_service import RenderedDocx, ZipStreamWriter
+from app.services.export_metadata import WordExportMetadata
+
+"""
+This file renders many meeting summaries in one go (POST /export/batch), either
+as one combined Word document with a table of contents or as a ZIP archive with
+a document per meeting.
+- Rendering is CPU-bound, so the meetings are rendered in a pool of worker
+  processes; every worker builds the notes template once, when it starts.
+  Small exports are rendered in a thread instead.
+- The ZIP is streamed while it is being produced: each document is sent as soon
+  as it is rendered, in the order the documents finish.
+"""
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass(frozen=True)
+class MeetingExport:
+    summary: MeetingSummary
+    meta: WordExportMetadata
+    title: str
+    filename: str  # name of the document inside a ZIP export
+
+
+def meeting_exports(meetings: List[ExportMeeting]) -> List[MeetingExport]:
+    exports = []
+    for i, m in enumerate(meetings):
+        stem = PurePath(m.original_filename).stem if m.original_filename else ""
+        title = (m.title or "").strip() or stem or f"Meeting {i + 1}"
+        slug = _UNSAFE_FILENAME_CHARS.sub("-", title).strip("-.")[:60] or "meeting"
+        exports.append(MeetingExport(
+            summary=m.summary,
+            meta=WordExportMetadata(
+                original_filename=m.original_filename,
+                llm_provider=m.llm_provider,
+                generated_at=m.generated_at or datetime.now(timezone.utc),
+            ),
+            title=title,
+            filename=f"{i + 1:03d}-{slug}.docx",
+        ))
+    return exports
+
+
+class ExportRenderer:
+    def __init__(self, max_workers: int, min_parallel_items: int) -> None:
+        self.max_workers = max_workers
+        self.min_parallel_items = min_parallel_items
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    async def render_combined(self, title: str, meetings: List[MeetingExport]) -> RenderedDocx:
+        executor = self._executor(len(meetings))
+        fragments = await asyncio.gather(*(
+            self._run(executor, _render_fragment, m, i) for i, m in enumerate(meetings)
+        ))
+        return await anyio.to_thread.run_sync(
+            _render_combined, title, [m.title for m in meetings], list(fragments),
+        )
+
+    async def stream_zip(self, meetings: List[MeetingExport]) -> AsyncIterator[bytes]:
+        executor = self._executor(len(meetings))
+
+        async def render(m: MeetingExport):
+            return m, await self._run(executor, _render_document, m)
+
+        tasks = [asyncio.ensure_future(render(m)) for m in meetings]
+        writer = ZipStreamWriter()
+        try:
+            for finished in asyncio.as_completed(tasks):
+                m, chunks = await finished
+                for chunk in writer.add(m.filename, chunks):
+                    yield chunk
+            yield writer.close()
+        finally:
+            # The client went away or a render failed: drop the documents not started yet
+            for task in tasks:
+                task.cancel()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _executor(self, count: int) -> Optional[Executor]:
+        if self.max_workers <= 0 or count < self.min_parallel_items:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # Started on first use; "spawn" because forking a process that runs threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                )
+            return self._pool
+
+    async def _run(self, executor: Optional[Executor], fn: Callable, *args):
+        if executor is None:
+            return await anyio.to_thread.run_sync(fn, *args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool for the next export
+            with self._lock:
+                if self._pool is executor:
+                    self._pool = None
+                    logger.error("An export worker process died, the pool will be restarted")
+                    executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+# The Word renderer is imported on first use (here and in the worker processes), see export_service
+
+def _warm_up() -> None:
+    from app.services.word_export_service import warm_up
+
+    warm_up()
+
+
+def _render_document(meeting: MeetingExport) -> List[bytes]:
+    from app.services.word_export_service import render_docx_from_summary
+
+    return render_docx_from_summary(meeting.summary, meeting.meta).chunks
+
+
+def _render_fragment(meeting: MeetingExport, index: int) -> bytes:
+    from app.services.word_export_service import render_meeting_fragment
+
+    return render_meeting_fragment(meeting.summary, meeting.meta, meeting.title, index)
+
+
+def _render_combined(title: str, meeting_titles: List[str], fragments: List[bytes]) -> RenderedDocx:
+    from app.services.word_export_service import render_combined_docx
+
+    return render_combined_docx(title, meeting_titles, fragments)
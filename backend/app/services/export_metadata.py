@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+"""
+This file holds the metadata printed on exported meeting notes (all formats).
+It does not depend on the Word renderer, so routes and the text exporters can
+use it without loading python-docx.
+"""
+
+
+@dataclass(frozen=True)
+class WordExportMetadata:
+    original_filename: Optional[str] = None
+    llm_provider: Optional[str] = None
+    generated_at: Optional[datetime] = None
+
+
+def subtitle_text(
+    original_filename: Optional[str],
+    llm_provider: Optional[str],
+    generated_at: datetime,
+) -> str:
+    parts = []
+    if original_filename:
+        parts.append(f"File: {original_filename}")
+    if llm_provider:
+        parts.append(f"LLM: {llm_provider}")
+    parts.append(f"Generated: {generated_at.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
+    return " | ".join(parts)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.schemas.meeting_summary import MeetingSummary
+from app.services.docx_package_service import RenderedDocx
+from app.services.export_metadata import WordExportMetadata
+from app.services.metrics_service import STAGE_SECONDS
+from app.services.text_export_service import render_html, render_jsonl, render_markdown
+
+"""
+This file is the registry of export formats a MeetingSummary can be rendered to
+(/process?output=<format> and POST /export/<format>).
+- An exporter renders to an iterable of byte chunks.
+- can_stream: the chunks are produced as the document is rendered, so the
+  response starts right away. Otherwise the document has to be complete before
+  its first byte exists (a .docx is a zip), so it is rendered off the event loop
+  first and sent with its Content-Length.
+New formats are added with register_exporter().
+The Word renderer is imported on the first .docx export (python-docx and its
+template take a while to load; app startup should not wait for them).
+"""
+
+RenderFn = Callable[[MeetingSummary, WordExportMetadata], Iterable[bytes]]
+
+
+@dataclass(frozen=True)
+class Exporter:
+    name: str
+    media_type: str
+    extension: str
+    can_stream: bool
+    render: RenderFn
+
+
+EXPORTERS: Dict[str, Exporter] = {}
+
+
+def register_exporter(exporter: Exporter) -> None:
+    EXPORTERS[exporter.name] = exporter
+
+
+def get_exporter(name: str) -> Exporter:
+    try:
+        return EXPORTERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown export format: {name}. Available: {', '.join(EXPORTERS)}") from None
+
+
+async def export_response(
+    exporter: Exporter,
+    summary: MeetingSummary,
+    meta: WordExportMetadata,
+    filename: str = "meeting-notes",
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{exporter.extension}"', **(headers or {})}
+    if exporter.can_stream:
+        content = _timed_chunks(exporter, exporter.render(summary, meta))
+    else:
+        content = await run_in_threadpool(_render_timed, exporter, summary, meta)
+        size = getattr(content, "size", None)
+        if size is not None:
+            headers["Content-Length"] = str(size)
+    return StreamingResponse(iter(content), media_type=exporter.media_type, headers=headers)
+
+
+def docx_response(
+    document: RenderedDocx,
+    filename: str = "meeting-notes.docx",
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """Stream a rendered document chunk by chunk with an exact Content-Length."""
+    return StreamingResponse(
+        iter(document),
+        media_type=RenderedDocx.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(document.size),
+            **(headers or {}),
+        },
+    )
+
+
+def _render_docx(summary: MeetingSummary, meta: WordExportMetadata) -> RenderedDocx:
+    from app.services.word_export_service import render_docx_from_summary
+
+    return render_docx_from_summary(summary, meta)
+
+
+def _render_timed(exporter: Exporter, summary: MeetingSummary, meta: WordExportMetadata) -> Iterable[bytes]:
+    with STAGE_SECONDS.time(stage="render", detail=exporter.name):
+        return exporter.render(summary, meta)
+
+
+def _timed_chunks(exporter: Exporter, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # Only the time spent producing the chunks, not the time the client takes to read them
+    elapsed = 0.0
+    it = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        chunk = next(it, None)
+        elapsed += time.perf_counter() - start
+        if chunk is None:
+            break
+        yield chunk
+    STAGE_SECONDS.observe(elapsed, stage="render", detail=exporter.name)
+
+
+register_exporter(Exporter(
+    name="docx",
+    media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    extension="docx",
+    can_stream=False,
+    render=_render_docx,
+))
+register_exporter(Exporter(
+    name="markdown",
+    media_type="text/markdown; charset=utf-8",
+    extension="md",
+    can_stream=True,
+    render=render_markdown,
+))
+register_exporter(Exporter(
+    name="html",
+    media_type="text/html; charset=utf-8",
+    extension="html",
+    can_stream=True,
+    render=render_html,
+))
+register_exporter(Exporter(
+    name="jsonl",
+    media_type="application/x-ndjson",
+    extension="jsonl",
+    can_stream=True,
+    render=render_jsonl,
+))
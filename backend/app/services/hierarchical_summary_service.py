@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.schemas.meeting_summary import ActionItem, MeetingSummary
+from app.services.metrics_service import STAGE_SECONDS
+
+"""
+This file implements map-reduce summarization for transcripts that are too long
+for a single LLM call.
+- The transcript is split into token-bounded chunks on line/sentence boundaries.
+- Each chunk is summarized concurrently into a partial MeetingSummary.
+- The partial summaries are merged: participants, decisions and action items
+  are deduplicated, and the overviews are concatenated in transcript order.
+"""
+
+# Rough estimate used for chunk sizing; good enough for English transcripts
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_transcript(transcript: str, max_tokens: int) -> List[str]:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces: List[str] = []
+    for line in transcript.splitlines():
+        if len(line) <= max_chars:
+            pieces.append(line)
+            continue
+        # A single speaker turn longer than a chunk - fall back to sentences, then words
+        for sentence in _SENTENCE_END.split(line):
+            pieces.extend(_split_words(sentence, max_chars))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return [c for c in chunks if c.strip()]
+
+
+def _split_words(text: str, max_chars: int) -> List[str]:
+    if len(text) <= max_chars:
+        return [text]
+    out: List[str] = []
+    current = ""
+    for word in text.split():
+        if current and len(current) + len(word) + 1 > max_chars:
+            out.append(current)
+            current = ""
+        current = f"{current} {word}" if current else word
+    if current:
+        out.append(current)
+    return out
+
+
+def summarize_hierarchically(
+    transcript: str,
+    summarize_chunk: Callable[[str], Dict[str, Any]],
+    max_chunk_tokens: int,
+    max_workers: int,
+    on_chunk_done: Optional[Callable[[int, int], None]] = None,
+    detail: str = "",
+) -> MeetingSummary:
+    """`detail` labels the summary_validation timings (the provider, as for a single call)."""
+    chunks = split_transcript(transcript, max_chunk_tokens)
+    if len(chunks) <= 1:
+        return _validate(summarize_chunk(transcript), detail)
+
+    workers = max(1, min(max_workers, len(chunks)))
+    partials: List[Optional[MeetingSummary]] = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary-chunk") as pool:
+        futures = {pool.submit(summarize_chunk, c): i for i, c in enumerate(chunks)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            partials[futures[future]] = _validate(future.result(), detail)
+            if on_chunk_done:
+                on_chunk_done(done, len(chunks))
+    return merge_summaries(partials)
+
+
+async def summarize_hierarchically_async(
+    transcript: str,
+    summarize_chunk: Callable[[str], Awaitable[Dict[str, Any]]],
+    max_chunk_tokens: int,
+    max_concurrency: int,
+    on_chunk_done: Optional[Callable[[int, int], None]] = None,
+    detail: str = "",
+) -> MeetingSummary:
+    """`detail` labels the summary_validation timings (the provider, as for a single call)."""
+    chunks = split_transcript(transcript, max_chunk_tokens)
+    if len(chunks) <= 1:
+        return _validate(await summarize_chunk(transcript), detail)
+
+    limiter = asyncio.Semaphore(max(1, max_concurrency))
+    done = 0
+
+    async def summarize_one(chunk: str) -> MeetingSummary:
+        nonlocal done
+        async with limiter:
+            result = await summarize_chunk(chunk)
+        partial = _validate(result, detail)
+        done += 1
+        if on_chunk_done:
+            on_chunk_done(done, len(chunks))
+        return partial
+
+    partials = await asyncio.gather(*(summarize_one(c) for c in chunks))
+    return merge_summaries(list(partials))
+
+
+def _validate(result: Dict[str, Any], detail: str) -> MeetingSummary:
+    with STAGE_SECONDS.time(stage="summary_validation", detail=detail):
+        return MeetingSummary.model_validate(result)
+
+
+def merge_summaries(partials: List[MeetingSummary]) -> MeetingSummary:
+    overview = " ".join(p.meeting_summary.strip() for p in partials if p.meeting_summary.strip())
+
+    participants: Dict[str, str] = {}
+    for p in partials:
+        for name in p.participants:
+            key = normalize_item(name)
+            if key and key not in participants:
+                participants[key] = name.strip()
+
+    decisions: Dict[str, str] = {}
+    for p in partials:
+        for decision in p.decisions:
+            key = normalize_item(decision)
+            if key and key not in decisions:
+                decisions[key] = decision.strip()
+
+    action_items: Dict[str, ActionItem] = {}
+    for p in partials:
+        for item in p.action_items:
+            key = normalize_item(item.task)
+            if not key:
+                continue
+            existing = action_items.get(key)
+            action_items[key] = _merge_action_item(existing, item) if existing else item
+
+    return MeetingSummary(
+        meeting_summary=overview or "No summary available.",
+        participants=list(participants.values()),
+        decisions=list(decisions.values()),
+        action_items=list(action_items.values()),
+    )
+
+
+def _merge_action_item(a: ActionItem, b: ActionItem) -> ActionItem:
+    return ActionItem(
+        task=a.task,
+        owner=a.owner or b.owner,
+        due_date=a.due_date or b.due_date,
+        priority=_max_priority(a.priority, b.priority),
+    )
+
+
+def _max_priority(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    if a is None or b is None:
+        return a or b
+    return a if _PRIORITY_RANK[a] >= _PRIORITY_RANK[b] else b
+
+
+def normalize_item(text: Optional[str]) -> str:
+    """Key used to tell whether two participants, decisions or tasks are the same entry."""
+    return re.sub(r"[\W_]+", " ", (text or "").lower()).strip()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import difflib
+import re
+from dataclasses import dataclass
+from typing import Callable, List
+
+from app.schemas.meeting_summary import ActionItem, MeetingSummary, SummaryUpdate
+from app.services.hierarchical_summary_service import merge_summaries, normalize_item
+
+"""
+This file implements incremental re-summarization: when a transcript is edited
+or continued, only the changed part is sent to the LLM, with the current summary.
+- Both versions are split into segments (lines, and sentences within long
+  lines, since Whisper returns a meeting as one paragraph) and diffed.
+- The changes are written as unified-diff hunks ("-" removed, "+" added, and a
+  few unchanged segments of context), after the current summary as JSON.
+- The LLM answers with a SummaryUpdate (entries added, removed and renamed),
+  which is applied to the current summary here, so the cost of an edit depends
+  on the size of the edit, not on the length of the meeting.
+"""
+
+# Unchanged segments shown around each change
+CONTEXT_SEGMENTS = 2
+
+_SEGMENT_END = re.compile(r"(?<=[.!?])\s+|\n")
+
+
+@dataclass(frozen=True)
+class TranscriptDiff:
+    hunks: List[str]
+    changed_segments: int
+    changed_chars: int  # length of the changed text, without context lines
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(self.hunks)
+
+
+@dataclass(frozen=True)
+class SummaryRevision:
+    summary: MeetingSummary
+    mode: str  # "incremental", "full" (summarized from scratch) or "unchanged"
+
+
+def split_segments(transcript: str) -> List[str]:
+    return [s.strip() for s in _SEGMENT_END.split(transcript) if s and s.strip()]
+
+
+def diff_transcripts(previous: str, current: str) -> TranscriptDiff:
+    old, new = split_segments(previous), split_segments(current)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    hunks: List[str] = []
+    changed = changed_chars = 0
+    # Changes closer together than twice the context are grouped into one hunk
+    for group in matcher.get_grouped_opcodes(CONTEXT_SEGMENTS):
+        lines = [f"@@ segment {group[0][3] + 1} of {len(new)} @@"]
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines += [f"  {s}" for s in new[j1:j2]]
+                continue
+            lines += [f"- {s}" for s in old[i1:i2]]
+            lines += [f"+ {s}" for s in new[j1:j2]]
+            changed += max(i2 - i1, j2 - j1)
+            # A replaced segment counts once, with the longer of its two versions
+            changed_chars += max(sum(map(len, old[i1:i2])), sum(map(len, new[j1:j2])))
+        hunks.append("\n".join(lines))
+    return TranscriptDiff(hunks=hunks, changed_segments=changed, changed_chars=changed_chars)
+
+
+def build_update_input(previous: MeetingSummary, diff: TranscriptDiff) -> str:
+    return (
+        f"Current summary:\n{previous.model_dump_json(indent=2)}\n\n"
+        f"Transcript changes (\"-\" removed, \"+\" added, other lines unchanged context):\n{diff.text}"
+    )
+
+
+def apply_summary_update(previous: MeetingSummary, update: SummaryUpdate) -> MeetingSummary:
+    removed_participants = {normalize_item(p) for p in update.participants_removed}
+    removed_decisions = {normalize_item(d) for d in update.decisions_removed}
+    removed_tasks = {normalize_item(t) for t in update.action_items_removed}
+    rename = _renamer(update)
+
+    kept = MeetingSummary(
+        meeting_summary=update.meeting_summary,
+        participants=[rename(p) for p in previous.participants if normalize_item(p) not in removed_participants],
+        decisions=[rename(d) for d in previous.decisions if normalize_item(d) not in removed_decisions],
+        action_items=[
+            ActionItem(
+                task=rename(item.task),
+                owner=rename(item.owner) if item.owner else None,
+                due_date=item.due_date,
+                priority=item.priority,
+            )
+            for item in previous.action_items
+            if normalize_item(item.task) not in removed_tasks
+        ],
+    )
+    added = MeetingSummary(
+        meeting_summary=update.meeting_summary,
+        participants=update.participants_added,
+        decisions=update.decisions_added,
+        action_items=update.action_items_added,
+    )
+    # Existing entries keep their position; new ones are appended and deduplicated against them
+    merged = merge_summaries([kept, added])
+    return merged.model_copy(update={"meeting_summary": update.meeting_summary})
+
+
+def _renamer(update: SummaryUpdate) -> Callable[[str], str]:
+    patterns = [
+        (re.compile(rf"(?<!\w){re.escape(change.old.strip())}(?!\w)", re.IGNORECASE), change.new.strip())
+        for change in update.renamed
+        if change.old.strip() and normalize_item(change.old) != normalize_item(change.new)
+    ]
+
+    def rename(text: str) -> str:
+        for pattern, new in patterns:
+            text = pattern.sub(lambda _: new, text)
+        return text
+
+    return rename
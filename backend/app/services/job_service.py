@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import time
+from typing import Optional
+
+from app.schemas.meeting_summary import MeetingSummary
+from app.services.client_registry import ClientRegistry
+from app.services.job_store import JobRecord, JobStore, utcnow
+from app.services.meeting_store import MeetingStore, save_meeting_safely
+from app.services.pipeline_service import render_docx, summarize_transcript
+from app.services.progress_service import ProgressReporter, progress_tracker
+from app.services.trace_service import trace_context
+from app.services.transcript_cache_service import transcribe_with_cache
+from app.services.upload_service import UploadLease, upload_storage
+
+"""
+This file runs the transcribe -> summarize -> render pipeline for queued jobs
+on a bounded pool of worker threads.
+Each stage records its status and timing in the job store, and a stage that
+already produced a result is skipped when a job is resumed after a restart.
+Stage events are also published under the job id, so /process/{job_id}/events
+can follow a job live.
+A job holds its upload from the moment it is queued until the audio has been
+transcribed, so the upload janitor cannot remove it while the job waits.
+Finished jobs are removed from the store after the retention period, together
+with their result files.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    def __init__(
+        self,
+        store: JobStore,
+        clients: ClientRegistry,
+        results_dir: Path,
+        max_workers: int,
+        meeting_store: Optional[MeetingStore] = None,
+        retention_seconds: Optional[float] = None,
+        cleanup_interval_seconds: float = 3600,
+    ) -> None:
+        self.store = store
+        self.clients = clients
+        self.meeting_store = meeting_store
+        self.results_dir = results_dir
+        self.retention_seconds = retention_seconds
+        self._max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._cleanup_interval = cleanup_interval_seconds
+        self._stop = threading.Event()
+        self._janitor: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="job-worker")
+        if self.retention_seconds is not None:
+            self._stop.clear()
+            self._janitor = threading.Thread(target=self._run_janitor, name="job-janitor", daemon=True)
+            self._janitor.start()
+        # Jobs that were queued or mid-flight when the server stopped are picked up again
+        for job in self.store.list_unfinished():
+            logger.info("Resuming job %s (status=%s, stage=%s)", job.id, job.status, job.stage)
+            progress_tracker.open(job.id)
+            self._pool.submit(self._run, job.id, upload_storage.lease(Path(job.audio_path)))
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._janitor is not None:
+            self._janitor.join(timeout=5)
+            self._janitor = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def remove_expired(self) -> int:
+        """Remove finished jobs older than the retention period and their result files; return how many."""
+        cutoff = utcnow() - timedelta(seconds=self.retention_seconds)
+        expired = self.store.remove_finished_before(cutoff)
+        for job in expired:
+            if job.result_path:
+                Path(job.result_path).unlink(missing_ok=True)
+        # Results whose job is gone already (e.g. an in-memory store before a restart)
+        if self.results_dir.is_dir():
+            for path in self.results_dir.iterdir():
+                if path.is_file() and path.stat().st_mtime < cutoff.timestamp():
+                    path.unlink(missing_ok=True)
+        if expired:
+            logger.info("Removed %d expired jobs", len(expired))
+        return len(expired)
+
+    def _run_janitor(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.remove_expired()
+            except Exception:
+                logger.exception("Job cleanup failed")
+            self._stop.wait(self._cleanup_interval)
+
+    def submit(
+        self,
+        audio_path: Path,
+        original_filename: Optional[str],
+        llm_provider: str,
+        output: str,
+        content_hash: Optional[str] = None,
+    ) -> JobRecord:
+        if self._pool is None:
+            raise RuntimeError("Job runner is not running.")
+
+        job = JobRecord(
+            id=uuid.uuid4().hex,
+            llm_provider=llm_provider,
+            output=output,
+            original_filename=original_filename,
+            audio_path=str(audio_path),
+            content_hash=content_hash,
+        )
+        self.store.create(job)
+        # Opened now, so the job's events can be followed while it is still queued
+        progress_tracker.open(job.id)
+        self._pool.submit(self._run, job.id, upload_storage.lease(audio_path))
+        logger.info("Job %s queued | file=%s | llm=%s | output=%s",
+                    job.id, original_filename, llm_provider, output)
+        return job
+
+    def _run(self, job_id: str, audio: UploadLease) -> None:
+        with trace_context(job_id), audio:
+            self._process(job_id, audio)
+
+    def _process(self, job_id: str, audio: UploadLease) -> None:
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        start_time = time()
+        progress = ProgressReporter(job_id)
+        job = self.store.update(job_id, status="running")
+        try:
+            if job.transcript is None:
+                job = self._stage(job, "transcribing", progress)
+                transcript = transcribe_with_cache(
+                    job.audio_path,
+                    job.content_hash,
+                    clients=self.clients,
+                    on_chunk_done=progress.chunk_done("transcribing"),
+                )
+                upload_storage.transcribed(audio.path)
+                job = self._finish_stage(job, "transcribing", transcript=transcript)
+            # The later stages only need the transcript
+            audio.release()
+
+            if job.summary is None:
+                job = self._stage(job, "summarizing", progress)
+                summary = summarize_transcript(job.transcript, job.llm_provider, self.clients, progress)
+                save_meeting_safely(
+                    self.meeting_store, summary, job.transcript, job.original_filename, job.llm_provider,
+                    job.content_hash,
+                )
+                job = self._finish_stage(job, "summarizing", summary=summary.model_dump())
+
+            if job.output == "docx" and job.result_path is None:
+                job = self._stage(job, "rendering", progress)
+                document = render_docx(
+                    MeetingSummary.model_validate(job.summary),
+                    transcript=job.transcript,
+                    original_filename=job.original_filename,
+                    llm_provider=job.llm_provider,
+                )
+                self.results_dir.mkdir(parents=True, exist_ok=True)
+                result_path = self.results_dir / f"{job.id}.docx"
+                with result_path.open("wb") as f:
+                    document.write(f)
+                job = self._finish_stage(job, "rendering", result_path=str(result_path))
+
+            self.store.update(job_id, status="succeeded", stage=None)
+            progress.stage("done")
+            logger.info("Job %s completed in %ss", job_id, round(time() - start_time, 2))
+
+        except Exception as e:
+            if isinstance(e, RuntimeError):
+                logger.error("Job %s failed: %s", job_id, str(e))
+            else:
+                logger.exception("Unexpected error in job %s", job_id)
+            stages = dict(job.stages)
+            if job.stage in stages:
+                stages[job.stage] = {**stages[job.stage], "status": "failed"}
+            self.store.update(job_id, status="failed", error=str(e), stages=stages)
+            progress.stage("failed", error=str(e))
+
+    def _stage(self, job: JobRecord, stage: str, progress: ProgressReporter) -> JobRecord:
+        progress.stage(stage)
+        stages = dict(job.stages)
+        stages[stage] = {"status": "running", "started_at": utcnow().isoformat()}
+        return self.store.update(job.id, stage=stage, stages=stages)
+
+    def _finish_stage(self, job: JobRecord, stage: str, **fields) -> JobRecord:
+        stages = dict(job.stages)
+        started = stages.get(stage, {}).get("started_at")
+        finished = utcnow()
+        info = {**stages.get(stage, {}), "status": "done", "finished_at": finished.isoformat()}
+        if started:
+            info["elapsed_seconds"] = round(
+                (finished - datetime.fromisoformat(started)).total_seconds(), 2
+            )
+        stages[stage] = info
+        return self.store.update(job.id, stages=stages, **fields)
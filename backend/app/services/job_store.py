@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from copy import deepcopy
+from dataclasses import dataclass, field, asdict, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol
+
+"""
+This file defines the storage backends for background processing jobs.
+- InMemoryJobStore keeps jobs in a dict (lost on restart, useful for development).
+- SqliteJobStore persists jobs to a local SQLite file so they survive a restart.
+Finished jobs are removed after their retention period (see JobRunner).
+"""
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+JOB_STAGES = ("transcribing", "summarizing", "rendering")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class JobRecord:
+    id: str
+    llm_provider: str
+    output: str
+    original_filename: Optional[str]
+    audio_path: str
+    content_hash: Optional[str] = None  # sha256 of the upload, for the caches and meeting dedup
+    status: str = "queued"
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    transcript: Optional[str] = None
+    summary: Optional[Dict[str, Any]] = None
+    result_path: Optional[str] = None
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=utcnow)
+    updated_at: datetime = field(default_factory=utcnow)
+
+
+class JobStore(Protocol):
+    def create(self, job: JobRecord) -> None: ...
+
+    def get(self, job_id: str) -> Optional[JobRecord]: ...
+
+    def update(self, job_id: str, **fields: Any) -> JobRecord: ...
+
+    def list_unfinished(self) -> List[JobRecord]: ...
+
+    def remove_finished_before(self, cutoff: datetime) -> List[JobRecord]: ...
+
+
+class InMemoryJobStore:
+    def __init__(self) -> None:
+        self._jobs: Dict[str, JobRecord] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: JobRecord) -> None:
+        with self._lock:
+            self._jobs[job.id] = deepcopy(job)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return deepcopy(job) if job else None
+
+    def update(self, job_id: str, **fields: Any) -> JobRecord:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            job = replace(job, **fields, updated_at=utcnow())
+            self._jobs[job_id] = job
+            return deepcopy(job)
+
+    def list_unfinished(self) -> List[JobRecord]:
+        with self._lock:
+            return [
+                deepcopy(j) for j in self._jobs.values()
+                if j.status in ("queued", "running")
+            ]
+
+    def remove_finished_before(self, cutoff: datetime) -> List[JobRecord]:
+        with self._lock:
+            expired = [
+                j for j in self._jobs.values()
+                if j.status in ("succeeded", "failed") and j.updated_at < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+            return expired
+
+
+class SqliteJobStore:
+    _JSON_FIELDS = ("summary", "stages")
+    _DATE_FIELDS = ("created_at", "updated_at")
+
+    def __init__(self, db_path: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One shared connection guarded by a lock - job updates are small and infrequent
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    llm_provider TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    original_filename TEXT,
+                    audio_path TEXT NOT NULL,
+                    content_hash TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    error TEXT,
+                    transcript TEXT,
+                    summary TEXT,
+                    result_path TEXT,
+                    stages TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "content_hash" not in columns:
+                # Databases created before jobs recorded the upload's hash
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN content_hash TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+
+    def create(self, job: JobRecord) -> None:
+        row = self._to_row(job)
+        cols = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT INTO jobs ({cols}) VALUES ({marks})", tuple(row.values()))
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> JobRecord:
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        job = replace(job, **fields, updated_at=utcnow())
+        row = self._to_row(job)
+        row.pop("id")
+        assignments = ", ".join(f"{k} = ?" for k in row)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*row.values(), job_id),
+            )
+        return job
+
+    def list_unfinished(self) -> List[JobRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [self._from_row(r) for r in rows]
+
+    def remove_finished_before(self, cutoff: datetime) -> List[JobRecord]:
+        query = "FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?"
+        with self._lock, self._conn:
+            rows = self._conn.execute(f"SELECT * {query}", (cutoff.isoformat(),)).fetchall()
+            self._conn.execute(f"DELETE {query}", (cutoff.isoformat(),))
+        return [self._from_row(r) for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _to_row(self, job: JobRecord) -> Dict[str, Any]:
+        row = asdict(job)
+        for k in self._JSON_FIELDS:
+            row[k] = json.dumps(row[k]) if row[k] is not None else None
+        for k in self._DATE_FIELDS:
+            row[k] = row[k].isoformat()
+        return row
+
+    def _from_row(self, row: sqlite3.Row) -> JobRecord:
+        data = dict(row)
+        for k in self._JSON_FIELDS:
+            data[k] = json.loads(data[k]) if data[k] is not None else None
+        for k in self._DATE_FIELDS:
+            data[k] = datetime.fromisoformat(data[k])
+        return JobRecord(**data)
+
+
+def create_job_store(backend: str, db_path: Path) -> JobStore:
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        return SqliteJobStore(db_path)
+    raise ValueError(f"Unknown job store backend: {backend}")
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import anyio
+
+from app.config import (
+    LIVE_MAX_CONCURRENT_WINDOWS,
+    LIVE_MAX_SESSION_SECONDS,
+    LIVE_WINDOW_OVERLAP_SECONDS,
+    LIVE_WINDOW_SECONDS,
+)
+from app.services.audio_chunking_service import stitch_transcripts
+from app.services.client_registry import ClientRegistry
+from app.services.whisper_service import transcribe_with_whisper_async
+
+"""
+This file turns a live audio stream into a transcript while the meeting is
+still going on.
+- Raw PCM frames are buffered into rolling windows (LIVE_WINDOW_SECONDS long,
+  overlapping by LIVE_WINDOW_OVERLAP_SECONDS); each window is handed to the
+  transcriber as soon as it is full, and up to LIVE_MAX_CONCURRENT_WINDOWS are
+  transcribed at the same time.
+- Window texts are stitched back together in window order, whatever order they
+  finish in, and the new text is published as an event. The last few words of
+  each window are held back until the next one arrives, because the overlap may
+  still change them; text that has been published never changes.
+- The transcriber is any async callable taking a LiveWindow, so the scheduler
+  can be driven by a stub instead of Whisper.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Words at the end of the stitched text kept back until the next window is merged;
+# comfortably more than are spoken during the window overlap
+HOLD_BACK_WORDS = 16
+# A shorter tail left when the stream stops is not worth a transcription request
+MIN_WINDOW_SECONDS = 0.5
+
+
+class LiveSessionLimitError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Raw little-endian PCM, as sent by the client."""
+    sample_rate: int = 16000
+    channels: int = 1
+    sample_width: int = 2
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.sample_width
+
+    def seconds(self, n_bytes: int) -> float:
+        return n_bytes / (self.frame_bytes * self.sample_rate)
+
+    def bytes_for(self, seconds: float) -> int:
+        return int(seconds * self.sample_rate) * self.frame_bytes
+
+
+@dataclass(frozen=True)
+class LiveWindow:
+    index: int
+    start_seconds: float
+    end_seconds: float
+    pcm: bytes
+    audio: AudioFormat
+
+    def write_wav(self, path: Path) -> Path:
+        with wave.open(str(path), "wb") as dst:
+            dst.setnchannels(self.audio.channels)
+            dst.setsampwidth(self.audio.sample_width)
+            dst.setframerate(self.audio.sample_rate)
+            dst.writeframes(self.pcm)
+        return path
+
+
+Transcriber = Callable[[LiveWindow], Awaitable[str]]
+EventSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class LiveWindowScheduler:
+    def __init__(
+        self,
+        audio: AudioFormat,
+        transcribe: Transcriber,
+        on_event: EventSink,
+        window_seconds: float = LIVE_WINDOW_SECONDS,
+        overlap_seconds: float = LIVE_WINDOW_OVERLAP_SECONDS,
+        max_concurrency: int = LIVE_MAX_CONCURRENT_WINDOWS,
+        max_session_seconds: float = LIVE_MAX_SESSION_SECONDS,
+    ) -> None:
+        self.audio = audio
+        self.transcribe = transcribe
+        self.on_event = on_event
+        self.window_bytes = max(audio.frame_bytes, audio.bytes_for(window_seconds))
+        self.overlap_bytes = min(audio.bytes_for(overlap_seconds), self.window_bytes // 2)
+        self.overlap_seconds = audio.seconds(self.overlap_bytes)
+        self.max_session_bytes = audio.bytes_for(max_session_seconds)
+        self.bytes_received = 0
+        self._buffer = bytearray()
+        self._buffer_start = 0  # stream offset (bytes) of the first buffered byte
+        self._windows = 0
+        self._limiter = asyncio.Semaphore(max(1, max_concurrency))
+        self._tasks: Set[asyncio.Task] = set()
+        self._results: Dict[int, Tuple[LiveWindow, str]] = {}  # finished windows not stitched yet
+        self._emitted: List[str] = []  # published words
+        self._held: List[str] = []  # stitched words not published yet
+        self._next_to_emit = 0
+        self._emit_lock = asyncio.Lock()
+
+    @property
+    def seconds_received(self) -> float:
+        return self.audio.seconds(self.bytes_received)
+
+    async def feed(self, data: bytes) -> None:
+        """Add audio; every window that fills up is scheduled for transcription right away."""
+        if self.bytes_received + len(data) > self.max_session_bytes:
+            raise LiveSessionLimitError(
+                f"Live sessions are limited to {self.audio.seconds(self.max_session_bytes) / 60:.0f} minutes"
+            )
+        self.bytes_received += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.window_bytes:
+            self._close_window(self.window_bytes)
+            step = self.window_bytes - self.overlap_bytes
+            del self._buffer[:step]
+            self._buffer_start += step
+
+    async def finish(self) -> str:
+        """Transcribe what is left of the stream, wait for every window and return the full transcript."""
+        # The tail still holds the overlap of the last closed window; only send it if it adds audio
+        tail = len(self._buffer) - (self.overlap_bytes if self._windows else 0)
+        if self.audio.seconds(tail) >= MIN_WINDOW_SECONDS:
+            self._close_window(len(self._buffer) - len(self._buffer) % self.audio.frame_bytes)
+        self._buffer.clear()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        async with self._emit_lock:
+            if self._held:
+                await self._publish(self._held, final=True)
+                self._held = []
+        return " ".join(self._emitted)
+
+    async def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _close_window(self, n_bytes: int) -> None:
+        window = LiveWindow(
+            index=self._windows,
+            start_seconds=self.audio.seconds(self._buffer_start),
+            end_seconds=self.audio.seconds(self._buffer_start + n_bytes),
+            pcm=bytes(self._buffer[:n_bytes]),
+            audio=self.audio,
+        )
+        self._windows += 1
+        task = asyncio.create_task(self._run(window))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, window: LiveWindow) -> None:
+        async with self._limiter:
+            try:
+                text = await self.transcribe(window)
+            except Exception as e:
+                # One lost window should not end the meeting; the client is told and the stream goes on
+                logger.warning("Live window %d failed: %s", window.index, e)
+                await self.on_event({"type": "window_failed", "window": window.index, "detail": str(e)})
+                text = ""
+        self._results[window.index] = (window, text)
+        await self._emit_ready()
+
+    async def _emit_ready(self) -> None:
+        async with self._emit_lock:
+            while self._next_to_emit in self._results:
+                window, text = self._results.pop(self._next_to_emit)
+                self._next_to_emit += 1
+                # Only the held-back words can be changed by the overlap, so stitch against those
+                words = stitch_transcripts([" ".join(self._held), text], self.overlap_seconds).split()
+                self._held = words[-HOLD_BACK_WORDS:]
+                await self._publish(words[:-HOLD_BACK_WORDS], window)
+
+    async def _publish(self, words: List[str], window: Optional[LiveWindow] = None, final: bool = False) -> None:
+        if not words:
+            return
+        self._emitted.extend(words)
+        event: Dict[str, Any] = {"type": "transcript", "text": " ".join(words), "final": final}
+        if window is not None:
+            event.update(window=window.index, audio_seconds=round(window.end_seconds, 2))
+        await self.on_event(event)
+
+
+def whisper_transcriber(clients: ClientRegistry, work_dir: Path) -> Transcriber:
+    """Transcribe each window with Whisper, through a WAV file in `work_dir`."""
+
+    async def transcribe(window: LiveWindow) -> str:
+        path = await anyio.to_thread.run_sync(window.write_wav, work_dir / f"window_{window.index:05d}.wav")
+        try:
+            return await transcribe_with_whisper_async(str(path), client=clients.async_openai)
+        finally:
+            await anyio.Path(path).unlink(missing_ok=True)
+
+    return transcribe
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.schemas.meeting_summary import MeetingSummary
+
+"""
+This file persists processed meetings (transcript, summary fields, action items
+and provider) in SQLite so they can be looked up later without calling any API.
+- meetings_fts is an FTS5 index over the summary, participants, decisions,
+  action items and transcript; /meetings/search queries it ranked by bm25.
+- action_items is a plain table with an index on the owner (case-insensitive),
+  for /action-items?owner=.
+- A recording (by audio hash) summarized again with the same provider replaces
+  its earlier meeting instead of being stored twice.
+"""
+
+logger = logging.getLogger(__name__)
+
+_QUERY_TERM = re.compile(r"(\w+)(\*?)")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MeetingStore:
+    def __init__(self, db_path: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One shared connection guarded by a lock, like the job store; FTS lookups take milliseconds
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS meetings (
+                    pk INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    original_filename TEXT,
+                    llm_provider TEXT,
+                    audio_sha256 TEXT,
+                    transcript TEXT NOT NULL,
+                    meeting_summary TEXT NOT NULL,
+                    participants TEXT NOT NULL,
+                    decisions TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_meetings_audio ON meetings(audio_sha256, llm_provider);
+                CREATE INDEX IF NOT EXISTS idx_meetings_created ON meetings(created_at);
+
+                CREATE TABLE IF NOT EXISTS action_items (
+                    meeting_pk INTEGER NOT NULL REFERENCES meetings(pk) ON DELETE CASCADE,
+                    position INTEGER NOT NULL,
+                    task TEXT NOT NULL,
+                    owner TEXT COLLATE NOCASE,
+                    due_date TEXT,
+                    priority TEXT,
+                    PRIMARY KEY (meeting_pk, position)
+                );
+                CREATE INDEX IF NOT EXISTS idx_action_items_owner ON action_items(owner);
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(
+                    meeting_summary, participants, decisions, action_items, transcript,
+                    tokenize = 'porter unicode61'
+                );
+                """
+            )
+
+    def save(
+        self,
+        summary: MeetingSummary,
+        transcript: str,
+        original_filename: Optional[str],
+        llm_provider: Optional[str],
+        audio_sha256: Optional[str] = None,
+    ) -> str:
+        """Store a processed meeting and return its id."""
+        meeting_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            if audio_sha256:
+                row = self._conn.execute(
+                    "SELECT pk, id FROM meetings WHERE audio_sha256 = ? AND llm_provider IS ?",
+                    (audio_sha256, llm_provider),
+                ).fetchone()
+                if row:
+                    meeting_id = row["id"]
+                    self._delete(row["pk"])
+
+            pk = self._conn.execute(
+                """
+                INSERT INTO meetings (id, original_filename, llm_provider, audio_sha256, transcript,
+                                      meeting_summary, participants, decisions, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    meeting_id, original_filename, llm_provider, audio_sha256, transcript,
+                    summary.meeting_summary, json.dumps(summary.participants), json.dumps(summary.decisions),
+                    utcnow().isoformat(),
+                ),
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO action_items (meeting_pk, position, task, owner, due_date, priority) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (pk, i, it.task, (it.owner or "").strip() or None, it.due_date, it.priority)
+                    for i, it in enumerate(summary.action_items)
+                ],
+            )
+            self._conn.execute(
+                """
+                INSERT INTO meetings_fts (rowid, meeting_summary, participants, decisions, action_items, transcript)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    pk,
+                    summary.meeting_summary,
+                    "\n".join(summary.participants),
+                    "\n".join(summary.decisions),
+                    "\n".join(" ".join(filter(None, (it.task, it.owner, it.due_date))) for it in summary.action_items),
+                    transcript,
+                ),
+            )
+        return meeting_id
+
+    def get(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT task, owner, due_date, priority FROM action_items WHERE meeting_pk = ? ORDER BY position",
+                (row["pk"],),
+            ).fetchall()
+        meeting = self._meeting(row)
+        return {
+            "id": meeting.pop("id"),
+            "original_filename": meeting.pop("original_filename"),
+            "llm_provider": meeting.pop("llm_provider"),
+            "created_at": meeting.pop("created_at"),
+            "transcript": row["transcript"],
+            "summary": {**meeting, "action_items": [dict(it) for it in items]},
+        }
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Meetings matching all words of `query`, best match first, with a highlighted snippet."""
+        match = fts_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT m.id, m.original_filename, m.llm_provider, m.created_at,
+                       m.meeting_summary, m.participants, m.decisions,
+                       snippet(meetings_fts, -1, '[', ']', '...', 16) AS snippet, meetings_fts.rank AS rank
+                FROM meetings_fts JOIN meetings m ON m.pk = meetings_fts.rowid
+                WHERE meetings_fts MATCH ?
+                ORDER BY meetings_fts.rank
+                LIMIT ? OFFSET ?
+                """,
+                (match, limit, offset),
+            ).fetchall()
+        return [{**self._meeting(r), "snippet": r["snippet"], "score": round(-r["rank"], 4)} for r in rows]
+
+    def action_items(
+        self,
+        owner: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Action items, newest meeting first; `owner` matches case-insensitively."""
+        conditions, params = [], []
+        if owner is not None:
+            conditions.append("a.owner = ?")
+            params.append(owner.strip())
+        if priority is not None:
+            conditions.append("a.priority = ?")
+            params.append(priority)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT m.id AS meeting_id, m.original_filename, m.created_at,
+                       a.task, a.owner, a.due_date, a.priority
+                FROM action_items a JOIN meetings m ON m.pk = a.meeting_pk
+                {where}
+                ORDER BY m.created_at DESC, a.position
+                LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            meetings = self._conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
+            items = self._conn.execute("SELECT COUNT(*) FROM action_items").fetchone()[0]
+        return {"meetings": meetings, "action_items": items}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _delete(self, pk: int) -> None:
+        self._conn.execute("DELETE FROM meetings_fts WHERE rowid = ?", (pk,))
+        self._conn.execute("DELETE FROM meetings WHERE pk = ?", (pk,))
+
+    def _meeting(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "original_filename": row["original_filename"],
+            "llm_provider": row["llm_provider"],
+            "created_at": row["created_at"],
+            "meeting_summary": row["meeting_summary"],
+            "participants": json.loads(row["participants"]),
+            "decisions": json.loads(row["decisions"]),
+        }
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query that matches all of its words.
+    Every word is quoted, so user input can't produce FTS syntax errors; a trailing
+    "*" on a word is kept as a prefix search.
+    """
+    return " ".join(f'"{word}"{star}' for word, star in _QUERY_TERM.findall(text))
+
+
+def save_meeting_safely(store: Optional[MeetingStore], *args: Any, **kwargs: Any) -> Optional[str]:
+    """Save to the store if there is one; a storage failure is logged, not raised (the result is still returned)."""
+    if store is None:
+        return None
+    try:
+        return store.save(*args, **kwargs)
+    except sqlite3.Error:
+        logger.exception("Could not store the meeting")
+        return None
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+"""
+This file holds the Prometheus metrics served on /metrics, in the plain-text
+exposition format (no client library needed).
+- Counters and histograms are updated where the work happens (HTTP requests,
+  pipeline stages, provider calls, retries, tokens).
+- Values that services already keep (cache hits, coalesced calls, upload disk
+  use, stored meetings) are read when /metrics is scraped, through collectors,
+  so they are not counted twice.
+"""
+
+PREFIX = "meeting_notes_"
+
+# Seconds; up to several minutes because a long transcription or a map-reduce summary is one stage
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]  # (name suffix, labels, value)
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]  # (name, type, help, samples)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name + "_total", help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe how long the block took (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        samples: List[Sample] = []
+        for key, counts, total in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self, extra_collectors: Iterable[Collector] = ()) -> str:
+        """The exposition text; `extra_collectors` are read for this scrape only (e.g. per-app state)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = [*self._collectors, *extra_collectors]
+
+        lines: List[str] = []
+        for m in metrics:
+            _write_family(lines, m.name, m.type, m.help, m.samples())
+        for collect in collectors:
+            for name, type_, help, samples in collect():
+                _write_family(lines, PREFIX + name, type_, help, samples)
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+def _write_family(lines: List[str], name: str, type_: str, help: str, samples: List[Sample]) -> None:
+    lines.append(f"# HELP {name} {_escape_help(help)}")
+    lines.append(f"# TYPE {name} {type_}")
+    for suffix, labels, value in samples:
+        lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items()) + "}"
+
+
+def _escape_label(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests", "HTTP requests by route template and status code.", ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time until the response was fully sent.", ("method", "route"),
+)
+# stage: upload_write, transcription, whisper_request, llm_call, summary_validation, render.
+# detail: the provider, model or export format, "" when there is none.
+STAGE_SECONDS = registry.histogram(
+    "stage_duration_seconds", "Duration of the processing pipeline stages.", ("stage", "detail"),
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens", "Tokens reported by the provider in the response usage.", ("provider", "model", "type"),
+)
+PROVIDER_RETRIES = registry.counter(
+    "provider_retries", "Provider calls retried after a retryable error.", ("limiter", "reason"),
+)
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "rate_limit_rejections", "Provider calls rejected because they would wait too long.", ("limiter",),
+)
+RATE_LIMIT_WAIT_SECONDS = registry.histogram(
+    "rate_limit_wait_seconds", "Time spent waiting for rate-limit capacity before a call.", ("limiter",),
+)
+PROVIDER_FALLBACKS = registry.counter(
+    "provider_fallbacks", "Summaries sent to the other provider because the requested one was unavailable.",
+    ("requested", "fallback"),
+)
+AUDIO_BYTES = registry.counter(
+    "audio_transcribed_bytes", "Audio bytes sent for transcription (cache misses only).",
+)
+AUDIO_SECONDS = registry.counter(
+    "audio_transcribed_seconds", "Duration of the audio sent for transcription, where it could be read.",
+)
+AUDIO_PREPROCESS_SAVED_BYTES = registry.counter(
+    "audio_preprocess_saved_bytes", "Bytes not uploaded to Whisper thanks to audio pre-processing.", ("method",),
+)
+AUDIO_PREPROCESS_SAVED_SECONDS = registry.counter(
+    "audio_preprocess_saved_seconds", "Seconds of silence trimmed by audio pre-processing.", ("method",),
+)
+
+
+def stats_collector(name: str, help: str, stats: Callable[[], Optional[Dict[str, object]]]) -> Collector:
+    """Expose the numeric fields of a service's stats() dict as one gauge family, labelled by field."""
+    def collect():
+        values = stats()
+        if not values:
+            return []
+        return [(name, "gauge", help, [("", {"kind": key}, value) for key, value in _numeric_fields(values)])]
+    return collect
+
+
+def _numeric_fields(values: Dict[str, object], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    # Nested dicts are flattened: {"removed": {"expired": 3}} -> removed_expired
+    for key, value in values.items():
+        if isinstance(value, dict):
+            yield from _numeric_fields(value, f"{prefix}{key}_")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", float(value)
@@ -1,39 +1,180 @@
+from __future__ import annotations
+
 import json
 import os
-from typing import Any, Dict
-
-from openai import OpenAI
-from openai import RateLimitError, AuthenticationError, APIConnectionError
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
 
 from app.prompts.meeting_summary_prompt import SYSTEM_PROMPT_BASIC as SYSTEM_PROMPT
+from app.prompts.meeting_summary_prompt import SYSTEM_PROMPT_UPDATE
+from app.services.client_registry import get_client_registry
+from app.services.hierarchical_summary_service import estimate_tokens
+from app.services.metrics_service import LLM_TOKENS, STAGE_SECONDS
+from app.services.rate_limit_service import (
+    ProviderUnavailableError,
+    call_with_retries,
+    call_with_retries_async,
+    rate_limiters,
+)
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+    from openai.types.responses import Response
 
-def summarize_transcript_with_openai(transcript: str) -> Dict[str, Any]:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is missing. Set it in backend/.env")
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+# Used to size the tokens/min reservation; settled against the real usage afterwards
+EXPECTED_OUTPUT_TOKENS = 1024
 
-    client = OpenAI(api_key=api_key)
 
-    try:
+def summarize_transcript_with_openai(
+    transcript: str,
+    client: Optional[OpenAI] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    return _call(_build_input(transcript), _estimate_tokens(transcript), client, on_delta)
+
+
+async def summarize_transcript_with_openai_async(
+    transcript: str,
+    client: Optional[AsyncOpenAI] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    return await _call_async(_build_input(transcript), _estimate_tokens(transcript), client, on_delta)
+
+
+def update_summary_with_openai(
+    changes: str,
+    client: Optional[OpenAI] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Summary changes (a SummaryUpdate dict) for the current summary and transcript edits described in `changes`."""
+    return _call(_build_update_input(changes), _estimate_update_tokens(changes), client, on_delta)
+
+
+async def update_summary_with_openai_async(
+    changes: str,
+    client: Optional[AsyncOpenAI] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    return await _call_async(_build_update_input(changes), _estimate_update_tokens(changes), client, on_delta)
+
+
+def _call(
+    input: List[Dict[str, str]],
+    tokens: int,
+    client: Optional[OpenAI],
+    on_delta: Optional[Callable[[str], None]],
+) -> Dict[str, Any]:
+    if client is None:
+        client = get_client_registry().openai
+
+    def create() -> Response:
         # We ask the model to output raw JSON text that we will parse.
-        response = client.responses.create(
-            model="gpt-4.1-mini",  # will try a few more optional models
-            input=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Transcript:\n{transcript}"},
-            ],
+        # Only the request itself is timed, not the rate-limit waits and retry backoff around it
+        with STAGE_SECONDS.time(stage="llm_call", detail="openai"):
+            if on_delta is None:
+                return client.responses.create(model=DEFAULT_MODEL, input=input)
+            with client.responses.stream(model=DEFAULT_MODEL, input=input) as stream:
+                for event in stream:
+                    if event.type == "response.output_text.delta":
+                        on_delta(event.delta)
+                return stream.get_final_response()
+
+    with _translate_errors():
+        response = call_with_retries(
+            create,
+            rate_limiters.get("openai", DEFAULT_MODEL),
+            tokens=tokens,
+            count_tokens=_used_tokens,
+        )
+        _record_usage(response)
+        return json.loads(response.output_text)
+
+
+async def _call_async(
+    input: List[Dict[str, str]],
+    tokens: int,
+    client: Optional[AsyncOpenAI],
+    on_delta: Optional[Callable[[str], None]],
+) -> Dict[str, Any]:
+    if client is None:
+        client = get_client_registry().async_openai
+
+    async def create() -> Response:
+        with STAGE_SECONDS.time(stage="llm_call", detail="openai"):
+            if on_delta is None:
+                return await client.responses.create(model=DEFAULT_MODEL, input=input)
+            async with client.responses.stream(model=DEFAULT_MODEL, input=input) as stream:
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        on_delta(event.delta)
+                return await stream.get_final_response()
+
+    with _translate_errors():
+        response = await call_with_retries_async(
+            create,
+            rate_limiters.get("openai", DEFAULT_MODEL),
+            tokens=tokens,
+            count_tokens=_used_tokens,
         )
+        _record_usage(response)
+        return json.loads(response.output_text)
+
+
+def _estimate_tokens(transcript: str) -> int:
+    return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(transcript) + EXPECTED_OUTPUT_TOKENS
+
+
+def _estimate_update_tokens(changes: str) -> int:
+    return estimate_tokens(SYSTEM_PROMPT_UPDATE) + estimate_tokens(changes) + EXPECTED_OUTPUT_TOKENS
+
+
+def _used_tokens(response: Response) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return usage.total_tokens if usage is not None else None
 
-        text = response.output_text
-        data = json.loads(text)
-        return data
 
+def _record_usage(response: Response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.input_tokens, provider="openai", model=DEFAULT_MODEL, type="input")
+    LLM_TOKENS.inc(usage.output_tokens, provider="openai", model=DEFAULT_MODEL, type="output")
+    # OpenAI caches long prompt prefixes by itself; the cached part is included in input_tokens
+    cached = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", None) or 0
+    LLM_TOKENS.inc(cached, provider="openai", model=DEFAULT_MODEL, type="cache_read")
+
+
+def _build_input(transcript: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Transcript:\n{transcript}"},
+    ]
+
+
+def _build_update_input(changes: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT_UPDATE},
+        {"role": "user", "content": changes},
+    ]
+
+
+@contextmanager
+def _translate_errors() -> Iterator[None]:
+    # The SDK is loaded on first use (see client_registry)
+    from openai import RateLimitError, AuthenticationError, APIConnectionError, APIStatusError
+
+    try:
+        yield
     except RateLimitError as e:
-        raise RuntimeError("OpenAI API quota exceeded. Please check billing configuration.") from e
+        raise ProviderUnavailableError("OpenAI API quota exceeded. Please check billing configuration.") from e
     except AuthenticationError as e:
         raise RuntimeError("OpenAI authentication failed. Please verify the API key.") from e
     except APIConnectionError as e:
-        raise RuntimeError("Failed to connect to OpenAI. Please check your network connection.") from e
+        raise ProviderUnavailableError("Failed to connect to OpenAI. Please check your network connection.") from e
+    except APIStatusError as e:
+        if e.status_code >= 500:
+            raise ProviderUnavailableError(f"OpenAI is unavailable (HTTP {e.status_code}). Please try again later.") from e
+        raise
     except json.JSONDecodeError as e:
         raise RuntimeError("Model output was not valid JSON. Please refine the prompt or add retries.") from e
@@ -0,0 +1,303 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import anyio
+from pydantic import ValidationError
+
+from app.config import (
+    LLM_FALLBACK_ENABLED,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_INCREMENTAL_MAX_CHANGE_RATIO,
+    SUMMARY_MAX_WORKERS,
+)
+from app.schemas.meeting_summary import MeetingSummary, SummaryUpdate
+from app.services import claude_summary_service, openai_summary_service
+from app.services.client_registry import ClientRegistry, get_client_registry
+from app.services.hierarchical_summary_service import (
+    estimate_tokens,
+    summarize_hierarchically,
+    summarize_hierarchically_async,
+)
+from app.services.incremental_summary_service import (
+    SummaryRevision,
+    apply_summary_update,
+    build_update_input,
+    diff_transcripts,
+)
+from app.services.metrics_service import PROVIDER_FALLBACKS, STAGE_SECONDS
+from app.services.progress_service import ProgressReporter
+from app.services.rate_limit_service import ProviderUnavailableError
+from app.services.single_flight_service import summary_flights
+from app.services.summary_cache_service import summary_cache, summary_cache_key
+from app.services.docx_package_service import RenderedDocx
+from app.services.export_metadata import WordExportMetadata
+
+"""
+This file holds the summarize and render stages of the processing pipeline,
+shared by the /process and /summarize routes and the background job workers.
+Summaries are memoized per (transcript, provider, model, prompt), and transcripts
+longer than SUMMARY_CHUNK_TOKENS are summarized map-reduce style.
+When a progress reporter is given, partial LLM output is streamed to it.
+If the requested provider is rate limited or down (after retries), the other
+provider is used instead; such summaries are not cached.
+Identical summaries that are already in flight are shared, not requested twice.
+An edited transcript can be re-summarized incrementally from its previous summary:
+only the changed part is sent (see incremental_summary_service).
+"""
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_PROVIDERS = {"claude": "openai", "openai": "claude"}
+
+
+def summarize_transcript(
+    transcript: str,
+    llm_provider: str,
+    clients: Optional[ClientRegistry] = None,
+    progress: Optional[ProgressReporter] = None,
+) -> MeetingSummary:
+    key = _summary_key(transcript, llm_provider)
+
+    cached = summary_cache.get(key)
+    if cached is not None:
+        logger.info("Summary cache hit (%s, %s)", llm_provider, key[:12])
+        return cached
+
+    def summarize() -> MeetingSummary:
+        # Re-check: an identical call may have finished since the lookup above
+        cached = summary_cache.get(key)
+        if cached is not None:
+            return cached
+
+        summarize_chunk = _FallbackSummarizer(llm_provider, clients or get_client_registry(), progress)
+        if estimate_tokens(transcript) > SUMMARY_CHUNK_TOKENS:
+            logger.info("Long transcript (~%d tokens), using map-reduce summarization",
+                        estimate_tokens(transcript))
+            summary = summarize_hierarchically(
+                transcript,
+                summarize_chunk,
+                max_chunk_tokens=SUMMARY_CHUNK_TOKENS,
+                max_workers=SUMMARY_MAX_WORKERS,
+                on_chunk_done=progress.chunk_done("summarizing") if progress else None,
+                detail=llm_provider,
+            )
+        else:
+            on_delta = progress.summary_delta if progress else None
+            result = summarize_chunk(transcript, on_delta=on_delta)
+            with STAGE_SECONDS.time(stage="summary_validation", detail=llm_provider):
+                summary = MeetingSummary.model_validate(result)
+
+        # A summary written by the fallback provider must not be cached as the requested one
+        if not summarize_chunk.fell_back:
+            summary_cache.put(key, summary)
+        return summary
+
+    return summary_flights.run(key, summarize)
+
+
+async def summarize_transcript_async(
+    transcript: str,
+    llm_provider: str,
+    clients: Optional[ClientRegistry] = None,
+    progress: Optional[ProgressReporter] = None,
+) -> MeetingSummary:
+    key = _summary_key(transcript, llm_provider)
+
+    cached = await anyio.to_thread.run_sync(summary_cache.get, key)
+    if cached is not None:
+        logger.info("Summary cache hit (%s, %s)", llm_provider, key[:12])
+        return cached
+
+    async def summarize() -> MeetingSummary:
+        cached = await anyio.to_thread.run_sync(summary_cache.get, key)
+        if cached is not None:
+            return cached
+
+        summarize_chunk = _AsyncFallbackSummarizer(llm_provider, clients or get_client_registry(), progress)
+        if estimate_tokens(transcript) > SUMMARY_CHUNK_TOKENS:
+            logger.info("Long transcript (~%d tokens), using map-reduce summarization",
+                        estimate_tokens(transcript))
+            summary = await summarize_hierarchically_async(
+                transcript,
+                summarize_chunk,
+                max_chunk_tokens=SUMMARY_CHUNK_TOKENS,
+                max_concurrency=SUMMARY_MAX_WORKERS,
+                on_chunk_done=progress.chunk_done("summarizing") if progress else None,
+                detail=llm_provider,
+            )
+        else:
+            on_delta = progress.summary_delta if progress else None
+            result = await summarize_chunk(transcript, on_delta=on_delta)
+            with STAGE_SECONDS.time(stage="summary_validation", detail=llm_provider):
+                summary = MeetingSummary.model_validate(result)
+
+        if not summarize_chunk.fell_back:
+            await anyio.to_thread.run_sync(summary_cache.put, key, summary)
+        return summary
+
+    return await summary_flights.run_async(key, summarize)
+
+
+async def update_summary_async(
+    previous_summary: MeetingSummary,
+    previous_transcript: str,
+    transcript: str,
+    llm_provider: str,
+    clients: Optional[ClientRegistry] = None,
+) -> SummaryRevision:
+    """Bring `previous_summary` (of `previous_transcript`) up to date with the edited `transcript`."""
+    diff = diff_transcripts(previous_transcript, transcript)
+    if not diff.hunks:
+        return SummaryRevision(previous_summary, "unchanged")
+
+    update_input = build_update_input(previous_summary, diff)
+    if (
+        not previous_transcript.strip()
+        or diff.changed_chars > SUMMARY_INCREMENTAL_MAX_CHANGE_RATIO * len(transcript)
+        or estimate_tokens(update_input) > SUMMARY_CHUNK_TOKENS
+    ):
+        logger.info("Transcript changed too much for an incremental summary, summarizing it again")
+        return SummaryRevision(await summarize_transcript_async(transcript, llm_provider, clients), "full")
+
+    service = openai_summary_service if llm_provider == "openai" else claude_summary_service
+    key = summary_cache_key(
+        update_input, provider=llm_provider, model=service.DEFAULT_MODEL, system_prompt=service.SYSTEM_PROMPT_UPDATE,
+    )
+    logger.info("Incremental summary update (%d changed segments, ~%d tokens)",
+                diff.changed_segments, estimate_tokens(update_input))
+
+    async def update() -> SummaryRevision:
+        cached = await anyio.to_thread.run_sync(summary_cache.get, key)
+        if cached is not None:
+            return SummaryRevision(cached, "incremental")
+
+        updater = _AsyncFallbackUpdater(llm_provider, clients or get_client_registry(), None)
+        result = await updater(update_input)
+        try:
+            with STAGE_SECONDS.time(stage="summary_validation", detail=llm_provider):
+                summary = apply_summary_update(previous_summary, SummaryUpdate.model_validate(result))
+        except ValidationError as e:
+            logger.warning("Malformed summary update from %s (%d errors), summarizing again",
+                           llm_provider, e.error_count())
+            return SummaryRevision(await summarize_transcript_async(transcript, llm_provider, clients), "full")
+        if not updater.fell_back:
+            await anyio.to_thread.run_sync(summary_cache.put, key, summary)
+        return SummaryRevision(summary, "incremental")
+
+    return await summary_flights.run_async(key, update)
+
+
+class _FallbackSummarizer:
+    """Summarizes with the requested provider and retries with the other one if it is unavailable."""
+
+    def __init__(self, llm_provider: str, clients: ClientRegistry, progress: Optional[ProgressReporter]) -> None:
+        self.llm_provider = llm_provider
+        self.clients = clients
+        self.progress = progress
+        self.fell_back = False
+
+    def __call__(self, transcript: str, on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        try:
+            return self._summarize(self.llm_provider, transcript, on_delta)
+        except ProviderUnavailableError as e:
+            fallback = _fallback_for(self.llm_provider, e, self.progress)
+            if fallback is None:
+                raise
+            try:
+                result = self._summarize(fallback, transcript, on_delta)
+            except RuntimeError:
+                # Also unavailable (or not configured) - report the original problem
+                raise e
+            self.fell_back = True
+            return result
+
+    def _summarize(self, provider: str, transcript: str, on_delta) -> Dict[str, Any]:
+        if provider == "openai":
+            return openai_summary_service.summarize_transcript_with_openai(
+                transcript, client=self.clients.openai, on_delta=on_delta
+            )
+        return claude_summary_service.summarize_transcript_with_claude(
+            transcript, client=self.clients.anthropic, on_delta=on_delta
+        )
+
+
+class _AsyncFallbackSummarizer(_FallbackSummarizer):
+    async def __call__(self, transcript: str, on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        try:
+            return await self._summarize(self.llm_provider, transcript, on_delta)
+        except ProviderUnavailableError as e:
+            fallback = _fallback_for(self.llm_provider, e, self.progress)
+            if fallback is None:
+                raise
+            try:
+                result = await self._summarize(fallback, transcript, on_delta)
+            except RuntimeError:
+                raise e
+            self.fell_back = True
+            return result
+
+    async def _summarize(self, provider: str, transcript: str, on_delta) -> Dict[str, Any]:
+        if provider == "openai":
+            return await openai_summary_service.summarize_transcript_with_openai_async(
+                transcript, client=self.clients.async_openai, on_delta=on_delta
+            )
+        return await claude_summary_service.summarize_transcript_with_claude_async(
+            transcript, client=self.clients.async_anthropic, on_delta=on_delta
+        )
+
+
+class _AsyncFallbackUpdater(_AsyncFallbackSummarizer):
+    """Asks for the changes to an existing summary instead of a new one."""
+
+    async def _summarize(self, provider: str, update_input: str, on_delta) -> Dict[str, Any]:
+        if provider == "openai":
+            return await openai_summary_service.update_summary_with_openai_async(
+                update_input, client=self.clients.async_openai, on_delta=on_delta
+            )
+        return await claude_summary_service.update_summary_with_claude_async(
+            update_input, client=self.clients.async_anthropic, on_delta=on_delta
+        )
+
+
+def _fallback_for(
+    llm_provider: str,
+    error: ProviderUnavailableError,
+    progress: Optional[ProgressReporter],
+) -> Optional[str]:
+    if not LLM_FALLBACK_ENABLED:
+        return None
+    fallback = FALLBACK_PROVIDERS[llm_provider]
+    logger.warning("%s unavailable (%s), falling back to %s", llm_provider, error, fallback)
+    PROVIDER_FALLBACKS.inc(requested=llm_provider, fallback=fallback)
+    if progress:
+        progress.event("provider_fallback", requested=llm_provider, fallback=fallback, reason=str(error))
+    return fallback
+
+
+def _summary_key(transcript: str, llm_provider: str) -> str:
+    service = openai_summary_service if llm_provider == "openai" else claude_summary_service
+    return summary_cache_key(
+        transcript,
+        provider=llm_provider,
+        model=service.DEFAULT_MODEL,
+        system_prompt=service.SYSTEM_PROMPT,
+    )
+
+
+def render_docx(
+    summary: MeetingSummary,
+    transcript: Optional[str],
+    original_filename: Optional[str],
+    llm_provider: Optional[str],
+) -> RenderedDocx:
+    meta = WordExportMetadata(
+        original_filename=original_filename,
+        llm_provider=llm_provider,
+        generated_at=datetime.now(timezone.utc),
+    )
+    # Loaded on first use, see export_service
+    from app.services.word_export_service import render_docx_from_summary
+
+    with STAGE_SECONDS.time(stage="render", detail="docx"):
+        return render_docx_from_summary(summary, meta)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+from time import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import PROGRESS_CHANNEL_TTL_SECONDS
+
+"""
+This file implements an in-process event bus for pipeline progress.
+Each processing run (a /process request or a background job) publishes stage
+events to a channel keyed by its id; SSE clients subscribe to that channel and
+receive the full history followed by live events.
+- Publishing is thread-safe, so both async routes and job worker threads can report.
+- A run opens its channel before it starts, so an id that is still in use (or
+  recently finished) cannot be taken over, and subscribing to an id that was
+  never opened is refused.
+- Channels are kept for a while after the run finishes so late subscribers still
+  get the complete history, then they are dropped; expired channels are swept
+  as events are published, not only when someone subscribes.
+- Consecutive summary_delta events are stored as one event holding the text so
+  far, so the history of a run does not grow with every streamed token.
+"""
+
+TERMINAL_EVENTS = ("done", "failed")
+# Expired channels are looked for at most this often while publishing
+PRUNE_INTERVAL_SECONDS = 30.0
+
+
+class ChannelInUseError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    id: int
+    event: str
+    data: Dict[str, Any]
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.event}\ndata: {json.dumps(self.data)}\n\n"
+
+
+@dataclass
+class _Channel:
+    events: List[ProgressEvent] = field(default_factory=list)
+    subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = field(default_factory=list)
+    finished: bool = False
+    last_activity: float = field(default_factory=time)
+    next_id: int = 0
+
+
+class ProgressTracker:
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time()
+
+    def open(self, channel_id: str) -> None:
+        """Create the channel of a new run; the id must not be live or remembered from a recent run."""
+        with self._lock:
+            self._prune()
+            if channel_id in self._channels:
+                raise ChannelInUseError(f"Progress id {channel_id} is already in use")
+            self._channels[channel_id] = _Channel()
+
+    def exists(self, channel_id: str) -> bool:
+        with self._lock:
+            return channel_id in self._channels
+
+    def publish(self, channel_id: str, event: str, **data: Any) -> None:
+        with self._lock:
+            if time() - self._last_prune > PRUNE_INTERVAL_SECONDS:
+                self._prune()
+            channel = self._channels.setdefault(channel_id, _Channel())
+            if channel.finished:
+                return
+            ev = ProgressEvent(id=channel.next_id, event=event, data=data)
+            channel.next_id += 1
+            last = channel.events[-1] if channel.events else None
+            if event == "summary_delta" and last is not None and last.event == "summary_delta":
+                # Late subscribers get the text so far in one event, with the id of the latest delta
+                text = last.data.get("text", "") + data.get("text", "")
+                channel.events[-1] = ProgressEvent(id=ev.id, event=event, data={**data, "text": text})
+            else:
+                channel.events.append(ev)
+            channel.last_activity = time()
+            channel.finished = event in TERMINAL_EVENTS
+            subscribers = list(channel.subscribers)
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, ev)
+
+    async def subscribe(
+        self,
+        channel_id: str,
+        heartbeat_seconds: float = 15.0,
+    ) -> AsyncIterator[Optional[ProgressEvent]]:
+        """Yield past and live events; yields None when idle so callers can send keep-alives.
+
+        Ends right away if the channel is unknown (never opened, or already dropped).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._prune()
+            channel = self._channels.get(channel_id)
+            if channel is None:
+                return
+            history = list(channel.events)
+            finished = channel.finished
+            if not finished:
+                channel.subscribers.append(entry)
+
+        try:
+            for ev in history:
+                yield ev
+            if finished:
+                return
+
+            last_id = history[-1].id if history else -1
+            while True:
+                try:
+                    ev = await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if ev.id <= last_id:
+                    continue
+                last_id = ev.id
+                yield ev
+                if ev.event in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self._lock:
+                if entry in channel.subscribers:
+                    channel.subscribers.remove(entry)
+
+    def _prune(self) -> None:
+        now = time()
+        self._last_prune = now
+        expired = [
+            cid for cid, ch in self._channels.items()
+            if not ch.subscribers and now - ch.last_activity > self.ttl_seconds
+        ]
+        for cid in expired:
+            del self._channels[cid]
+
+
+progress_tracker = ProgressTracker(ttl_seconds=PROGRESS_CHANNEL_TTL_SECONDS)
+
+
+class ProgressReporter:
+    """Publishes events for one run, stamping each with the time since the run started."""
+
+    def __init__(self, channel_id: str, tracker: ProgressTracker = progress_tracker) -> None:
+        self.channel_id = channel_id
+        self.tracker = tracker
+        self._start = time()
+        self._stage_start = self._start
+
+    def stage(self, event: str, **data: Any) -> None:
+        now = time()
+        self.tracker.publish(
+            self.channel_id,
+            event,
+            elapsed_seconds=round(now - self._start, 3),
+            stage_seconds=round(now - self._stage_start, 3),
+            **data,
+        )
+        self._stage_start = now
+
+    def chunk_done(self, stage: str):
+        def report(done: int, total: int) -> None:
+            self.tracker.publish(
+                self.channel_id,
+                f"{stage}_chunk",
+                chunk=done,
+                total=total,
+                elapsed_seconds=round(time() - self._start, 3),
+            )
+        return report
+
+    def event(self, event: str, **data: Any) -> None:
+        """Publish an event that does not start a new stage (e.g. one file of a batch finishing)."""
+        self.tracker.publish(
+            self.channel_id,
+            event,
+            elapsed_seconds=round(time() - self._start, 3),
+            **data,
+        )
+
+    def summary_delta(self, text: str) -> None:
+        self.tracker.publish(self.channel_id, "summary_delta", text=text)
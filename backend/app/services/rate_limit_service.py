@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.config import (
+    LLM_BACKOFF_BASE_SECONDS,
+    LLM_BACKOFF_MAX_SECONDS,
+    LLM_MAX_ATTEMPTS,
+    RATE_LIMIT_MAX_WAIT_SECONDS,
+    RATE_LIMITS,
+)
+from app.services.metrics_service import PROVIDER_RETRIES, RATE_LIMIT_REJECTIONS, RATE_LIMIT_WAIT_SECONDS
+
+"""
+This file is the shared rate-limit and retry layer in front of the OpenAI and
+Anthropic APIs.
+- Every (provider, model) pair has token buckets for requests/min and tokens/min.
+  A call reserves capacity up front and sleeps until its reservation is covered,
+  so a burst is queued and spread out instead of being sent all at once. A call
+  that would have to wait longer than RATE_LIMIT_MAX_WAIT_SECONDS is rejected
+  with ProviderUnavailableError instead.
+- 429 / 5xx / connection errors are retried with jittered exponential backoff,
+  honouring the provider's Retry-After header. The token reservation of a
+  failed attempt is given back, so retries do not drain the bucket. A 429 also pauses the limiter,
+  so other callers for the same model back off too.
+- ProviderUnavailableError (a RuntimeError, so routes answer 503) tells callers
+  that another provider may be tried instead.
+"""
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = (408, 409, 429)
+
+
+class ProviderUnavailableError(RuntimeError):
+    """The provider is rate limited or failing; the request itself was fine."""
+
+
+class TokenBucket:
+    """A token bucket that hands out reservations; the level may go negative while callers wait."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` and return how long the caller must wait before it is covered."""
+        self._refill(now)
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    def __init__(self, name: str, rpm: int, tpm: int, max_wait_seconds: float) -> None:
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_wait_seconds = max_wait_seconds
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request (and `tokens` tokens); return the delay before sending it."""
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(tokens, self.tokens.capacity) if self.tokens else 0
+            delay = self.requests.reserve(1, now)
+            if self.tokens:
+                delay = max(delay, self.tokens.reserve(tokens, now))
+            delay = max(delay, self._paused_until - now)
+
+            if delay > self.max_wait_seconds:
+                RATE_LIMIT_REJECTIONS.inc(limiter=self.name)
+                self.requests.refund(1)
+                if self.tokens:
+                    self.tokens.refund(tokens)
+                raise ProviderUnavailableError(
+                    f"{self.name} is rate limited; the request would wait {delay:.0f}s. Please try again later."
+                )
+        RATE_LIMIT_WAIT_SECONDS.observe(delay, limiter=self.name)
+        return delay
+
+    def settle(self, reserved_tokens: int, used_tokens: Optional[int]) -> None:
+        """Correct a token reservation once the actual usage is known."""
+        if self.tokens is None or used_tokens is None:
+            return
+        with self._lock:
+            self.tokens.refund(reserved_tokens - used_tokens)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RateLimiterRegistry:
+    def __init__(self, limits: Dict[str, Dict[str, int]], max_wait_seconds: float) -> None:
+        self.limits = limits
+        self.max_wait_seconds = max_wait_seconds
+        self._limiters: Dict[Tuple[str, str], RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: str) -> RateLimiter:
+        key = (provider, model)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limits = self.limits.get(f"{provider}/{model}") or self.limits[provider]
+                limiter = RateLimiter(
+                    f"{provider}/{model}",
+                    rpm=limits["rpm"],
+                    tpm=limits.get("tpm", 0),
+                    max_wait_seconds=self.max_wait_seconds,
+                )
+                self._limiters[key] = limiter
+            return limiter
+
+
+rate_limiters = RateLimiterRegistry(RATE_LIMITS, max_wait_seconds=RATE_LIMIT_MAX_WAIT_SECONDS)
+
+
+def call_with_retries(
+    fn: Callable[[], T],
+    limiter: RateLimiter,
+    tokens: int = 0,
+    count_tokens: Optional[Callable[[T], Optional[int]]] = None,
+    max_attempts: int = LLM_MAX_ATTEMPTS,
+) -> T:
+    for attempt in range(1, max_attempts + 1):
+        time.sleep(limiter.reserve(tokens))
+        try:
+            result = fn()
+        except Exception as e:
+            # A failed attempt used no tokens; its reservation must not be charged again by the retry
+            limiter.settle(tokens, 0)
+            delay = _retry_delay(e, limiter, attempt, max_attempts)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        if count_tokens:
+            limiter.settle(tokens, count_tokens(result))
+        return result
+    raise AssertionError("unreachable")
+
+
+async def call_with_retries_async(
+    fn: Callable[[], Awaitable[T]],
+    limiter: RateLimiter,
+    tokens: int = 0,
+    count_tokens: Optional[Callable[[T], Optional[int]]] = None,
+    max_attempts: int = LLM_MAX_ATTEMPTS,
+) -> T:
+    for attempt in range(1, max_attempts + 1):
+        await asyncio.sleep(limiter.reserve(tokens))
+        try:
+            result = await fn()
+        except Exception as e:
+            # A failed attempt used no tokens; its reservation must not be charged again by the retry
+            limiter.settle(tokens, 0)
+            delay = _retry_delay(e, limiter, attempt, max_attempts)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        if count_tokens:
+            limiter.settle(tokens, count_tokens(result))
+        return result
+    raise AssertionError("unreachable")
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, _connection_errors()):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt."""
+    return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(exc: Exception, limiter: RateLimiter, attempt: int, max_attempts: int) -> Optional[float]:
+    """How long to wait before retrying `exc`, or None if it should be raised."""
+    if attempt >= max_attempts or not is_retryable(exc):
+        return None
+
+    retry_after = retry_after_seconds(exc)
+    if retry_after is not None and retry_after > limiter.max_wait_seconds:
+        # The provider asked for a longer pause than we are willing to wait
+        return None
+    delay = retry_after if retry_after is not None else backoff_delay(attempt)
+    if getattr(exc, "status_code", None) == 429:
+        limiter.pause(delay)
+
+    PROVIDER_RETRIES.inc(limiter=limiter.name, reason=_describe(exc))
+    logger.warning("%s call failed (%s), retrying in %.1fs (attempt %d/%d)",
+                   limiter.name, _describe(exc), delay, attempt + 1, max_attempts)
+    return delay
+
+
+def _connection_errors() -> Tuple[type, ...]:
+    # An SDK exception means that SDK is imported already; don't import one just to check
+    errors = (getattr(sys.modules.get(sdk), "APIConnectionError", None) for sdk in ("openai", "anthropic"))
+    return tuple(e for e in errors if e is not None)
+
+
+def _describe(exc: BaseException) -> Any:
+    status = getattr(exc, "status_code", None)
+    return f"HTTP {status}" if status else type(exc).__name__
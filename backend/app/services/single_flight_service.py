@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+"""
+This file implements single-flight deduplication of identical in-flight calls.
+The first caller for a key runs the call; callers that arrive with the same key
+while it is still running wait for that call's result instead of starting their
+own (e.g. a double-submitted upload, or a retry while /process is still busy).
+- Works across threads and event loops: the shared result is a
+  concurrent.futures.Future, which async callers await through asyncio.
+- Only in-flight calls are shared; once a call finishes its key is forgotten
+  (the transcript/summary caches take over from there).
+- If the leading request is cancelled (client went away), a waiting caller
+  takes over instead of failing with it.
+"""
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable[[], T]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result()
+                except _LeaderCancelled:
+                    continue
+
+            try:
+                result = fn()
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, result=result)
+            return result
+
+    async def run_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # shield: a waiting caller going away must not cancel the shared call
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except _LeaderCancelled:
+                    continue
+
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self._finish(key, future, error=_LeaderCancelled())
+                raise
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, result=result)
+            return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            future.set_running_or_notify_cancel()
+            self._in_flight[key] = future
+            self.calls += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result=None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+transcription_flights = SingleFlight("transcriptions")
+summary_flights = SingleFlight("summaries")
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_ENTRIES
+from app.schemas.meeting_summary import MeetingSummary
+
+"""
+This file implements a memoization cache for validated meeting summaries.
+The cache key is a hash of the normalized transcript, the LLM provider, the model name
+and the system prompt text, so changing the prompt or the model invalidates old entries
+automatically.
+- An in-memory LRU serves repeated requests within the same process.
+- An optional on-disk tier (SUMMARY_CACHE_DIR) keeps entries across restarts.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached payload format changes
+CACHE_FORMAT_VERSION = 1
+
+
+def normalize_transcript(transcript: str) -> str:
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in transcript.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def summary_cache_key(transcript: str, provider: str, model: str, system_prompt: str) -> str:
+    payload = json.dumps(
+        [CACHE_FORMAT_VERSION, provider, model, system_prompt, normalize_transcript(transcript)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    def __init__(self, max_entries: int, disk_dir: Optional[Path] = None) -> None:
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, MeetingSummary] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[MeetingSummary]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return summary.model_copy(deep=True)
+
+        summary = self._read_disk(key)
+        with self._lock:
+            if summary is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, summary)
+        return summary.model_copy(deep=True)
+
+    def put(self, key: str, summary: MeetingSummary) -> None:
+        with self._lock:
+            self._remember(key, summary.model_copy(deep=True))
+        self._write_disk(key, summary)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def _remember(self, key: str, summary: MeetingSummary) -> None:
+        self._entries[key] = summary
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[MeetingSummary]:
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            return MeetingSummary.model_validate_json(path.read_bytes())
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable summary cache entry %s", path.name)
+            return None
+
+    def _write_disk(self, key: str, summary: MeetingSummary) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(summary.model_dump_json(), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("Could not write summary cache entry %s", path.name)
+
+
+summary_cache = SummaryCache(max_entries=SUMMARY_CACHE_MAX_ENTRIES, disk_dir=SUMMARY_CACHE_DIR)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import html
+import json
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+from app.schemas.meeting_summary import MeetingSummary
+from app.services.export_metadata import WordExportMetadata, subtitle_text
+
+"""
+This file renders meeting summaries as Markdown, HTML and JSON Lines.
+The Markdown and HTML layouts follow the Word document (same sections, same
+fallback texts). The renderers are generators that yield one section at a time,
+so a response can start before the whole document is built.
+"""
+
+AI_NOTE = "Note: This document was generated by AI and may contain inaccuracies."
+
+
+def render_markdown(summary: MeetingSummary, meta: WordExportMetadata) -> Iterator[bytes]:
+    yield _lines(
+        "# Meeting Notes",
+        "",
+        f"_{_md_text(_subtitle(meta))}_",
+        "",
+        "## Executive Summary",
+        "",
+        _md_text((summary.meeting_summary or "").strip() or "No summary available."),
+        "",
+    )
+    yield _lines("## Participants", "", *_md_list(summary.participants, "- ", "Not identified."), "")
+    yield _lines("## Decisions", "", *_md_list(summary.decisions, "1. ", "No explicit decisions found."), "")
+
+    if not summary.action_items:
+        yield _lines("## Action Items", "", "No action items found.", "")
+    else:
+        rows = [
+            "| " + " | ".join(_md_cell(v) for v in (it.task, it.owner, it.due_date, it.priority)) + " |"
+            for it in summary.action_items
+        ]
+        yield _lines("## Action Items", "", "| Task | Owner | Due date | Priority |", "| --- | --- | --- | --- |", *rows, "")
+    yield _lines(f"> {AI_NOTE}")
+
+
+def render_html(summary: MeetingSummary, meta: WordExportMetadata) -> Iterator[bytes]:
+    e = html.escape
+    yield _lines(
+        "<!DOCTYPE html>",
+        '<html><head><meta charset="utf-8"><title>Meeting Notes</title></head><body>',
+        "<h1>Meeting Notes</h1>",
+        f"<p><small>{e(_subtitle(meta))}</small></p>",
+        "<h2>Executive Summary</h2>",
+        f"<p>{_html_text((summary.meeting_summary or '').strip() or 'No summary available.')}</p>",
+    )
+    yield _lines("<h2>Participants</h2>", _html_list(summary.participants, "ul", "Not identified."))
+    yield _lines("<h2>Decisions</h2>", _html_list(summary.decisions, "ol", "No explicit decisions found."))
+
+    if not summary.action_items:
+        yield _lines("<h2>Action Items</h2>", "<p>No action items found.</p>")
+    else:
+        rows = [
+            "<tr>" + "".join(f"<td>{_html_text(_cell(v))}</td>" for v in (it.task, it.owner, it.due_date, it.priority)) + "</tr>"
+            for it in summary.action_items
+        ]
+        yield _lines(
+            "<h2>Action Items</h2>",
+            "<table><thead><tr><th>Task</th><th>Owner</th><th>Due date</th><th>Priority</th></tr></thead><tbody>",
+            *rows,
+            "</tbody></table>",
+        )
+    yield _lines(f"<p><small>{e(AI_NOTE)}</small></p>", "</body></html>")
+
+
+def render_jsonl(summary: MeetingSummary, meta: WordExportMetadata) -> Iterator[bytes]:
+    """One meeting record, then one record per action item (for loading into other tools)."""
+    generated_at = meta.generated_at or datetime.now(timezone.utc)
+    yield _json_line({
+        "type": "meeting",
+        "original_filename": meta.original_filename,
+        "llm_provider": meta.llm_provider,
+        "generated_at": generated_at.isoformat(),
+        "meeting_summary": summary.meeting_summary,
+        "participants": summary.participants,
+        "decisions": summary.decisions,
+    })
+    for it in summary.action_items:
+        yield _json_line({"type": "action_item", "original_filename": meta.original_filename, **it.model_dump()})
+
+
+def _subtitle(meta: WordExportMetadata) -> str:
+    return subtitle_text(meta.original_filename, meta.llm_provider, meta.generated_at or datetime.now(timezone.utc))
+
+
+def _lines(*lines: str) -> bytes:
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _json_line(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _cell(value: Optional[str]) -> str:
+    return (value or "").strip() or "-"
+
+
+def _md_text(text: str) -> str:
+    # Keep line breaks inside the paragraph (a blank line would start a new block)
+    return "  \n".join(line for line in text.splitlines() if line.strip())
+
+
+def _md_cell(value: Optional[str]) -> str:
+    return _cell(value).replace("|", "\\|").replace("\r", "").replace("\n", "<br>")
+
+
+def _md_list(items: List[str], marker: str, fallback: str) -> List[str]:
+    values = [(x or "").strip() for x in items]
+    lines = [f"{marker}{_md_text(v)}" for v in values if v]
+    return lines or [fallback]
+
+
+def _html_text(text: str) -> str:
+    return html.escape(text).replace("\n", "<br>")
+
+
+def _html_list(items: List[str], tag: str, fallback: str) -> str:
+    values = [(x or "").strip() for x in items]
+    entries = "".join(f"<li>{_html_text(v)}</li>" for v in values if v)
+    if not entries:
+        return f"<p>{html.escape(fallback)}</p>"
+    return f"<{tag}>{entries}</{tag}>"
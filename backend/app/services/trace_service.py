@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import logging
+import re
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+"""
+This file keeps the trace id of the request (or background job) being worked on,
+so every log line written for it can be correlated.
+- The id lives in a context variable: it follows the request into awaited code
+  and into run_in_threadpool / anyio worker threads.
+- TraceIdFilter adds it to log records as %(trace_id)s ("-" outside a request).
+"""
+
+TRACE_HEADER = "X-Trace-Id"
+
+# Ids accepted from a caller's X-Trace-Id header; anything else gets a fresh id
+_VALID_TRACE_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def accept_trace_id(value: Optional[str]) -> str:
+    """The caller's trace id if it is safe to log and echo back, otherwise a new one."""
+    if value and _VALID_TRACE_ID.fullmatch(value):
+        return value
+    return new_trace_id()
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+@contextmanager
+def trace_context(trace_id: str) -> Iterator[None]:
+    token = _trace_id.set(trace_id)
+    try:
+        yield
+    finally:
+        _trace_id.reset(token)
+
+
+class TraceIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = _trace_id.get() or "-"
+        return True
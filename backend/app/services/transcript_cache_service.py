@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from time import time
+from typing import Callable, Dict, Optional
+
+import anyio
+
+from app.config import (
+    TRANSCRIPT_CACHE_DIR,
+    TRANSCRIPT_CACHE_MAX_BYTES,
+    TRANSCRIPT_CACHE_MAX_AGE_SECONDS,
+)
+from app.services.audio_chunking_service import audio_duration_seconds
+from app.services.audio_preprocessing_service import PREPROCESS_FINGERPRINT
+from app.services.client_registry import ClientRegistry, get_client_registry
+from app.services.metrics_service import AUDIO_BYTES, AUDIO_SECONDS, STAGE_SECONDS
+from app.services.single_flight_service import transcription_flights
+from app.services.upload_service import hash_file
+from app.services.whisper_service import (
+    WHISPER_MODEL,
+    transcribe_with_whisper,
+    transcribe_with_whisper_async,
+)
+
+"""
+This file implements a content-addressed, disk-backed cache of Whisper transcripts.
+Entries are keyed by the SHA-256 of the audio bytes, so the same recording sent to
+/transcribe, /process or a job is only transcribed once. The Whisper model and the
+audio pre-processing settings are part of the key, so changing either does not
+serve transcripts of differently prepared audio.
+- Entries older than the configured max age are dropped on read and on eviction.
+- When the cache grows past its size budget, least recently used entries are removed.
+- Identical transcriptions that are already in flight are shared, not repeated.
+"""
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = 3600
+
+
+class TranscriptCache:
+    def __init__(self, cache_dir: Path, max_bytes: int, max_age_seconds: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size_bytes: Optional[int] = None  # computed lazily from disk
+        self._last_sweep = 0.0
+
+    def get(self, content_hash: str) -> Optional[str]:
+        path = self._path(content_hash)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+
+        if time() - st.st_mtime > self.max_age_seconds:
+            self._remove(path, st.st_size)
+            self._count(hit=False)
+            return None
+
+        try:
+            text = path.read_text(encoding="utf-8")
+            # mtime keeps the write time (for age), atime tracks the last read (for LRU)
+            os.utime(path, (time(), st.st_mtime))
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return text
+
+    def put(self, content_hash: str, transcript: str) -> None:
+        path = self._path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = transcript.encode("utf-8")
+
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        old_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size_bytes is not None:
+                self._size_bytes += len(data) - old_size
+            # A full directory sweep is only needed when over budget or periodically for expiry
+            needs_sweep = (
+                self._size_bytes is None
+                or self._size_bytes > self.max_bytes
+                or time() - self._last_sweep > SWEEP_INTERVAL_SECONDS
+            )
+        if needs_sweep:
+            self.evict()
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            now = time()
+            for path in self.cache_dir.glob("*/*/*.txt"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                if now - st.st_mtime > self.max_age_seconds:
+                    path.unlink(missing_ok=True)
+                    self.evictions += 1
+                    continue
+                entries.append((st.st_atime, st.st_size, path))
+                total += st.st_size
+
+            if total > self.max_bytes:
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= self.max_bytes:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+                    self.evictions += 1
+            self._size_bytes = total
+            self._last_sweep = now
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size_bytes": self._size_bytes or 0,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _path(self, content_hash: str) -> Path:
+        return self.cache_dir / WHISPER_MODEL / content_hash[:2] / f"{content_hash}.{PREPROCESS_FINGERPRINT}.txt"
+
+    def _remove(self, path: Path, size: int) -> None:
+        path.unlink(missing_ok=True)
+        with self._lock:
+            self.evictions += 1
+            if self._size_bytes is not None:
+                self._size_bytes = max(0, self._size_bytes - size)
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+transcript_cache = TranscriptCache(
+    cache_dir=TRANSCRIPT_CACHE_DIR,
+    max_bytes=TRANSCRIPT_CACHE_MAX_BYTES,
+    max_age_seconds=TRANSCRIPT_CACHE_MAX_AGE_SECONDS,
+)
+
+
+def transcribe_with_cache(
+    file_path: str,
+    content_hash: Optional[str] = None,
+    clients: Optional[ClientRegistry] = None,
+    on_chunk_done: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    if content_hash is None:
+        content_hash = hash_file(Path(file_path))
+
+    cached = transcript_cache.get(content_hash)
+    if cached is not None:
+        logger.info("Transcript cache hit (%s)", content_hash[:12])
+        return cached
+
+    def transcribe() -> str:
+        # Re-check: an identical call may have finished since the lookup above
+        cached = transcript_cache.get(content_hash)
+        if cached is not None:
+            return cached
+        registry = clients or get_client_registry()
+        _count_audio(file_path)
+        with STAGE_SECONDS.time(stage="transcription", detail=WHISPER_MODEL):
+            transcript = transcribe_with_whisper(file_path, client=registry.openai, on_chunk_done=on_chunk_done)
+        transcript_cache.put(content_hash, transcript)
+        return transcript
+
+    return transcription_flights.run(content_hash, transcribe)
+
+
+async def transcribe_with_cache_async(
+    file_path: str,
+    content_hash: Optional[str] = None,
+    clients: Optional[ClientRegistry] = None,
+    on_chunk_done: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    # Cache reads/writes are small disk operations, run them on a worker thread
+    if content_hash is None:
+        content_hash = await anyio.to_thread.run_sync(hash_file, Path(file_path))
+
+    cached = await anyio.to_thread.run_sync(transcript_cache.get, content_hash)
+    if cached is not None:
+        logger.info("Transcript cache hit (%s)", content_hash[:12])
+        return cached
+
+    async def transcribe() -> str:
+        cached = await anyio.to_thread.run_sync(transcript_cache.get, content_hash)
+        if cached is not None:
+            return cached
+        registry = clients or get_client_registry()
+        await anyio.to_thread.run_sync(_count_audio, file_path)
+        with STAGE_SECONDS.time(stage="transcription", detail=WHISPER_MODEL):
+            transcript = await transcribe_with_whisper_async(
+                file_path, client=registry.async_openai, on_chunk_done=on_chunk_done
+            )
+        await anyio.to_thread.run_sync(transcript_cache.put, content_hash, transcript)
+        return transcript
+
+    return await transcription_flights.run_async(content_hash, transcribe)
+
+
+def _count_audio(file_path: str) -> None:
+    try:
+        AUDIO_BYTES.inc(os.path.getsize(file_path))
+    except OSError:
+        return
+    seconds = audio_duration_seconds(file_path)
+    if seconds is not None:
+        AUDIO_SECONDS.inc(seconds)
@@ -0,0 +1,388 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from time import time
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+import anyio
+from fastapi import UploadFile
+
+from app.config import (
+    ALLOWED_EXTENSIONS,
+    MAX_AUDIO_SIZE_BYTES,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_DELETE_AFTER_TRANSCRIPTION,
+    UPLOAD_DIR,
+    UPLOAD_MAX_BYTES,
+    UPLOAD_TTL_SECONDS,
+)
+from app.services.metrics_service import STAGE_SECONDS
+
+"""
+This file handles validation and persistence of uploaded audio files.
+Uploads are content-addressed: a file is stored as <sha256><ext>, so the same
+recording uploaded many times is kept once, and user-provided file names are
+never used on disk.
+The upload is streamed to a temporary file in fixed-size chunks while its SHA-256
+and size are computed, so memory use is bounded by the chunk size, the hash can be
+used as a cache key without a second read, and an oversized upload is aborted as
+soon as it crosses the limit. The temporary file is then renamed to its hash (or
+dropped if that content is already stored).
+UploadStorage manages the lifetime of the stored files: a background janitor
+removes them after UPLOAD_TTL_SECONDS and, oldest first, when the directory grows
+past UPLOAD_MAX_BYTES; with UPLOAD_DELETE_AFTER_TRANSCRIPTION a file is removed as
+soon as it has been transcribed (the transcript cache keeps the text). Files that
+a request is still working on are held and never removed; queued jobs and batches
+take a lease on their uploads when they are submitted and release it once the
+audio has been transcribed.
+"""
+
+logger = logging.getLogger(__name__)
+
+_PARTIAL_SUFFIX = ".part"
+
+
+class InvalidUploadError(ValueError):
+    pass
+
+
+class UploadTooLargeError(InvalidUploadError):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(too_large_message(max_bytes))
+
+
+def too_large_message(max_bytes: int) -> str:
+    return (
+        f"Audio file is too large. Maximum supported size is {max_bytes // (1024 * 1024)} MB. "
+        "Please upload a shorter file or convert it to MP3/WAV."
+    )
+
+
+@dataclass(frozen=True)
+class SavedUpload:
+    original_filename: str
+    saved_name: str
+    path: Path
+    sha256: str
+    size_bytes: int
+    deduplicated: bool = False  # the same content was already stored
+
+
+def validate_audio_filename(filename: Optional[str]) -> str:
+    if not filename:
+        raise InvalidUploadError("Missing filename")
+    ext = Path(filename).suffix.lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise InvalidUploadError(
+            f"Unsupported file type: {ext}. Allowed: {sorted(ALLOWED_EXTENSIONS)}"
+        )
+    return ext
+
+
+def save_upload(
+    src: BinaryIO,
+    filename: Optional[str],
+    dest_dir: Path,
+    max_bytes: int = MAX_AUDIO_SIZE_BYTES,
+) -> SavedUpload:
+    ext = validate_audio_filename(filename)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = _partial_path(dest_dir)
+    progress = _UploadProgress(max_bytes)
+    with STAGE_SECONDS.time(stage="upload_write", detail=""):
+        try:
+            with tmp_path.open("wb") as f:
+                while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                    progress.add(chunk)
+                    f.write(chunk)
+            progress.check_not_empty()
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return _store(progress, filename, ext, tmp_path)
+
+
+async def save_upload_async(
+    file: UploadFile,
+    dest_dir: Path,
+    max_bytes: int = MAX_AUDIO_SIZE_BYTES,
+) -> SavedUpload:
+    ext = validate_audio_filename(file.filename)
+    await anyio.Path(dest_dir).mkdir(parents=True, exist_ok=True)
+
+    tmp_path = _partial_path(dest_dir)
+    progress = _UploadProgress(max_bytes)
+    with STAGE_SECONDS.time(stage="upload_write", detail=""):
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    progress.add(chunk)
+                    await f.write(chunk)
+            progress.check_not_empty()
+        except BaseException:
+            await anyio.Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        return await anyio.to_thread.run_sync(_store, progress, file.filename, ext, tmp_path)
+
+
+def _partial_path(dest_dir: Path) -> Path:
+    return dest_dir / f".{uuid.uuid4().hex}{_PARTIAL_SUFFIX}"
+
+
+def _store(progress: "_UploadProgress", filename: str, ext: str, tmp_path: Path) -> SavedUpload:
+    """Move a fully written upload to its content address."""
+    sha256 = progress.digest.hexdigest()
+    saved_name = f"{sha256}{ext}"
+    saved_path = tmp_path.parent / saved_name
+    deduplicated = saved_path.exists()
+    if deduplicated:
+        tmp_path.unlink(missing_ok=True)
+        try:
+            # Fresh again as far as the janitor's TTL is concerned
+            os.utime(saved_path)
+        except FileNotFoundError:
+            # Removed by the janitor in the meantime; this upload is gone too, so ask for it again
+            raise InvalidUploadError("The upload could not be stored, please try again")
+    else:
+        # Atomic: a concurrent identical upload ends up with the same complete file
+        os.replace(tmp_path, saved_path)
+    upload_storage.record_saved(progress.size, deduplicated)
+    return SavedUpload(
+        original_filename=filename,
+        saved_name=saved_name,
+        path=saved_path,
+        sha256=sha256,
+        size_bytes=progress.size,
+        deduplicated=deduplicated,
+    )
+
+
+class _UploadProgress:
+    """Tracks the hash and byte count of an upload as chunks are written."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def add(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeError(self.max_bytes)
+        self.digest.update(chunk)
+
+    def check_not_empty(self) -> None:
+        if self.size == 0:
+            raise InvalidUploadError("Empty file")
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadLease:
+    """A hold on a stored upload that outlives a single call; releasing it more than once is harmless."""
+
+    def __init__(self, storage: "UploadStorage", path: Path) -> None:
+        self.path = path
+        self._storage = storage
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._storage._release(self.path)
+
+    def __enter__(self) -> "UploadLease":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class UploadStorage:
+    def __init__(
+        self,
+        root: Path,
+        ttl_seconds: float,
+        max_bytes: int,
+        delete_after_transcription: bool,
+    ) -> None:
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.delete_after_transcription = delete_after_transcription
+        self.counters: Counter = Counter()
+        self._held: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._disk: Dict[str, Any] = {"files": 0, "size_bytes": 0, "last_sweep_at": None}
+
+    # Janitor
+
+    def start(self, interval_seconds: float) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval_seconds,), name="upload-janitor", daemon=True,
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, interval_seconds: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except OSError:
+                logger.exception("Upload janitor sweep failed")
+            self._stop.wait(interval_seconds)
+
+    def sweep(self) -> None:
+        """Remove expired uploads, then the oldest ones until the directory fits its quota."""
+        now = time()
+        try:
+            paths = [p for p in self.root.iterdir() if p.is_file()]
+        except FileNotFoundError:
+            paths = []
+
+        evictable = []
+        files, total = 0, 0
+        for path in paths:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            held = self._is_held(path)
+            expired = now - st.st_mtime > self.ttl_seconds
+            if path.name.endswith(_PARTIAL_SUFFIX):
+                # An upload still being written, or one left behind by a crash
+                if expired and not held:
+                    self._remove(path, "abandoned")
+                continue
+            if expired and not held:
+                self._remove(path, "expired")
+                continue
+            files += 1
+            total += st.st_size
+            if not held:
+                evictable.append((st.st_mtime, st.st_size, path))
+
+        if total > self.max_bytes:
+            evictable.sort()
+            for _, size, path in evictable:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path, "evicted_quota")
+                files -= 1
+                total -= size
+        with self._lock:
+            self._disk = {"files": files, "size_bytes": total, "last_sweep_at": now}
+
+    # Files in use
+
+    @contextmanager
+    def hold(self, path: Path) -> Iterator[None]:
+        """Keep `path` from being removed while a request works on it."""
+        with self.lease(path):
+            yield
+
+    def lease(self, path: Path) -> UploadLease:
+        """Keep `path` from being removed until the returned lease is released (e.g. by a queued job)."""
+        with self._lock:
+            self._held[str(path)] += 1
+        return UploadLease(self, path)
+
+    def _release(self, path: Path) -> None:
+        key = str(path)
+        with self._lock:
+            self._held[key] -= 1
+            if self._held[key] <= 0:
+                del self._held[key]
+
+    def transcribed(self, path: Path) -> None:
+        """
+        Called once `path` has been transcribed: with UPLOAD_DELETE_AFTER_TRANSCRIPTION
+        the file is removed, unless another request holds it too (the caller's own hold
+        does not count).
+        """
+        if not self.delete_after_transcription or not self._is_upload(path):
+            return
+        with self._lock:
+            if self._held.get(str(path), 0) > 1:
+                return
+        self._remove(path, "deleted_after_transcription")
+
+    # Metrics
+
+    def record_saved(self, size_bytes: int, deduplicated: bool) -> None:
+        with self._lock:
+            self.counters["saved"] += 1
+            if deduplicated:
+                self.counters["deduplicated"] += 1
+                self.counters["deduplicated_bytes"] += size_bytes
+            else:
+                self._disk["files"] += 1
+                self._disk["size_bytes"] += size_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._disk,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "held": len(self._held),
+                "saved": self.counters["saved"],
+                "deduplicated": self.counters["deduplicated"],
+                "deduplicated_bytes": self.counters["deduplicated_bytes"],
+                "removed": {
+                    k: self.counters[k]
+                    for k in ("expired", "evicted_quota", "deleted_after_transcription", "abandoned")
+                },
+            }
+
+    def _is_held(self, path: Path) -> bool:
+        with self._lock:
+            return str(path) in self._held
+
+    def _is_upload(self, path: Path) -> bool:
+        # Never touch files outside the upload directory (e.g. server-side batch inputs)
+        return Path(path).resolve().parent == self.root.resolve()
+
+    def _remove(self, path: Path, reason: str) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.counters[reason] += 1
+            if reason != "abandoned":
+                self._disk["files"] = max(0, self._disk["files"] - 1)
+                self._disk["size_bytes"] = max(0, self._disk["size_bytes"] - size)
+        logger.info("Removed upload %s (%s)", path.name, reason)
+
+
+upload_storage = UploadStorage(
+    UPLOAD_DIR,
+    ttl_seconds=UPLOAD_TTL_SECONDS,
+    max_bytes=UPLOAD_MAX_BYTES,
+    delete_after_transcription=UPLOAD_DELETE_AFTER_TRANSCRIPTION,
+)
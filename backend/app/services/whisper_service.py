@@ -1,22 +1,150 @@
+from __future__ import annotations
+
+import asyncio
 import os
-from openai import OpenAI, RateLimitError
+import tempfile
+import wave
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+import anyio
+
+from app.config import (
+    AUDIO_PREPROCESS_ENABLED,
+    WHISPER_MAX_REQUEST_BYTES,
+    WHISPER_CHUNK_OVERLAP_SECONDS,
+    WHISPER_MAX_WORKERS,
+)
+from app.services.client_registry import get_client_registry
+from app.services.metrics_service import STAGE_SECONDS
+from app.services.rate_limit_service import (
+    ProviderUnavailableError,
+    call_with_retries,
+    call_with_retries_async,
+    rate_limiters,
+)
+from app.services.audio_chunking_service import (
+    split_audio,
+    stitch_transcripts,
+    transcribe_chunks,
+)
+from app.services.audio_preprocessing_service import preprocess_audio
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+WHISPER_MODEL = "whisper-1"
 
-def transcribe_with_whisper(file_path: str) -> str:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is missing. Set it in backend/.env")
 
-    client = OpenAI(api_key=api_key)
+def transcribe_with_whisper(
+    file_path: str,
+    client: Optional[OpenAI] = None,
+    on_chunk_done: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    from openai import RateLimitError  # the SDK is loaded on first use (see client_registry)
+
+    if client is None:
+        client = get_client_registry().openai
 
     try:
-        with open(file_path, "rb") as f:
-            result = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
+        with tempfile.TemporaryDirectory(prefix="whisper-") as tmp_dir:
+            if AUDIO_PREPROCESS_ENABLED:
+                file_path = str(preprocess_audio(file_path, tmp_dir).path)
+            if os.path.getsize(file_path) <= WHISPER_MAX_REQUEST_BYTES:
+                return _transcribe_file(client, file_path)
+
+            # Too large for a single Whisper request - split into overlapping chunks,
+            # transcribe them concurrently and stitch the text back together.
+            chunks = _split(file_path, tmp_dir)
+            texts = transcribe_chunks(
+                chunks,
+                lambda chunk: _transcribe_file(client, str(chunk.path)),
+                max_workers=WHISPER_MAX_WORKERS,
+                on_chunk_done=on_chunk_done,
             )
-        return result.text
-    
+        return stitch_transcripts(texts)
+
     except RateLimitError as e:
-        raise RuntimeError(
+        raise ProviderUnavailableError(
             "OpenAI API quota exceeded. Please check billing configuration."
         ) from e
+
+
+async def transcribe_with_whisper_async(
+    file_path: str,
+    client: Optional[AsyncOpenAI] = None,
+    on_chunk_done: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    from openai import RateLimitError
+
+    if client is None:
+        client = get_client_registry().async_openai
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="whisper-") as tmp_dir:
+            if AUDIO_PREPROCESS_ENABLED:
+                # Decoding and re-encoding is CPU and disk work, keep it off the event loop
+                file_path = str((await anyio.to_thread.run_sync(preprocess_audio, file_path, tmp_dir)).path)
+            size = (await anyio.Path(file_path).stat()).st_size
+            if size <= WHISPER_MAX_REQUEST_BYTES:
+                return await _transcribe_file_async(client, file_path)
+
+            # Splitting reads and writes the whole file, keep it off the event loop
+            chunks = await anyio.to_thread.run_sync(_split, file_path, tmp_dir)
+            limiter = asyncio.Semaphore(WHISPER_MAX_WORKERS)
+            done = 0
+
+            async def transcribe_one(chunk) -> str:
+                nonlocal done
+                async with limiter:
+                    text = await _transcribe_file_async(client, str(chunk.path))
+                done += 1
+                if on_chunk_done:
+                    on_chunk_done(done, len(chunks))
+                return text
+
+            texts = await asyncio.gather(*(transcribe_one(c) for c in chunks))
+        return stitch_transcripts(texts)
+
+    except RateLimitError as e:
+        raise ProviderUnavailableError(
+            "OpenAI API quota exceeded. Please check billing configuration."
+        ) from e
+
+
+def _split(file_path: str, out_dir: str):
+    try:
+        return split_audio(
+            file_path,
+            out_dir,
+            max_chunk_bytes=WHISPER_MAX_REQUEST_BYTES,
+            overlap_seconds=WHISPER_CHUNK_OVERLAP_SECONDS,
+        )
+    except (ValueError, EOFError, wave.Error) as e:
+        raise RuntimeError(f"Could not split the audio file for transcription: {e}") from e
+
+
+def _transcribe_file(client: OpenAI, file_path: str) -> str:
+    def create():
+        # Reopened on every attempt so a retry uploads the file from the start
+        with open(file_path, "rb") as f, STAGE_SECONDS.time(stage="whisper_request", detail=WHISPER_MODEL):
+            return client.audio.transcriptions.create(
+                model=WHISPER_MODEL,
+                file=f,
+            )
+
+    result = call_with_retries(create, rate_limiters.get("openai", WHISPER_MODEL))
+    return result.text
+
+
+async def _transcribe_file_async(client: AsyncOpenAI, file_path: str) -> str:
+    async def create():
+        # The SDK reads path-like files asynchronously
+        with STAGE_SECONDS.time(stage="whisper_request", detail=WHISPER_MODEL):
+            return await client.audio.transcriptions.create(
+                model=WHISPER_MODEL,
+                file=Path(file_path),
+            )
+
+    result = await call_with_retries_async(create, rate_limiters.get("openai", WHISPER_MODEL))
+    return result.text
@@ -1,22 +1,51 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import re
+import threading
+from copy import deepcopy
 from datetime import datetime, timezone
-from io import BytesIO
-from typing import Optional
+from pathlib import Path
+from typing import Callable, List, Optional
 
 from docx import Document
+from docx.opc.oxml import parse_xml, serialize_part_xml
+from docx.oxml.ns import qn
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from lxml import etree
 
-from app.schemas.meeting_summary import MeetingSummary
+from app.config import DOCX_TEMPLATE_PATH
+from app.schemas.meeting_summary import ActionItem, MeetingSummary
+from app.services.docx_package_service import DocxPackage, RenderedDocx
+from app.services.export_metadata import WordExportMetadata, subtitle_text
 
+"""
+This file renders meeting summaries into Word documents.
+The layout is defined by the _add_* helpers below. They are run once against the
+template (python-docx's default, or DOCX_TEMPLATE_PATH) to produce styled XML
+prototypes for every kind of block; rendering a summary then clones those
+prototypes, fills in the text and builds the action-item table in one go,
+instead of building and styling a new Document() per request.
+Rendered documents are streamed (or written to files) chunk by chunk; the
+package is never copied into a single bytes object on the way out.
+A combined document for many meetings is assembled from per-meeting XML
+fragments, so the meetings can be rendered independently (and in parallel).
+"""
 
-@dataclass(frozen=True)
-class WordExportMetadata:
-    original_filename: Optional[str] = None
-    llm_provider: Optional[str] = None
-    generated_at: Optional[datetime] = None
+# Characters that are not allowed in XML 1.0 (python-docx would fail on them)
+_XML_INVALID_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_SPECIAL_CHARS = re.compile(r"[\x00-\x1f]")
+
+_W_P, _W_R, _W_T, _W_TC, _W_TR = qn("w:p"), qn("w:r"), qn("w:t"), qn("w:tc"), qn("w:tr")
+_W_BR, _W_TAB, _W_RPR = qn("w:br"), qn("w:tab"), qn("w:rPr")
+_W_BOOKMARK_START, _W_BOOKMARK_END, _W_ID, _W_NAME = (
+    qn("w:bookmarkStart"), qn("w:bookmarkEnd"), qn("w:id"), qn("w:name"),
+)
+_XML_SPACE = qn("xml:space")
+_ROW_SLOT = "@@slot{}@@"
+_MEETINGS_SLOT = "meetings"
+# Hyperlinked entries for level 1 headings, without page numbers (unknown until Word lays out the pages)
+_TOC_FIELD = ' TOC \\o "1-1" \\h \\z \\n '
 
 
 def build_docx_from_summary(
@@ -24,35 +53,296 @@ def build_docx_from_summary(
     transcript: str | None,
     meta: WordExportMetadata,
 ) -> bytes:
-    doc = Document()
-
-    _add_title(doc, "Meeting Notes")
-    _add_subtitle(
-        doc,
-        original_filename=meta.original_filename,
-        llm_provider=meta.llm_provider,
-        generated_at=meta.generated_at or datetime.now(timezone.utc),
+    return render_docx_from_summary(summary, meta).getvalue()
+
+
+def render_docx_from_summary(summary: MeetingSummary, meta: WordExportMetadata) -> RenderedDocx:
+    """Render without joining the package into one buffer; stream it or write it to a file."""
+    return _notes_template().render(summary, meta)
+
+
+def render_meeting_fragment(summary: MeetingSummary, meta: WordExportMetadata, title: str, index: int) -> bytes:
+    """One meeting's section of a combined document, as XML to be passed to render_combined_docx."""
+    return _notes_template().render_meeting(summary, meta, title, index)
+
+
+def render_combined_docx(
+    title: str,
+    meeting_titles: List[str],
+    fragments: List[bytes],
+    generated_at: Optional[datetime] = None,
+) -> RenderedDocx:
+    """Put the meeting fragments (in order) into one document after a table of contents."""
+    return _notes_template().render_combined(
+        title, meeting_titles, fragments, generated_at or datetime.now(timezone.utc),
     )
 
-    _add_section_heading(doc, "Executive Summary")
-    _add_paragraph_or_fallback(doc, summary.meeting_summary, "No summary available.")
 
-    _add_section_heading(doc, "Participants")
-    _add_bullets_or_fallback(doc, summary.participants, "Not identified.")
+def warm_up() -> None:
+    """Build the notes template now rather than on the first render."""
+    _notes_template()
 
-    _add_section_heading(doc, "Decisions")
-    _add_numbered_or_fallback(doc, summary.decisions, "No explicit decisions found.")
 
-    _add_section_heading(doc, "Action Items")
-    _add_action_items_table(doc, summary)
+class _NotesTemplate:
+    """The meeting-notes layout, built once from the _add_* helpers and kept as XML prototypes."""
+
+    def __init__(self, template_path: Optional[Path]) -> None:
+        doc = Document(str(template_path)) if template_path else Document()
+        body = doc.element.body
+        # Start from the template's styles and page setup only, not its sample content
+        for el in list(body):
+            if el.tag != qn("w:sectPr"):
+                body.remove(el)
+
+        self.title = _capture(doc, lambda: _add_title(doc, "Meeting Notes"))
+        self.subtitle = _capture(doc, lambda: _add_subtitle(doc, "-", None, datetime.now(timezone.utc)))
+        self.heading = _capture(doc, lambda: _add_section_heading(doc, "-"))
+        self.paragraph = _capture(doc, lambda: _add_paragraph_or_fallback(doc, "-", "-"))
+        self.bullet = _capture(doc, lambda: _add_bullets_or_fallback(doc, ["-"], "-"))
+        self.number = _capture(doc, lambda: _add_numbered_or_fallback(doc, ["-"], "-"))
+        self.note = _capture(doc, lambda: _add_note(doc))
+        self.meeting_heading = _capture(doc, lambda: _add_meeting_heading(doc, "-"))
+        self.page_break = _capture(doc, lambda: doc.add_page_break())
+        (self.table,) = _capture(
+            doc,
+            lambda: _add_action_items_table(
+                doc,
+                MeetingSummary(meeting_summary="-", participants=[], decisions=[], action_items=[ActionItem(task="-")]),
+            ),
+        )
+        # The data row is kept as XML text with a slot per cell, so all rows of a table
+        # can be produced as one string and parsed in a single pass
+        row = self.table.findall(_W_TR)[1]
+        for i, t in enumerate(row.iter(_W_T)):
+            t.text = _ROW_SLOT.format(i)
+        table_xml = etree.tostring(self.table, encoding="unicode")
+        # Cut the row out of the serialized table (on its own it would carry namespace declarations)
+        start = table_xml.index(_ROW_SLOT.format(0))
+        start = table_xml.rindex("<w:tr", 0, start)
+        end = table_xml.index("</w:tr>", start) + len("</w:tr>")
+        self.table_head, self.table_tail = table_xml[:start], table_xml[end:]
+        self.row_parts = re.split(r"@@slot\d@@", table_xml[start:end])
+
+        self.package = DocxPackage.from_document(doc)
+        self.nsmap = self.package.new_document().nsmap
+
+    def render(self, summary: MeetingSummary, meta: WordExportMetadata) -> RenderedDocx:
+        elements = []
+        elements += _clone(self.title)
+        elements += self._subtitle(meta)
+        self._summary_sections(elements, summary)
+        elements += _clone(self.note)
+        return self.package.render(self._document(elements))
+
+    def render_meeting(self, summary: MeetingSummary, meta: WordExportMetadata, title: str, index: int) -> bytes:
+        elements = _clone(self.page_break)
+        heading = _clone(self.meeting_heading, title)
+        _bookmark(heading[-1], index)
+        elements += heading
+        elements += self._subtitle(meta)
+        self._summary_sections(elements, summary)
+
+        # Serialize inside a body carrying the document's namespaces, so the fragment can be
+        # pasted into the document as-is, without namespace declarations of its own
+        body = etree.Element(qn("w:body"), nsmap=self.nsmap)
+        body.extend(elements)
+        etree.cleanup_namespaces(body)
+        xml = etree.tostring(body, encoding="utf-8")
+        return xml[xml.index(b">") + 1:xml.rindex(b"<")]
+
+    def render_combined(
+        self,
+        title: str,
+        meeting_titles: List[str],
+        fragments: List[bytes],
+        generated_at: datetime,
+    ) -> RenderedDocx:
+        elements = _clone(self.title, title)
+        elements += _clone(self.subtitle, " | ".join((
+            f"Meetings: {len(fragments)}",
+            f"Generated: {generated_at.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}",
+        )))
+        self._section(elements, "Contents")
+        elements += self._table_of_contents(meeting_titles)
+        elements.append(etree.Comment(_MEETINGS_SLOT))
+        elements += _clone(self.note)
+
+        head, tail = serialize_part_xml(self._document(elements)).split(f"<!--{_MEETINGS_SLOT}-->".encode())
+        return self.package.render_xml(b"".join((head, *fragments, tail)))
+
+    def _document(self, elements: list):
+        document = self.package.new_document()
+        body = document.find(qn("w:body"))
+        sect_pr = body.find(qn("w:sectPr"))
+        if sect_pr is not None:
+            for el in elements:
+                sect_pr.addprevious(el)
+        else:
+            body.extend(elements)
+        return document
+
+    def _subtitle(self, meta: WordExportMetadata) -> list:
+        return _clone(self.subtitle, subtitle_text(
+            meta.original_filename,
+            meta.llm_provider,
+            meta.generated_at or datetime.now(timezone.utc),
+        ))
+
+    def _summary_sections(self, elements: list, summary: MeetingSummary) -> None:
+        self._section(elements, "Executive Summary")
+        content = (summary.meeting_summary or "").strip()
+        elements += _clone(self.paragraph, content if content else "No summary available.")
+
+        self._section(elements, "Participants")
+        self._list(elements, self.bullet, summary.participants, "Not identified.")
+
+        self._section(elements, "Decisions")
+        self._list(elements, self.number, summary.decisions, "No explicit decisions found.")
+
+        self._section(elements, "Action Items")
+        if summary.action_items:
+            elements.append(self._action_items_table(summary.action_items))
+        else:
+            elements += _clone(self.paragraph, "No action items found.")
+
+    def _section(self, elements: list, title: str) -> None:
+        spacer, heading = _clone(self.heading)
+        _fill(heading, title)
+        elements += [spacer, heading]
+
+    def _list(self, elements: list, prototype: list, items: list[str], fallback: str) -> None:
+        if not items:
+            elements += _clone(self.paragraph, fallback)
+            return
+        for x in items:
+            v = (x or "").strip()
+            if v:
+                elements += _clone(prototype, v)
+
+    def _table_of_contents(self, titles: List[str]) -> list:
+        """
+        A TOC field whose current result already lists every meeting, linked to its heading,
+        so the contents are usable without updating fields; Word can refresh it to add page numbers.
+        """
+        ns = f'xmlns:w="{self.nsmap["w"]}"'
+        begin = (
+            '<w:r><w:fldChar w:fldCharType="begin"/></w:r>'
+            f'<w:r><w:instrText xml:space="preserve">{_TOC_FIELD}</w:instrText></w:r>'
+            '<w:r><w:fldChar w:fldCharType="separate"/></w:r>'
+        )
+        end = '<w:r><w:fldChar w:fldCharType="end"/></w:r>'
+        paragraphs = []
+        for i, title in enumerate(titles):
+            paragraphs.append(parse_xml((
+                f"<w:p {ns}>{begin if i == 0 else ''}"
+                f'<w:hyperlink w:anchor="{_bookmark_name(i)}" w:history="1">'
+                f'<w:r><w:t xml:space="preserve">{i + 1}. {_xml_text(title)}</w:t></w:r></w:hyperlink>'
+                f"{end if i == len(titles) - 1 else ''}</w:p>"
+            ).encode("utf-8")))
+        return paragraphs
+
+    def _action_items_table(self, items: list[ActionItem]):
+        parts = [self.table_head]
+        row_start, after_task, after_owner, after_due, row_end = self.row_parts
+        for it in items:
+            parts += (
+                row_start, _xml_text(it.task),
+                after_task, _xml_text(it.owner),
+                after_owner, _xml_text(it.due_date),
+                after_due, _xml_text(it.priority),
+                row_end,
+            )
+        parts.append(self.table_tail)
+        # One parse for the whole table instead of one add_row() per item
+        return parse_xml("".join(parts).encode("utf-8"))
 
-    doc.add_paragraph()
-    note = doc.add_paragraph("Note: This document was generated by AI and may contain inaccuracies.")
-    note.runs[0].font.size = Pt(9)
 
-    buf = BytesIO()
-    doc.save(buf)
-    return buf.getvalue()
+_template: Optional[_NotesTemplate] = None
+_template_lock = threading.Lock()
+
+
+def _notes_template() -> _NotesTemplate:
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = _NotesTemplate(DOCX_TEMPLATE_PATH)
+    return _template
+
+
+def _capture(doc: Document, add: Callable[[], None]) -> list:
+    """Run a helper against `doc` and take the body elements it added out of the document."""
+    body = doc.element.body
+    before = len(body)
+    add()
+    # python-docx inserts new blocks before the trailing sectPr
+    added = list(body)[before - 1:-1] if body[-1].tag == qn("w:sectPr") else list(body)[before:]
+    for el in added:
+        body.remove(el)
+    # Re-parse as plain lxml elements: cheaper to clone than python-docx's element classes
+    elements = [parse_xml(etree.tostring(el)) for el in added]
+    for el in elements:
+        for t in el.iter(_W_T):
+            t.set(_XML_SPACE, "preserve")
+    return elements
+
+
+def _clone(prototype: list, text: Optional[str] = None) -> list:
+    elements = [deepcopy(el) for el in prototype]
+    if text is not None:
+        _fill(elements[-1], text)
+    return elements
+
+
+def _fill(paragraph, text: str) -> None:
+    """Replace the text of the paragraph's first run, keeping its formatting (like run.text = ...)."""
+    run = paragraph.find(_W_R)
+    if not _SPECIAL_CHARS.search(text):
+        # Prototypes hold exactly one <w:t> (see _capture), so plain text is a single assignment
+        run.find(_W_T).text = text
+        return
+
+    for child in list(run):
+        if child.tag != _W_RPR:
+            run.remove(child)
+    text = _XML_INVALID_CHARS.sub("", text)
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            etree.SubElement(run, _W_BR)
+        for j, part in enumerate(line.split("\t")):
+            if j:
+                etree.SubElement(run, _W_TAB)
+            if part:
+                t = etree.SubElement(run, _W_T)
+                t.text = part
+                t.set(_XML_SPACE, "preserve")
+
+
+def _bookmark_name(index: int) -> str:
+    # "_Toc" bookmarks are hidden in Word's bookmark list, like the ones it creates for its own TOCs
+    return f"_TocMeeting{index + 1}"
+
+
+def _bookmark(paragraph, index: int) -> None:
+    start = etree.Element(_W_BOOKMARK_START)
+    start.set(_W_ID, str(index))
+    start.set(_W_NAME, _bookmark_name(index))
+    end = etree.Element(_W_BOOKMARK_END)
+    end.set(_W_ID, str(index))
+    paragraph.find(_W_R).addprevious(start)
+    paragraph.append(end)
+
+
+def _xml_text(value: Optional[str]) -> str:
+    """Cell text as XML run content, the same way _fill would produce it."""
+    text = _XML_INVALID_CHARS.sub("", (value or "").strip() or "-")
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    if "\n" in text or "\t" in text:
+        text = (
+            text.replace("\n", '</w:t><w:br/><w:t xml:space="preserve">')
+            .replace("\t", '</w:t><w:tab/><w:t xml:space="preserve">')
+        )
+    return text
 
 
 def _add_title(doc: Document, text: str) -> None:
@@ -69,14 +359,7 @@ def _add_subtitle(
     llm_provider: Optional[str],
     generated_at: datetime,
 ) -> None:
-    parts = []
-    if original_filename:
-        parts.append(f"File: {original_filename}")
-    if llm_provider:
-        parts.append(f"LLM: {llm_provider}")
-    parts.append(f"Generated: {generated_at.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
-
-    p = doc.add_paragraph(" | ".join(parts))
+    p = doc.add_paragraph(subtitle_text(original_filename, llm_provider, generated_at))
     p.alignment = WD_ALIGN_PARAGRAPH.CENTER
     if p.runs:
         p.runs[0].font.size = Pt(10)
@@ -134,3 +417,20 @@ def _add_action_items_table(doc: Document, summary: MeetingSummary) -> None:
         row[1].text = (getattr(it, "owner", None) or "").strip() or "-"
         row[2].text = (getattr(it, "due_date", None) or "").strip() or "-"
         row[3].text = (getattr(it, "priority", None) or "").strip() or "-"
+
+
+def _add_meeting_heading(doc: Document, title: str) -> None:
+    if "Heading 1" in doc.styles:
+        # A real heading style, so Word's table of contents picks the meetings up
+        doc.add_heading(title, level=1)
+        return
+    h = doc.add_paragraph()
+    run = h.add_run(title)
+    run.bold = True
+    run.font.size = Pt(16)
+
+
+def _add_note(doc: Document) -> None:
+    doc.add_paragraph()
+    note = doc.add_paragraph("Note: This document was generated by AI and may contain inaccuracies.")
+    note.runs[0].font.size = Pt(9)
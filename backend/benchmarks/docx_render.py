@@ -0,0 +1,116 @@
+import argparse
+import json
+import statistics
+import tracemalloc
+from datetime import datetime, timezone
+from io import BytesIO
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from docx import Document
+
+from app.schemas.meeting_summary import ActionItem, MeetingSummary
+from app.services import word_export_service as word
+from app.services.word_export_service import WordExportMetadata, build_docx_from_summary
+
+"""
+Benchmark of Word rendering: the template-cached renderer used by the app
+against building a fresh python-docx Document per summary (the previous
+implementation, rebuilt here from the same _add_* helpers).
+
+    python -m benchmarks.docx_render --items 10 100 500 --runs 20
+
+Reports per-document latency (mean / p50 / p95, ms), peak traced memory per
+document (KiB) and output size, for summaries with the given number of action
+items (plus proportional decisions and participants).
+"""
+
+
+def python_docx_render(summary: MeetingSummary, meta: WordExportMetadata) -> bytes:
+    doc = Document()
+    word._add_title(doc, "Meeting Notes")
+    word._add_subtitle(doc, meta.original_filename, meta.llm_provider, meta.generated_at)
+    word._add_section_heading(doc, "Executive Summary")
+    word._add_paragraph_or_fallback(doc, summary.meeting_summary, "No summary available.")
+    word._add_section_heading(doc, "Participants")
+    word._add_bullets_or_fallback(doc, summary.participants, "Not identified.")
+    word._add_section_heading(doc, "Decisions")
+    word._add_numbered_or_fallback(doc, summary.decisions, "No explicit decisions found.")
+    word._add_section_heading(doc, "Action Items")
+    word._add_action_items_table(doc, summary)
+    word._add_note(doc)
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def template_render(summary: MeetingSummary, meta: WordExportMetadata) -> bytes:
+    return build_docx_from_summary(summary, transcript=None, meta=meta)
+
+
+def make_summary(items: int) -> MeetingSummary:
+    return MeetingSummary(
+        meeting_summary="The team reviewed the quarterly roadmap and agreed on next steps. " * 20,
+        participants=[f"Participant {i}" for i in range(max(3, items // 20))],
+        decisions=[f"Decision {i}: ship feature {i} behind a flag" for i in range(max(1, items // 5))],
+        action_items=[
+            ActionItem(
+                task=f"Follow up on item {i} with the owning team",
+                owner=f"Owner {i % 7}",
+                due_date="2025-01-31",
+                priority=("low", "medium", "high")[i % 3],
+            )
+            for i in range(items)
+        ],
+    )
+
+
+def measure(render: Callable, summary: MeetingSummary, meta: WordExportMetadata, runs: int) -> Dict[str, float]:
+    render(summary, meta)  # warm-up (template build, imports)
+    timings: List[float] = []
+    for _ in range(runs):
+        start = perf_counter()
+        data = render(summary, meta)
+        timings.append((perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    render(summary, meta)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p50_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "peak_kib": round(peak / 1024, 1),
+        "size_bytes": len(data),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    meta = WordExportMetadata(original_filename="meeting.mp3", llm_provider="claude",
+                              generated_at=datetime.now(timezone.utc))
+    results = []
+    for items in args.items:
+        summary = make_summary(items)
+        for name, render in (("python-docx", python_docx_render), ("template", template_render)):
+            results.append({"renderer": name, "action_items": items, **measure(render, summary, meta, args.runs)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'renderer':<12} {'items':>6} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'peak KiB':>9} {'bytes':>8}")
+    for r in results:
+        print(f"{r['renderer']:<12} {r['action_items']:>6} {r['mean_ms']:>9} {r['p50_ms']:>8} "
+              f"{r['p95_ms']:>8} {r['peak_kib']:>9} {r['size_bytes']:>8}")
+
+
+if __name__ == "__main__":
+    main()
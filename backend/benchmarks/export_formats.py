@@ -0,0 +1,47 @@
+import argparse
+import json
+from datetime import datetime, timezone
+
+from benchmarks.docx_render import make_summary, measure
+from app.services.export_service import EXPORTERS
+from app.services.word_export_service import WordExportMetadata
+
+"""
+Benchmark of the export formats registered in export_service (docx, markdown,
+html, jsonl), rendering the same summaries.
+
+    python -m benchmarks.export_formats --items 10 100 500 --runs 50
+
+Reports per-document latency (mean / p50 / p95, ms), peak traced memory per
+document (KiB) and output size for each format.
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    meta = WordExportMetadata(original_filename="meeting.mp3", llm_provider="claude",
+                              generated_at=datetime.now(timezone.utc))
+    results = []
+    for items in args.items:
+        summary = make_summary(items)
+        for exporter in EXPORTERS.values():
+            def render(s, m, exporter=exporter):
+                return b"".join(exporter.render(s, m))
+            results.append({"format": exporter.name, "action_items": items, **measure(render, summary, meta, args.runs)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'format':<10} {'items':>6} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'peak KiB':>9} {'bytes':>8}")
+    for r in results:
+        print(f"{r['format']:<10} {r['action_items']:>6} {r['mean_ms']:>9} {r['p50_ms']:>8} "
+              f"{r['p95_ms']:>8} {r['peak_kib']:>9} {r['size_bytes']:>8}")
+
+
+if __name__ == "__main__":
+    main()
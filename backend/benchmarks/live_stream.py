@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.stub_providers import StubProviders, StubServer, add_stub_arguments, stub_config
+
+"""
+Live meeting benchmark: streams a recording to /ws/live at real-time pace (or
+faster) against the local stub providers, and reports how long after the end
+of the meeting the final transcript and the summary arrive.
+
+    python -m benchmarks.live_stream --seconds 120 --speed 10 --whisper-latency-ms 1500
+    python -m benchmarks.live_stream --wav meeting.wav --window-seconds 15
+
+The app runs in-process (Starlette's TestClient), so no WebSocket server
+library is needed. Without --wav, a silent 16 kHz mono stream is generated:
+the stub answers with a sample transcript whatever the audio is.
+"""
+
+
+def pcm_stream(path: Optional[Path], seconds: float, sample_rate: int) -> tuple:
+    """(pcm bytes, sample rate, channels) of the WAV file, or of `seconds` of 16-bit mono silence."""
+    if path is None:
+        return b"\0\0" * int(seconds * sample_rate), sample_rate, 1
+    with wave.open(str(path), "rb") as src:
+        if src.getsampwidth() != 2:
+            raise SystemExit("Only 16-bit PCM WAV files can be streamed")
+        return src.readframes(src.getnframes()), src.getframerate(), src.getnchannels()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", type=Path, help="16-bit PCM WAV file to stream (default: generated silence)")
+    parser.add_argument("--seconds", type=float, default=120.0, help="length of the generated stream")
+    parser.add_argument("--speed", type=float, default=10.0, help="times faster than real time")
+    parser.add_argument("--frame-ms", type=int, default=100, help="audio per WebSocket message")
+    parser.add_argument("--window-seconds", type=float, help="LIVE_WINDOW_SECONDS for the app")
+    parser.add_argument("--llm-provider", choices=("claude", "openai"), default="claude")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    pcm, rate, channels = pcm_stream(args.wav, args.seconds, 16000)
+    stub = StubServer(StubProviders(stub_config(args))).start()
+    data_dir = tempfile.mkdtemp(prefix="live-stream-")
+    os.environ.update({
+        **stub.app_env(),
+        "JOB_STORE_BACKEND": "memory",
+        "MEETING_DB_PATH": f"{data_dir}/meetings.sqlite3",
+        "UPLOAD_DIR": f"{data_dir}/uploads",
+        "TRANSCRIPT_CACHE_DIR": f"{data_dir}/transcript_cache",
+        "STARTUP_WARMUP": "false",
+    })
+    if args.window_seconds:
+        os.environ["LIVE_WINDOW_SECONDS"] = str(args.window_seconds)
+
+    # Imported after the environment is set: the app reads its configuration at import
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    events: List[Dict[str, Any]] = []
+    frame_bytes = int(rate * args.frame_ms / 1000) * 2 * channels
+    url = f"/ws/live?sample_rate={rate}&channels={channels}&llm_provider={args.llm_provider}"
+    try:
+        with TestClient(app) as client, client.websocket_connect(url) as ws:
+            ws.receive_json()
+            stream_start = time.perf_counter()
+
+            def receive() -> None:
+                while True:
+                    event = ws.receive_json()
+                    events.append({**event, "at": time.perf_counter()})
+                    if event["type"] in ("summary", "error"):
+                        return
+
+            receiver = threading.Thread(target=receive, daemon=True)
+            receiver.start()
+            for i in range(0, len(pcm), frame_bytes):
+                ws.send_bytes(pcm[i:i + frame_bytes])
+                # Pace the stream: audio sent so far, played back `speed` times faster
+                due = stream_start + (i + frame_bytes) / (rate * 2 * channels) / args.speed
+                time.sleep(max(0.0, due - time.perf_counter()))
+            stopped = time.perf_counter()
+            ws.send_text(json.dumps({"type": "stop"}))
+            receiver.join(timeout=600)
+    finally:
+        stub.stop()
+
+    by_type = {e["type"]: e for e in events}
+    if "error" in by_type:
+        raise SystemExit(f"Live session failed: {by_type['error']['detail']}")
+    windows = [e for e in events if e["type"] == "transcript" and e["at"] < stopped]
+    print(f"streamed {len(pcm) / (rate * 2 * channels):.0f}s of audio in {stopped - stream_start:.1f}s "
+          f"({args.speed:g}x real time); {len(windows)} transcript updates before the end")
+    for name in ("transcript_final", "summary"):
+        if name in by_type:
+            print(f"{name:<17} {(by_type[name]['at'] - stopped) * 1000:8.0f} ms after stop")
+    print(f"stub calls: {stub.stub.counts}")
+
+
+if __name__ == "__main__":
+    main()
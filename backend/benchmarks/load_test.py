@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import wave
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:  # recent SDK releases ship on httpx2
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+from benchmarks.docx_render import make_summary
+from benchmarks.stub_providers import (
+    StubProviders,
+    StubServer,
+    add_stub_arguments,
+    free_port,
+    load_sample_transcripts,
+    stub_config,
+)
+
+"""
+Load test of the running app against the local stub providers (no API keys,
+no network, no cost).
+
+    python -m benchmarks.load_test --concurrency 1 4 16 --requests 40 --output results.json
+    python -m benchmarks.load_test --rate-limit-rate 0.1 --error-rate 0.02 --compare results.json
+
+The app is started with uvicorn in a child process, pointed at the stub
+Whisper / OpenAI / Anthropic servers, with its data directories in a temporary
+folder. /process, /summarize and /export/docx are driven at each concurrency
+level; every level reports p50/p95/p99 latency (ms), requests/sec, the status
+codes, and the app's peak RSS so far (Linux only).
+Inputs are unique per request unless --reuse-inputs is given, so the transcript
+and summary caches miss and every request goes through the providers.
+Results can be written as JSON (--output) and compared with an earlier run
+(--compare) to spot regressions between commits.
+"""
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ENDPOINTS = ("process", "summarize", "export_docx")
+
+# The app's own limits would throttle the test, not measure it
+_UNLIMITED_ENV = {
+    "CLAUDE_RPM": "1000000", "CLAUDE_TPM": "1000000000",
+    "OPENAI_RPM": "1000000", "OPENAI_TPM": "1000000000",
+    "WHISPER_RPM": "1000000",
+}
+
+
+class AppProcess:
+    """The app under test, started with uvicorn in a child process."""
+
+    def __init__(self, env: Dict[str, str], data_dir: Path, log_path: Optional[Path] = None) -> None:
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = {
+            **os.environ,
+            **_UNLIMITED_ENV,
+            "JOB_STORE_BACKEND": "memory",
+            "UPLOAD_DIR": str(data_dir / "uploads"),
+            "TRANSCRIPT_CACHE_DIR": str(data_dir / "transcript_cache"),
+            "MEETING_DB_PATH": str(data_dir / "meetings.sqlite3"),
+            "BATCH_OUTPUT_DIR": str(data_dir / "batches"),
+            **env,
+        }
+        self.env.pop("SUMMARY_CACHE_DIR", None)
+        self.log_path = log_path
+        self._proc: Optional[subprocess.Popen] = None
+        self.startup_seconds: Optional[float] = None
+
+    def start(self, timeout: float = 60.0) -> "AppProcess":
+        # The app logs every request; keep that out of the report unless asked for
+        log = self.log_path.open("ab") if self.log_path else subprocess.DEVNULL
+        start = time.perf_counter()
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env=self.env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        if self.log_path:
+            log.close()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"The app exited during startup (code {self._proc.returncode})")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1).status_code == 200:
+                    self.startup_seconds = time.perf_counter() - start
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.05)
+        self.stop()
+        raise RuntimeError("The app did not answer /health in time")
+
+    def peak_rss_mib(self) -> Optional[float]:
+        return _proc_status_mib(self._proc.pid, "VmHWM") if self._proc else None
+
+    def rss_mib(self) -> Optional[float]:
+        return _proc_status_mib(self._proc.pid, "VmRSS") if self._proc else None
+
+    def stop(self) -> None:
+        if self._proc is None or self._proc.poll() is not None:
+            return
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+
+
+def _proc_status_mib(pid: int, field: str) -> Optional[float]:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def wav_bytes(seconds: float, nonce: str = "") -> bytes:
+    """A mono 16 kHz WAV of the given length; the nonce makes its content (and hash) unique."""
+    frames = int(seconds * 16000)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        tail = nonce.encode("ascii")[: frames * 2]
+        w.writeframes(b"\0" * (frames * 2 - len(tail)) + tail)
+    return buf.getvalue()
+
+
+def request_factory(endpoint: str, args: argparse.Namespace) -> Callable[[int], Dict[str, Any]]:
+    """Build the keyword arguments of the httpx request for the i-th request to `endpoint`."""
+    def nonce() -> str:
+        return "" if args.reuse_inputs else uuid.uuid4().hex
+
+    if endpoint == "process":
+        def process(i: int) -> Dict[str, Any]:
+            return {
+                "method": "POST",
+                "url": f"/process?llm_provider={args.llm_provider}",
+                "files": {"file": ("meeting.wav", wav_bytes(args.audio_seconds, nonce()), "audio/wav")},
+            }
+        return process
+
+    if endpoint == "summarize":
+        transcripts = load_sample_transcripts()
+
+        def summarize(i: int) -> Dict[str, Any]:
+            transcript = transcripts[i % len(transcripts)]
+            if not args.reuse_inputs:
+                transcript += f"\n[99:59] Note: request {nonce()}"
+            return {
+                "method": "POST",
+                "url": f"/summarize?llm_provider={args.llm_provider}",
+                "json": {"transcript": transcript},
+            }
+        return summarize
+
+    if endpoint == "export_docx":
+        summary = make_summary(args.action_items).model_dump(mode="json")
+
+        def export_docx(i: int) -> Dict[str, Any]:
+            return {"method": "POST", "url": "/export/docx", "json": summary}
+        return export_docx
+
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+async def run_level(
+    base_url: str,
+    make_request: Callable[[int], Dict[str, Any]],
+    concurrency: int,
+    requests: int,
+    timeout: float,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_index = 0
+
+    async def worker(client) -> None:
+        nonlocal next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            kwargs = make_request(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(**kwargs)
+                await response.aread()
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ok = sum(n for status, n in statuses.items() if status.startswith("2"))
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "ok": ok,
+        "errors": len(latencies) - ok,
+        "status_codes": dict(sorted(statuses.items())),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(latencies[-1], 1) if latencies else None,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+    }
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return round(sorted_values[int(rank) - 1], 1)
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    before = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_commit') or 'unknown commit'}):")
+    print(f"{'endpoint':<12} {'conc':>5} {'p95 ms':>17} {'rps':>17}")
+    for r in results:
+        old = before.get((r["endpoint"], r["concurrency"]))
+        if old is None:
+            continue
+        print(f"{r['endpoint']:<12} {r['concurrency']:>5} "
+              f"{_change(old['p95_ms'], r['p95_ms']):>17} {_change(old['rps'], r['rps']):>17}")
+
+
+def _change(old: Optional[float], new: Optional[float]) -> str:
+    if not old or new is None:
+        return f"{old} -> {new}"
+    return f"{new} ({(new - old) / old * 100:+.0f}%)"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=40, help="requests per endpoint and concurrency level")
+    parser.add_argument("--llm-provider", choices=("claude", "openai"), default="claude")
+    parser.add_argument("--audio-seconds", type=float, default=5.0, help="length of the WAV sent to /process")
+    parser.add_argument("--action-items", type=int, default=20, help="size of the summary sent to /export/docx")
+    parser.add_argument("--reuse-inputs", action="store_true", help="send identical inputs (measures the caches)")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests per endpoint before the levels")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--app-log", type=Path, help="append the app's output to this file")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="an earlier --output file to compare with")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stub = StubServer(StubProviders(stub_config(args, unique_transcripts=not args.reuse_inputs))).start()
+    with tempfile.TemporaryDirectory(prefix="load-test-") as data_dir:
+        app = AppProcess(stub.app_env(), Path(data_dir), log_path=args.app_log)
+        try:
+            app.start()
+            print(f"App answered /health {app.startup_seconds:.2f}s after start "
+                  f"(RSS {app.rss_mib()} MiB); stub providers on {stub.url}")
+            results = []
+            for endpoint in args.endpoints:
+                make_request = request_factory(endpoint, args)
+                if args.warmup:
+                    asyncio.run(run_level(app.url, make_request, 1, args.warmup, args.timeout))
+                for concurrency in args.concurrency:
+                    level = asyncio.run(run_level(app.url, make_request, concurrency, args.requests, args.timeout))
+                    results.append({"endpoint": endpoint, **level, "peak_rss_mib": app.peak_rss_mib()})
+        finally:
+            app.stop()
+            stub.stop()
+
+    print(f"\n{'endpoint':<12} {'conc':>5} {'ok':>5} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'rps':>8} {'peak MiB':>9}")
+    for r in results:
+        print(f"{r['endpoint']:<12} {r['concurrency']:>5} {r['ok']:>5} {r['errors']:>5} {r['p50_ms']:>9} "
+              f"{r['p95_ms']:>9} {r['p99_ms']:>9} {r['rps']:>8} {r['peak_rss_mib']!s:>9}")
+    print(f"Stub providers: {stub.stub.counts}")
+
+    if args.output:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "startup_seconds": round(app.startup_seconds, 3) if app.startup_seconds else None,
+            "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+            "stub_counts": stub.stub.counts,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
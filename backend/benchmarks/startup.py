@@ -0,0 +1,93 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+try:  # recent SDK releases ship on httpx2
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+from benchmarks.docx_render import make_summary
+from benchmarks.load_test import BACKEND_DIR, AppProcess
+
+"""
+Cold-start benchmark: how long the app takes to import, and to answer /health
+after `uvicorn app.main:app` is started.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --no-warmup
+
+Each run uses a fresh interpreter, so nothing is cached in memory. Reported:
+- the time to `import app.main`, and which heavy modules (provider SDKs,
+  python-docx, lxml) that import pulled in: none of them should be listed,
+  they are loaded on first use or by the background warm-up;
+- the time from starting uvicorn to the first 200 from /health;
+- the latency of the first /export/docx request right after that, which pays
+  for python-docx unless the warm-up already loaded it (--no-warmup to compare;
+  --export-after gives the warm-up time to finish first).
+"""
+
+HEAVY_MODULES = ("openai", "anthropic", "docx", "lxml.etree", "httpx2", "httpx")
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_import() -> Dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_cold_start(warmup: bool, export_after: float) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="startup-") as data_dir:
+        app = AppProcess({"STARTUP_WARMUP": "true" if warmup else "false"}, Path(data_dir))
+        try:
+            app.start()
+            time.sleep(export_after)
+            start = time.perf_counter()
+            response = httpx.post(f"{app.url}/export/docx", json=make_summary(5).model_dump(mode="json"), timeout=60)
+            first_export = time.perf_counter() - start
+            response.raise_for_status()
+            return {"health_seconds": app.startup_seconds, "first_export_seconds": first_export}
+        finally:
+            app.stop()
+
+
+def _summary(values: List[float]) -> str:
+    return f"median {statistics.median(values) * 1000:7.0f} ms   min {min(values) * 1000:7.0f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-warmup", action="store_true", help="start the app with STARTUP_WARMUP=false")
+    parser.add_argument("--export-after", type=float, default=0.0,
+                        help="seconds to wait after /health before the first export")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    starts = [measure_cold_start(not args.no_warmup, args.export_after) for _ in range(args.runs)]
+
+    loaded = sorted({m for run in imports for m in run["loaded"]})
+    print(f"import app.main      {_summary([r['seconds'] for r in imports])}")
+    print(f"  heavy modules loaded at import: {', '.join(loaded) or 'none'}")
+    print(f"first /health 200    {_summary([r['health_seconds'] for r in starts])}")
+    print(f"first /export/docx   {_summary([r['first_export_seconds'] for r in starts])}"
+          f"   (warm-up {'off' if args.no_warmup else 'on'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+"""
+Local fake Whisper, OpenAI and Anthropic servers, for load tests and for
+checking what the app sends without calling (or paying for) the real APIs.
+
+    python -m benchmarks.stub_providers --port 9100 --llm-latency-ms 800 --rate-limit-rate 0.05
+
+then start the app with OPENAI_BASE_URL=http://127.0.0.1:9100/v1 and
+ANTHROPIC_BASE_URL=http://127.0.0.1:9100 (any API key works).
+
+- POST /v1/audio/transcriptions answers with one of the sample transcripts.
+- POST /v1/responses (OpenAI) and POST /v1/messages (Anthropic, tool use)
+  answer with a summary built from the transcript (or, for an incremental
+  summarization request, an update built from its changes), streamed when
+  asked to.
+- Latency, 5xx error rate and 429 rate are configurable; a 429 carries a
+  retry-after-ms header like the real APIs.
+- The last requests are kept (StubProviders.requests) so tests can inspect the
+  payloads.
+- Anthropic prompt caching is emulated: the request prefix up to the last
+  cache_control breakpoint is reported as cache_creation_input_tokens the first
+  time it is seen and as cache_read_input_tokens after that. Like the real API,
+  prefixes shorter than prompt_cache_min_tokens are not cached (there is no
+  expiry).
+"""
+
+SAMPLES_DIR = Path(__file__).resolve().parent.parent / "samples"
+
+_SPEAKER = re.compile(r"^\s*(?:\[[^\]]*\]\s*)?([A-Z][\w.-]*(?: [A-Z][\w.-]*)?)(?: \([^)]*\))?:", re.MULTILINE)
+
+
+@dataclass
+class StubConfig:
+    whisper_latency_ms: float = 300.0
+    llm_latency_ms: float = 800.0
+    jitter: float = 0.2  # +/- fraction of the latency
+    error_rate: float = 0.0  # share of requests answered with a 500
+    rate_limit_rate: float = 0.0  # share of requests answered with a 429
+    retry_after_ms: int = 200
+    stream_chunks: int = 8  # deltas per streamed answer
+    unique_transcripts: bool = True  # append a nonce so the app's caches miss
+    prompt_cache_min_tokens: int = 1024  # shorter prefixes are not cached, as with Sonnet
+    seed: Optional[int] = None
+
+
+def load_sample_transcripts(samples_dir: Path = SAMPLES_DIR) -> List[str]:
+    transcripts = []
+    for path in sorted(samples_dir.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        try:
+            text = json.loads(text)["transcript"]
+        except (ValueError, KeyError, TypeError):
+            pass
+        transcripts.append(text)
+    return transcripts or ["[00:00] Alex: Let's start the meeting.\n[00:05] Sam: Decision: ship on Friday."]
+
+
+def summary_for(transcript: str) -> Dict[str, Any]:
+    """A deterministic, schema-valid summary derived from the transcript text."""
+    transcript = transcript.removeprefix("Transcript:")
+    speakers = list(dict.fromkeys(m.group(1) for m in _SPEAKER.finditer(transcript)))
+    lines = [_SPEAKER.sub("", line, count=1).strip() for line in transcript.splitlines()]
+    lines = [line for line in lines if line]
+    decisions = [line.split(":", 1)[1].strip() for line in lines if line.lower().startswith("decision:")]
+    actions = [line.split(":", 1)[1].strip() for line in lines if line.lower().startswith("action item:")]
+    return {
+        "meeting_summary": " ".join(lines[:3])[:400] or "No discussion recorded.",
+        "participants": speakers,
+        "decisions": decisions,
+        "action_items": [
+            {"task": task, "owner": speakers[0] if speakers else None, "due_date": None, "priority": "medium"}
+            for task in actions
+        ],
+    }
+
+
+def update_for(request_text: str) -> Dict[str, Any]:
+    """A schema-valid summary update for an incremental summarization request, from its "+"/"-" lines."""
+    current, _, changes = request_text.partition("\n\nTranscript changes")
+    try:
+        overview = json.loads(current.removeprefix("Current summary:"))["meeting_summary"]
+    except (ValueError, KeyError, TypeError):
+        overview = "No discussion recorded."
+    lines = changes.splitlines()
+    added = summary_for("\n".join(line[2:] for line in lines if line.startswith("+ ")))
+    removed = summary_for("\n".join(line[2:] for line in lines if line.startswith("- ")))
+    return {
+        "meeting_summary": overview,
+        "participants_added": added["participants"],
+        "participants_removed": [],
+        "decisions_added": added["decisions"],
+        "decisions_removed": removed["decisions"],
+        "action_items_added": added["action_items"],
+        "action_items_removed": [item["task"] for item in removed["action_items"]],
+        "renamed": [],
+    }
+
+
+def answer_for(request_text: str) -> Dict[str, Any]:
+    if request_text.startswith("Current summary:"):
+        return update_for(request_text)
+    return summary_for(request_text)
+
+
+class StubProviders:
+    def __init__(self, config: StubConfig, transcripts: Optional[List[str]] = None) -> None:
+        self.config = config
+        self.transcripts = transcripts or load_sample_transcripts()
+        self.requests: Deque[Dict[str, Any]] = deque(maxlen=200)
+        self.counts: Dict[str, int] = {}
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self._next_transcript = 0
+        self._cached_prefixes: set = set()
+        self.app = Starlette(routes=[
+            Route("/v1/audio/transcriptions", self.transcriptions, methods=["POST"]),
+            Route("/v1/responses", self.responses, methods=["POST"]),
+            Route("/v1/messages", self.messages, methods=["POST"]),
+        ])
+
+    # Endpoints
+
+    async def transcriptions(self, request: Request) -> Response:
+        form = await request.form()
+        upload = form.get("file")
+        size = len(await upload.read()) if upload is not None and hasattr(upload, "read") else 0
+        self._record("whisper", {"model": form.get("model"), "file_bytes": size})
+        failure = await self._delay_or_fail(self.config.whisper_latency_ms, "openai")
+        if failure:
+            return failure
+        return JSONResponse({"text": self._transcript()})
+
+    async def responses(self, request: Request) -> Response:
+        body = await request.json()
+        self._record("openai", body)
+        failure = await self._delay_or_fail(self.config.llm_latency_ms, "openai")
+        if failure:
+            return failure
+
+        transcript = _user_text(body.get("input"))
+        text = json.dumps(answer_for(transcript))
+        usage = {"input_tokens": _tokens(transcript), "output_tokens": _tokens(text)}
+        if not body.get("stream"):
+            return JSONResponse(_openai_response(body.get("model"), text, usage))
+        return StreamingResponse(
+            _sse(_openai_events(body.get("model"), text, usage, self.config.stream_chunks)),
+            media_type="text/event-stream",
+        )
+
+    async def messages(self, request: Request) -> Response:
+        body = await request.json()
+        self._record("anthropic", body)
+        failure = await self._delay_or_fail(self.config.llm_latency_ms, "anthropic")
+        if failure:
+            return failure
+
+        transcript = _user_text(body.get("messages"))
+        tool_input = answer_for(transcript)
+        tool_name = (body.get("tool_choice") or {}).get("name") or "record_meeting_summary"
+        usage = {
+            **self._prompt_cache_usage(body),
+            "output_tokens": _tokens(json.dumps(tool_input)),
+        }
+        if not body.get("stream"):
+            return JSONResponse(_anthropic_message(body.get("model"), tool_name, tool_input, usage))
+        return StreamingResponse(
+            _sse(_anthropic_events(body.get("model"), tool_name, tool_input, usage, self.config.stream_chunks)),
+            media_type="text/event-stream",
+        )
+
+    # Helpers
+
+    def _record(self, provider: str, body: Dict[str, Any]) -> None:
+        with self._lock:
+            self.counts[provider] = self.counts.get(provider, 0) + 1
+            self.requests.append({"provider": provider, "body": body})
+
+    def _prompt_cache_usage(self, body: Dict[str, Any]) -> Dict[str, int]:
+        total = _tokens(json.dumps(body))
+        prefix = _cached_prefix(body)
+        prefix_tokens = _tokens(prefix) if prefix is not None else 0
+        if prefix is None or prefix_tokens < self.config.prompt_cache_min_tokens:
+            return {"input_tokens": total, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        with self._lock:
+            hit = prefix in self._cached_prefixes
+            self._cached_prefixes.add(prefix)
+        self._count("anthropic_cache_hit" if hit else "anthropic_cache_miss")
+        return {
+            "input_tokens": max(total - prefix_tokens, 0),
+            "cache_creation_input_tokens": 0 if hit else prefix_tokens,
+            "cache_read_input_tokens": prefix_tokens if hit else 0,
+        }
+
+    async def _delay_or_fail(self, latency_ms: float, provider: str) -> Optional[Response]:
+        cfg = self.config
+        with self._lock:
+            jitter = 1 + self._random.uniform(-cfg.jitter, cfg.jitter)
+            roll = self._random.random()
+        await asyncio.sleep(max(0.0, latency_ms * jitter) / 1000)
+
+        if roll < cfg.rate_limit_rate:
+            self._count("rate_limited")
+            return _error(provider, 429, "rate_limit_error", "Stub rate limit",
+                          {"retry-after-ms": str(cfg.retry_after_ms)})
+        if roll < cfg.rate_limit_rate + cfg.error_rate:
+            self._count("errors")
+            return _error(provider, 500, "api_error", "Stub server error")
+        return None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _transcript(self) -> str:
+        with self._lock:
+            text = self.transcripts[self._next_transcript % len(self.transcripts)]
+            self._next_transcript += 1
+        if self.config.unique_transcripts:
+            text += f"\n[99:59] Note: request {uuid.uuid4().hex}"
+        return text
+
+
+class StubServer:
+    """Runs the stub providers with uvicorn on a background thread."""
+
+    def __init__(self, stub: StubProviders, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.stub = stub
+        self.host = host
+        self.port = port or free_port(host)
+        self._server = uvicorn.Server(uvicorn.Config(stub.app, host=host, port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="stub-providers", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "StubServer":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("The stub provider server did not start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+    def app_env(self) -> Dict[str, str]:
+        """Environment that points the app's API clients at this server."""
+        return {
+            "OPENAI_API_KEY": "stub",
+            "ANTHROPIC_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"{self.url}/v1",
+            "ANTHROPIC_BASE_URL": self.url,
+        }
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _user_text(messages: Any) -> str:
+    """The text of the user message(s) in an OpenAI `input` or Anthropic `messages` list."""
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for m in messages or []:
+        if m.get("role") != "user":
+            continue
+        content = m.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content or [] if isinstance(block, dict))
+    return "\n".join(parts)
+
+
+def _cached_prefix(body: Dict[str, Any]) -> Optional[str]:
+    """The request up to its last cache_control breakpoint (tools, then system, then messages), or None."""
+    blocks: List[Any] = list(body.get("tools") or [])
+    system = body.get("system")
+    blocks += system if isinstance(system, list) else [system] if system else []
+    for message in body.get("messages") or []:
+        content = message.get("content")
+        blocks += content if isinstance(content, list) else [content]
+    marked = [i for i, b in enumerate(blocks) if isinstance(b, dict) and "cache_control" in b]
+    if not marked:
+        return None
+    return json.dumps([body.get("model"), blocks[: marked[-1] + 1]], sort_keys=True)
+
+
+def _split(text: str, parts: int) -> List[str]:
+    size = max(1, -(-len(text) // max(1, parts)))
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+def _sse(events: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    for event in events:
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+
+
+def _error(provider: str, status: int, kind: str, message: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    if provider == "anthropic":
+        body = {"type": "error", "error": {"type": kind, "message": message}}
+    else:
+        body = {"error": {"message": message, "type": kind, "code": None, "param": None}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def _openai_response(model: str, text: str, usage: Dict[str, int], status: str = "completed") -> Dict[str, Any]:
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": status,
+        "output": [{
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "status": status,
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            **usage,
+            "total_tokens": usage["input_tokens"] + usage["output_tokens"],
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        },
+    }
+
+
+def _openai_events(model: str, text: str, usage: Dict[str, int], chunks: int) -> Iterator[Dict[str, Any]]:
+    final = _openai_response(model, text, usage)
+    started = {**final, "status": "in_progress", "output": [], "usage": None}
+    item = {**final["output"][0], "status": "in_progress", "content": []}
+    seq = iter(range(1_000_000))
+    yield {"type": "response.created", "sequence_number": next(seq), "response": started}
+    yield {"type": "response.output_item.added", "sequence_number": next(seq), "output_index": 0, "item": item}
+    yield {
+        "type": "response.content_part.added", "sequence_number": next(seq), "item_id": item["id"],
+        "output_index": 0, "content_index": 0, "part": {"type": "output_text", "text": "", "annotations": []},
+    }
+    for delta in _split(text, chunks):
+        yield {
+            "type": "response.output_text.delta", "sequence_number": next(seq), "item_id": item["id"],
+            "output_index": 0, "content_index": 0, "delta": delta, "logprobs": [],
+        }
+    yield {
+        "type": "response.output_text.done", "sequence_number": next(seq), "item_id": item["id"],
+        "output_index": 0, "content_index": 0, "text": text, "logprobs": [],
+    }
+    yield {"type": "response.completed", "sequence_number": next(seq), "response": final}
+
+
+def _anthropic_message(model: str, tool_name: str, tool_input: Dict[str, Any], usage: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "tool_use", "id": "toolu_stub", "name": tool_name, "input": tool_input}],
+        "stop_reason": "tool_use",
+        "stop_sequence": None,
+        "usage": usage,
+    }
+
+
+def _anthropic_events(
+    model: str, tool_name: str, tool_input: Dict[str, Any], usage: Dict[str, int], chunks: int,
+) -> Iterator[Dict[str, Any]]:
+    message = _anthropic_message(model, tool_name, tool_input, usage)
+    start_usage = {**usage, "output_tokens": 1}
+    yield {"type": "message_start", "message": {**message, "content": [], "stop_reason": None, "usage": start_usage}}
+    yield {
+        "type": "content_block_start", "index": 0,
+        "content_block": {"type": "tool_use", "id": "toolu_stub", "name": tool_name, "input": {}},
+    }
+    for delta in _split(json.dumps(tool_input), chunks):
+        yield {"type": "content_block_delta", "index": 0, "delta": {"type": "input_json_delta", "partial_json": delta}}
+    yield {"type": "content_block_stop", "index": 0}
+    yield {
+        "type": "message_delta",
+        "delta": {"stop_reason": "tool_use", "stop_sequence": None},
+        "usage": {"output_tokens": usage["output_tokens"]},
+    }
+    yield {"type": "message_stop"}
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = StubConfig()
+    group = parser.add_argument_group("stub providers")
+    group.add_argument("--whisper-latency-ms", type=float, default=defaults.whisper_latency_ms)
+    group.add_argument("--llm-latency-ms", type=float, default=defaults.llm_latency_ms)
+    group.add_argument("--jitter", type=float, default=defaults.jitter, help="latency jitter, +/- fraction")
+    group.add_argument("--error-rate", type=float, default=defaults.error_rate, help="share of 500 answers")
+    group.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="share of 429 answers")
+    group.add_argument("--retry-after-ms", type=int, default=defaults.retry_after_ms)
+    group.add_argument("--seed", type=int, default=None)
+
+
+def stub_config(args: argparse.Namespace, unique_transcripts: bool = True) -> StubConfig:
+    return StubConfig(
+        whisper_latency_ms=args.whisper_latency_ms,
+        llm_latency_ms=args.llm_latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_ms=args.retry_after_ms,
+        unique_transcripts=unique_transcripts,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stub = StubProviders(stub_config(args))
+    print(f"Stub providers on http://{args.host}:{args.port}")
+    uvicorn.run(stub.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import math
+import struct
+import wave
+
+import pytest
+
+from app.services.audio_chunking_service import split_audio, stitch_transcripts
+
+
+def _write_wav(path, seconds, rate=8000):
+    # A tone with a short pause every second, so the splitter has quiet points to cut at
+    frames = bytearray()
+    for i in range(int(seconds * rate)):
+        quiet = (i % rate) > rate * 0.9
+        value = 0 if quiet else int(8000 * math.sin(2 * math.pi * 440 * i / rate))
+        frames += struct.pack("<h", value)
+    with wave.open(str(path), "wb") as dst:
+        dst.setnchannels(1)
+        dst.setsampwidth(2)
+        dst.setframerate(rate)
+        dst.writeframes(bytes(frames))
+    return path
+
+
+def test_stitch_removes_the_overlap_between_chunks():
+    texts = [
+        "we agreed to ship the beta next week and",
+        "ship the beta next week and Sam will write the notes",
+    ]
+    assert stitch_transcripts(texts) == "we agreed to ship the beta next week and Sam will write the notes"
+
+
+def test_stitch_ignores_case_and_punctuation_in_the_overlap():
+    # The earlier chunk's wording of the overlap is kept
+    texts = ["Let's move on to the Budget.", "move on to the budget, which is tight"]
+    assert stitch_transcripts(texts) == "Let's move on to the Budget. which is tight"
+
+
+def test_stitch_concatenates_when_there_is_no_overlap():
+    assert stitch_transcripts(["first part", "", "second part"]) == "first part second part"
+
+
+def test_stitch_ignores_a_repeated_phrase_away_from_the_chunk_boundary():
+    # The overlap was silence; the phrase repeated well inside both chunks is not the overlap
+    filler = " ".join(f"point{i}" for i in range(20))
+    left = f"let's review the action items for this week {filler} ok"
+    right = f"so first {filler.upper()} then let's review the action items for this week again"
+    assert stitch_transcripts([left, right], overlap_seconds=2.0) == f"{left} {right}"
+
+
+def test_stitch_finds_the_overlap_within_the_boundary():
+    texts = ["one two three four five six", "four five six seven"]
+    assert stitch_transcripts(texts, overlap_seconds=0.5) == "one two three four five six seven"
+
+
+def test_split_wav_into_overlapping_chunks_under_the_limit(tmp_path):
+    source = _write_wav(tmp_path / "meeting.wav", seconds=10)
+    max_bytes = 40_000
+
+    chunks = split_audio(source, tmp_path / "chunks", max_chunk_bytes=max_bytes, overlap_seconds=0.5)
+
+    assert len(chunks) > 1
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert chunks[0].start_seconds == 0
+    assert chunks[-1].end_seconds == pytest.approx(10, abs=0.01)
+    for chunk in chunks:
+        assert chunk.path.stat().st_size <= max_bytes
+        with wave.open(str(chunk.path), "rb") as src:
+            assert src.getnframes() / src.getframerate() == pytest.approx(
+                chunk.end_seconds - chunk.start_seconds, abs=0.01
+            )
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert nxt.start_seconds < prev.end_seconds  # consecutive chunks overlap
+
+
+def test_split_rejects_unsupported_formats(tmp_path):
+    source = tmp_path / "meeting.ogg"
+    source.write_bytes(b"OggS")
+    with pytest.raises(ValueError):
+        split_audio(source, tmp_path / "chunks", max_chunk_bytes=1000, overlap_seconds=0.5)
+
+
+def test_unreadable_wav_is_reported_as_a_split_failure(tmp_path):
+    from app.services.whisper_service import _split
+
+    source = tmp_path / "meeting.wav"
+    source.write_bytes(b"RIFF\x24\x00\x00\x00WAVEjunk")
+    with pytest.raises(RuntimeError, match="Could not split"):
+        _split(str(source), str(tmp_path / "chunks"))
@@ -0,0 +1,105 @@
+from app.schemas.meeting_summary import ActionItem, MeetingSummary, NameChange, SummaryUpdate
+from app.services.incremental_summary_service import (
+    apply_summary_update,
+    diff_transcripts,
+    split_segments,
+)
+
+TRANSCRIPT = "\n".join(f"Alex: point number {i}." for i in range(1, 21))
+
+
+def _summary(**fields):
+    defaults = dict(meeting_summary="Weekly sync.", participants=[], decisions=[], action_items=[])
+    return MeetingSummary(**{**defaults, **fields})
+
+
+def _update(**fields):
+    defaults = dict(
+        meeting_summary="Weekly sync.",
+        participants_added=[], participants_removed=[],
+        decisions_added=[], decisions_removed=[],
+        action_items_added=[], action_items_removed=[],
+        renamed=[],
+    )
+    return SummaryUpdate(**{**defaults, **fields})
+
+
+def test_split_segments_splits_lines_and_sentences():
+    assert split_segments("Alex: Hi. How are you?\n\nSam: Fine!") == ["Alex: Hi.", "How are you?", "Sam: Fine!"]
+
+
+def test_identical_transcripts_have_no_hunks():
+    diff = diff_transcripts(TRANSCRIPT, TRANSCRIPT)
+    assert diff.hunks == []
+    assert diff.changed_segments == 0
+    assert diff.changed_chars == 0
+
+
+def test_an_edit_is_sent_with_context_only():
+    edited = TRANSCRIPT.replace("point number 10.", "point number ten.")
+
+    diff = diff_transcripts(TRANSCRIPT, edited)
+
+    assert len(diff.hunks) == 1
+    lines = diff.text.splitlines()
+    assert lines[0] == "@@ segment 8 of 20 @@"
+    assert "- Alex: point number 10." in lines
+    assert "+ Alex: point number ten." in lines
+    # Two unchanged segments of context on each side, nothing else
+    assert [l for l in lines[1:] if l.startswith("  ")] == [
+        "  Alex: point number 8.", "  Alex: point number 9.",
+        "  Alex: point number 11.", "  Alex: point number 12.",
+    ]
+    assert diff.changed_segments == 1
+    assert diff.changed_chars == len("Alex: point number ten.")
+
+
+def test_distant_edits_get_separate_hunks_and_appended_text_counts_as_changed():
+    edited = TRANSCRIPT.replace("point number 2.", "point number two.") + "\nSam: one more thing."
+
+    diff = diff_transcripts(TRANSCRIPT, edited)
+
+    assert len(diff.hunks) == 2
+    assert diff.hunks[-1].endswith("+ Sam: one more thing.")
+    assert diff.changed_segments == 2
+    assert diff.changed_chars == len("Alex: point number two.") + len("Sam: one more thing.")
+
+
+def test_apply_update_removes_renames_and_appends():
+    previous = _summary(
+        participants=["Alex", "Sam"],
+        decisions=["Ship on Monday", "Keep the old logo"],
+        action_items=[
+            ActionItem(task="Sam drafts the release notes", owner="Sam"),
+            ActionItem(task="Book a room", owner="Alex"),
+        ],
+    )
+    update = _update(
+        meeting_summary="Weekly sync, release moved.",
+        participants_added=["Jo"],
+        decisions_removed=["ship on monday"],
+        decisions_added=["Ship on Friday", "Keep the old logo"],
+        action_items_removed=["Book a room"],
+        action_items_added=[ActionItem(task="Jo checks the build", owner="Jo", priority="high")],
+        renamed=[NameChange(old="Sam", new="Samira")],
+    )
+
+    summary = apply_summary_update(previous, update)
+
+    assert summary.meeting_summary == "Weekly sync, release moved."
+    assert summary.participants == ["Alex", "Samira", "Jo"]
+    # Existing entries keep their place; a re-added one is not duplicated
+    assert summary.decisions == ["Keep the old logo", "Ship on Friday"]
+    assert [(a.task, a.owner) for a in summary.action_items] == [
+        ("Samira drafts the release notes", "Samira"),
+        ("Jo checks the build", "Jo"),
+    ]
+
+
+def test_rename_matches_whole_words_only():
+    previous = _summary(participants=["Al", "Alex"], decisions=["Al owns the budget"])
+
+    summary = apply_summary_update(previous, _update(renamed=[NameChange(old="Al", new="Alan")]))
+
+    assert summary.participants == ["Alan", "Alex"]
+    assert summary.decisions == ["Alan owns the budget"]
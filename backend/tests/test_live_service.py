@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.services.live_service import AudioFormat, LiveWindowScheduler
+
+# 100 one-byte frames per second keeps the buffers small; the stub "hears" one word
+# every quarter second, so a transcript is easy to predict from a window's position
+AUDIO = AudioFormat(sample_rate=100, channels=1, sample_width=1)
+WORDS_PER_SECOND = 4
+
+
+def _words(start_seconds, end_seconds):
+    return [f"w{k}" for k in range(round(start_seconds * WORDS_PER_SECOND), round(end_seconds * WORDS_PER_SECOND))]
+
+
+class StubTranscriber:
+    def __init__(self, delay=None):
+        self.windows = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = delay or (lambda window: 0)
+
+    async def __call__(self, window):
+        self.windows.append(window)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay(window))
+        finally:
+            self.in_flight -= 1
+        return " ".join(_words(window.start_seconds, window.end_seconds))
+
+
+def _run(seconds, transcriber, **kwargs):
+    events = []
+
+    async def on_event(event):
+        events.append(event)
+
+    async def session():
+        scheduler = LiveWindowScheduler(
+            AUDIO, transcriber, on_event, window_seconds=5, overlap_seconds=1, **kwargs
+        )
+        audio = bytes(AUDIO.bytes_for(seconds))
+        for i in range(0, len(audio), 30):
+            await scheduler.feed(audio[i:i + 30])
+            await asyncio.sleep(0)  # as between websocket messages, so closed windows start
+        closed_while_streaming = len(transcriber.windows)
+        transcript = await scheduler.finish()
+        return closed_while_streaming, transcript
+
+    closed, transcript = asyncio.run(session())
+    return closed, transcript, [e for e in events if e["type"] == "transcript"]
+
+
+def test_windows_close_at_the_configured_length():
+    transcriber = StubTranscriber()
+    closed, _, _ = _run(12, transcriber)
+
+    assert closed == 2
+    for window in transcriber.windows[:closed]:
+        assert window.end_seconds - window.start_seconds == pytest.approx(5)
+        assert len(window.pcm) == AUDIO.bytes_for(5)
+
+
+def test_consecutive_windows_overlap_by_the_configured_amount():
+    transcriber = StubTranscriber()
+    _run(12, transcriber)
+
+    windows = transcriber.windows
+    assert [w.index for w in windows] == list(range(len(windows)))
+    for prev, nxt in zip(windows, windows[1:]):
+        assert prev.end_seconds - nxt.start_seconds == pytest.approx(1)
+        assert prev.pcm[-AUDIO.bytes_for(1):] == nxt.pcm[:AUDIO.bytes_for(1)]
+
+
+def test_windows_run_concurrently_but_text_is_published_in_order():
+    # Earlier windows take longer, so they finish after the ones that follow them
+    transcriber = StubTranscriber(delay=lambda window: 0.05 * (4 - window.index))
+    _, transcript, events = _run(20, transcriber, max_concurrency=3)
+
+    assert transcriber.max_in_flight == 3
+    published = " ".join(e["text"] for e in events).split()
+    assert published == _words(0, 20)
+    assert transcript == " ".join(published)
+    windows = [e["window"] for e in events if not e["final"]]
+    assert windows == sorted(windows)
+
+
+def test_held_back_words_are_not_published_twice():
+    _, _, events = _run(30, StubTranscriber())
+
+    published = " ".join(e["text"] for e in events).split()
+    assert len(published) == len(set(published))
+    assert published == _words(0, 30)
+
+
+def test_finish_sends_the_remaining_audio():
+    transcriber = StubTranscriber()
+    closed, transcript, events = _run(12, transcriber)
+
+    assert len(transcriber.windows) == closed + 1
+    last = transcriber.windows[-1]
+    assert (last.start_seconds, last.end_seconds) == pytest.approx((8, 12))
+    assert events[-1]["final"] is True
+    assert transcript.split() == _words(0, 12)
+
+
+def test_finish_skips_a_tail_that_is_only_the_overlap():
+    transcriber = StubTranscriber()
+    closed, transcript, _ = _run(9.2, transcriber)
+
+    assert len(transcriber.windows) == closed == 2
+    assert transcript.split() == _words(0, 9)
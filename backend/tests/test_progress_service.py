@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.services import progress_service
+from app.services.progress_service import ChannelInUseError, ProgressTracker
+
+
+async def _collect(tracker, channel_id):
+    return [ev async for ev in tracker.subscribe(channel_id, heartbeat_seconds=0.01)]
+
+
+def _expire(tracker, channel_id):
+    tracker._channels[channel_id].last_activity -= tracker.ttl_seconds + 1
+
+
+def test_open_refuses_an_id_that_is_in_use():
+    tracker = ProgressTracker(ttl_seconds=60)
+    tracker.open("run")
+
+    with pytest.raises(ChannelInUseError):
+        tracker.open("run")
+
+    # Still refused once the run has finished, until the channel expires
+    tracker.publish("run", "done")
+    with pytest.raises(ChannelInUseError):
+        tracker.open("run")
+    _expire(tracker, "run")
+    tracker.open("run")
+
+
+def test_publish_prunes_expired_channels(monkeypatch):
+    monkeypatch.setattr(progress_service, "PRUNE_INTERVAL_SECONDS", 0)
+    tracker = ProgressTracker(ttl_seconds=60)
+    for channel_id in ("old", "recent"):
+        tracker.open(channel_id)
+        tracker.publish(channel_id, "done")
+    _expire(tracker, "old")
+
+    tracker.publish("new", "uploaded")
+
+    assert not tracker.exists("old")
+    assert tracker.exists("recent")
+    assert tracker.exists("new")
+
+
+def test_channels_with_subscribers_are_kept():
+    tracker = ProgressTracker(ttl_seconds=60)
+    tracker.open("run")
+    tracker._channels["run"].subscribers.append((None, None))
+    _expire(tracker, "run")
+
+    tracker._prune()
+
+    assert tracker.exists("run")
+
+
+def test_summary_deltas_are_stored_as_one_event():
+    tracker = ProgressTracker(ttl_seconds=60)
+    tracker.open("run")
+    tracker.publish("run", "summarizing")
+    for text in ('{"meeting', '_summary"', ": ..."):
+        tracker.publish("run", "summary_delta", text=text)
+    tracker.publish("run", "summarized")
+    tracker.publish("run", "done")
+
+    events = asyncio.run(_collect(tracker, "run"))
+
+    assert [(ev.id, ev.event) for ev in events] == [
+        (0, "summarizing"), (3, "summary_delta"), (4, "summarized"), (5, "done"),
+    ]
+    assert events[1].data == {"text": '{"meeting_summary": ...'}
+
+
+def test_events_after_the_end_of_a_run_are_dropped():
+    tracker = ProgressTracker(ttl_seconds=60)
+    tracker.open("run")
+    tracker.publish("run", "failed", error="boom")
+    tracker.publish("run", "uploaded")
+
+    assert [ev.event for ev in asyncio.run(_collect(tracker, "run"))] == ["failed"]
+
+
+def test_subscribing_to_an_unknown_id_ends_at_once():
+    tracker = ProgressTracker(ttl_seconds=60)
+
+    assert asyncio.run(asyncio.wait_for(_collect(tracker, "never-opened"), timeout=1)) == []
+    assert not tracker.exists("never-opened")
@@ -0,0 +1,98 @@
+import pytest
+
+from app.services import rate_limit_service
+from app.services.rate_limit_service import (
+    ProviderUnavailableError,
+    RateLimiter,
+    TokenBucket,
+    call_with_retries,
+)
+
+
+class _ServerError(Exception):
+    status_code = 500
+
+
+def test_bucket_starts_full_and_refills_at_the_per_minute_rate():
+    bucket = TokenBucket(per_minute=60)
+    bucket._updated = 0.0
+
+    assert bucket.reserve(60, now=0.0) == 0.0
+    # Empty: the next token is covered after one second
+    assert bucket.reserve(1, now=0.0) == pytest.approx(1.0)
+    # Ten seconds later ten tokens came back, one of them already promised
+    assert bucket.reserve(9, now=10.0) == 0.0
+    assert bucket.level == pytest.approx(0.0)
+
+
+def test_bucket_refill_and_refund_stop_at_capacity():
+    bucket = TokenBucket(per_minute=60, capacity=10)
+    bucket._updated = 0.0
+    bucket.reserve(5, now=0.0)
+
+    bucket.refund(100)
+    assert bucket.level == 10
+    bucket.reserve(0, now=3600.0)
+    assert bucket.level == 10
+
+
+def test_limiter_waits_for_the_scarcer_bucket():
+    limiter = RateLimiter("test", rpm=60, tpm=600, max_wait_seconds=60)
+
+    assert limiter.reserve(tokens=600) == 0.0
+    # One request left, but the token bucket needs 30s to cover 300 tokens
+    assert limiter.reserve(tokens=300) == pytest.approx(30.0, abs=0.1)
+
+
+def test_limiter_rejects_and_refunds_a_wait_over_the_maximum():
+    limiter = RateLimiter("test", rpm=60, tpm=600, max_wait_seconds=5)
+    limiter.reserve(tokens=600)
+
+    with pytest.raises(ProviderUnavailableError):
+        limiter.reserve(tokens=300)
+    # The rejected reservation was given back
+    assert limiter.tokens.level == pytest.approx(0.0, abs=1)
+    assert limiter.requests.level == pytest.approx(59.0, abs=0.1)
+
+
+def test_settle_gives_back_unused_tokens():
+    limiter = RateLimiter("test", rpm=60, tpm=1000, max_wait_seconds=60)
+    limiter.reserve(tokens=800)
+
+    limiter.settle(800, 300)
+    assert limiter.tokens.level == pytest.approx(700, abs=1)
+
+
+def test_failed_attempts_do_not_keep_their_token_reservation(monkeypatch):
+    monkeypatch.setattr(rate_limit_service.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(rate_limit_service, "backoff_delay", lambda attempt: 0.0)
+    limiter = RateLimiter("test", rpm=60, tpm=1000, max_wait_seconds=60)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _ServerError()
+        return "ok"
+
+    result = call_with_retries(flaky, limiter, tokens=300, count_tokens=lambda _: 300, max_attempts=4)
+
+    assert result == "ok"
+    assert len(attempts) == 3
+    # Only the successful attempt's usage is charged
+    assert limiter.tokens.level == pytest.approx(700, abs=1)
+
+
+def test_non_retryable_errors_are_raised_at_once(monkeypatch):
+    monkeypatch.setattr(rate_limit_service.time, "sleep", lambda seconds: None)
+    limiter = RateLimiter("test", rpm=60, tpm=1000, max_wait_seconds=60)
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_retries(broken, limiter, tokens=300)
+    assert len(attempts) == 1
+    assert limiter.tokens.level == pytest.approx(1000, abs=1)
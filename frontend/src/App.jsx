@@ -55,7 +55,7 @@ function App() {
   const [exportLoading, setExportLoading] = useState(false);
   const [hoverButton, setHoverButton] = useState(null);
 
-  const MAX_AUDIO_MB = 25;
+  const MAX_AUDIO_MB = 200;
   const isFileTooLarge = file && file.size > MAX_AUDIO_MB * 1024 * 1024;
 
   const fileMeta = useMemo(() => {